@@ -0,0 +1,320 @@
+"""
+Benchmark de concorrência do Gunicorn com tráfego misto (lento + rápido).
+
+Para cada perfil de worker (--perfis), inicia um Gunicorn local apontando
+para o banco de benchmark e, durante um tempo fixo, dispara ao mesmo tempo:
+- clientes lentos: PDFs de ordens de serviço em lote e exportação de clientes;
+- conexões abertas do canal de eventos (GET /eventos), como navegadores logados;
+- clientes rápidos: listagens e detalhes, com tempo limite curto.
+
+A medida principal é a latência das requisições rápidas: com workers sync,
+cada requisição lenta ou conexão aberta ocupa um worker inteiro e as rápidas
+esperam na fila (ou estouram o tempo limite); com gthread, as threads livres
+do mesmo worker continuam atendendo.
+
+O resultado (percentis das requisições rápidas, vazão e erros por perfil) é
+salvo em JSON.
+
+Uso:
+    python BENCHMARK/benchmark_concorrencia.py
+    python BENCHMARK/benchmark_concorrencia.py --perfis sync,gthread --workers 2 --duracao 30
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import socket
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+import urllib.request
+from datetime import datetime
+
+from comum import (
+    BANCO_PADRAO,
+    RESULTADOS_DIR,
+    SERVER_DIR,
+    resumir_amostras,
+    versao_codigo,
+)
+from executar_benchmark import ENDPOINTS, ClienteHTTP, montar_contexto
+
+# Endpoints (de executar_benchmark.ENDPOINTS) de cada tipo de cliente
+ENDPOINTS_LENTOS = ["ordens_servico_lote", "exportar_clientes_csv"]
+ENDPOINTS_RAPIDOS = [
+    "clientes_listagem",
+    "cliente_detalhe",
+    "chamado_detalhe",
+    "autocomplete_clientes",
+]
+
+# Tempo limite (s) de uma requisição rápida; acima disso conta como erro
+TIMEOUT_RAPIDO = 10
+
+# Tempo máximo (s) aguardando o Gunicorn aceitar o login
+ESPERA_SERVIDOR = 30
+
+
+def porta_livre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def iniciar_gunicorn(perfil, args, banco, porta, pasta):
+    """Inicia o Gunicorn com o perfil informado, sem o gunicorn_config.py"""
+    comando = [
+        sys.executable,
+        "-m",
+        "gunicorn",
+        "-k",
+        perfil,
+        "-w",
+        str(args.workers),
+        "-b",
+        f"127.0.0.1:{porta}",
+        # Sem isso, workers sync presos em conexões longas seriam reiniciados
+        "--timeout",
+        str(args.duracao + 60),
+        "app:app",
+    ]
+    if perfil == "gthread":
+        comando[5:5] = ["--threads", str(args.threads)]
+    ambiente = dict(
+        os.environ,
+        HELPHUB_DATABASE=os.path.abspath(banco),
+        # Cache de PDFs vazio por perfil, para que o lote continue sendo lento
+        HELPHUB_PDF_CACHE=os.path.join(pasta, "cache_pdf"),
+    )
+    log = open(os.path.join(pasta, "gunicorn.log"), "wb")
+    processo = subprocess.Popen(
+        comando, cwd=SERVER_DIR, env=ambiente, stdout=log, stderr=subprocess.STDOUT
+    )
+    processo.log = log
+    return processo
+
+
+def aguardar_login(url, args, processo):
+    """Tenta o login até o servidor responder e retorna o cliente autenticado"""
+    limite = time.monotonic() + ESPERA_SERVIDOR
+    while True:
+        if processo.poll() is not None:
+            raise RuntimeError(f"Gunicorn encerrou (código {processo.returncode})")
+        try:
+            return ClienteHTTP(url, args.usuario, args.senha)
+        except OSError:
+            if time.monotonic() > limite:
+                raise
+            time.sleep(0.3)
+
+
+def encerrar_gunicorn(processo):
+    processo.terminate()
+    try:
+        processo.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        processo.kill()
+        processo.wait()
+    processo.log.close()
+
+
+def manter_canal_eventos(cliente, parar, conectados):
+    """Abre o canal de eventos e o mantém aberto até o fim da medição"""
+    requisicao = urllib.request.Request(cliente.url + "/eventos")
+    try:
+        with cliente.opener.open(requisicao, timeout=ESPERA_SERVIDOR) as resposta:
+            resposta.readline()
+            conectados.append(1)
+            parar.wait()
+    except OSError:
+        pass
+
+
+def executar_clientes(cliente, nomes, ctx, parar, timeout, semente):
+    """Repete os endpoints informados até o fim da medição, registrando as latências"""
+    endpoints = [e for e in ENDPOINTS if e["nome"] in nomes]
+    rng = random.Random(semente)
+    registros = []
+    while not parar.is_set():
+        endpoint = rng.choice(endpoints)
+        gerar_corpo = endpoint.get("corpo")
+        rota = endpoint["rota"](rng, ctx)
+        corpo = gerar_corpo(rng, ctx) if gerar_corpo else None
+        inicio = time.perf_counter()
+        try:
+            codigo = cliente.requisitar(endpoint["metodo"], rota, corpo, timeout)
+        except OSError:
+            codigo = "timeout"
+        registros.append(((time.perf_counter() - inicio) * 1000, str(codigo)))
+    return registros
+
+
+def medir_perfil(perfil, args, ctx):
+    """Executa o tráfego misto contra um Gunicorn com o perfil informado"""
+    pasta = tempfile.mkdtemp(prefix=f"helphub_concorrencia_{perfil}_")
+    porta = porta_livre()
+    url = f"http://127.0.0.1:{porta}"
+    processo = iniciar_gunicorn(perfil, args, args.banco, porta, pasta)
+    try:
+        cliente = aguardar_login(url, args, processo)
+        # Aquecimento: imports e estruturas carregadas sob demanda em cada worker
+        for nome in ENDPOINTS_RAPIDOS:
+            endpoint = next(e for e in ENDPOINTS if e["nome"] == nome)
+            for _ in range(args.workers):
+                cliente.requisitar("GET", endpoint["rota"](random.Random(0), ctx))
+
+        parar = threading.Event()
+        conectados = []
+        resultados = {"lentos": [], "rapidos": []}
+        threads = [
+            threading.Thread(
+                target=manter_canal_eventos, args=(cliente, parar, conectados)
+            )
+            for _ in range(args.eventos)
+        ]
+
+        def grupo(tipo, nomes, timeout, semente):
+            resultados[tipo].extend(
+                executar_clientes(cliente, nomes, ctx, parar, timeout, semente)
+            )
+
+        threads += [
+            threading.Thread(
+                target=grupo, args=("lentos", ENDPOINTS_LENTOS, 120, args.semente + i)
+            )
+            for i in range(args.lentos)
+        ]
+        threads += [
+            threading.Thread(
+                target=grupo,
+                args=(
+                    "rapidos",
+                    ENDPOINTS_RAPIDOS,
+                    TIMEOUT_RAPIDO,
+                    args.semente + 100 + i,
+                ),
+            )
+            for i in range(args.rapidos)
+        ]
+
+        inicio = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(args.duracao)
+        parar.set()
+        duracao = time.perf_counter() - inicio
+        for thread in threads:
+            thread.join()
+    finally:
+        encerrar_gunicorn(processo)
+        shutil.rmtree(pasta, ignore_errors=True)
+
+    def resumir(registros):
+        amostras = [duracao_ms for duracao_ms, _ in registros]
+        status = {}
+        for _, codigo in registros:
+            status[codigo] = status.get(codigo, 0) + 1
+        return {
+            "requisicoes": len(registros),
+            **resumir_amostras(amostras),
+            "vazao_rps": round(len(registros) / duracao, 2),
+            "status": status,
+            "erros": sum(
+                q for codigo, q in status.items() if not codigo.startswith("2")
+            ),
+        }
+
+    return {
+        "rapidos": resumir(resultados["rapidos"]),
+        "lentos": resumir(resultados["lentos"]),
+        "eventos_conectados": len(conectados),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--banco", default=BANCO_PADRAO, help="Banco de benchmark")
+    parser.add_argument(
+        "--perfis",
+        default="sync,gthread",
+        help="Tipos de worker do Gunicorn, separados por vírgula",
+    )
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=16, help="Threads (gthread)")
+    parser.add_argument("--duracao", type=int, default=20, help="Segundos por perfil")
+    parser.add_argument("--lentos", type=int, default=2, help="Clientes lentos")
+    parser.add_argument(
+        "--eventos", type=int, default=2, help="Canais de eventos abertos"
+    )
+    parser.add_argument("--rapidos", type=int, default=4, help="Clientes rápidos")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--usuario", default="admin")
+    parser.add_argument("--senha", default="benchmark")
+    parser.add_argument("--saida", help="Arquivo JSON de saída")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.banco):
+        sys.exit(
+            f"Banco de benchmark não encontrado: {args.banco}\n"
+            "Gere-o antes com: python BENCHMARK/gerar_dados.py"
+        )
+    if shutil.which("gunicorn") is None:
+        sys.exit("Gunicorn não encontrado (pip install gunicorn)")
+
+    ctx = montar_contexto(args.banco)
+    perfis = [perfil.strip() for perfil in args.perfis.split(",") if perfil.strip()]
+
+    resultado = {
+        "meta": {
+            "data": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "versao": versao_codigo(),
+            "banco": os.path.abspath(args.banco),
+            "workers": args.workers,
+            "threads": args.threads,
+            "duracao_s": args.duracao,
+            "clientes": {
+                "lentos": args.lentos,
+                "eventos": args.eventos,
+                "rapidos": args.rapidos,
+            },
+            "timeout_rapido_s": TIMEOUT_RAPIDO,
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "perfis": {},
+    }
+
+    print(
+        f"{'Perfil':10} {'rápidas':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'req/s':>8} "
+        f"{'erros':>6} {'lentas':>7} {'eventos':>8}"
+    )
+    for perfil in perfis:
+        medicao = medir_perfil(perfil, args, ctx)
+        resultado["perfis"][perfil] = medicao
+        rapidos = medicao["rapidos"]
+        print(
+            f"{perfil:10} {rapidos['requisicoes']:8d} "
+            f"{rapidos['p50'] or 0:9.2f} {rapidos['p95'] or 0:9.2f} {rapidos['p99'] or 0:9.2f} "
+            f"{rapidos['vazao_rps']:8.1f} {rapidos['erros']:6d} "
+            f"{medicao['lentos']['requisicoes']:7d} "
+            f"{medicao['eventos_conectados']:>3}/{args.eventos:<4}"
+        )
+
+    saida = args.saida or os.path.join(
+        RESULTADOS_DIR,
+        f"concorrencia_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.json",
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    print(f"\nResultado salvo em {saida}")
+
+
+if __name__ == "__main__":
+    main()
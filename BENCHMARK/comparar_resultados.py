@@ -0,0 +1,252 @@
+"""
+Comparação entre duas execuções do benchmark (gate de regressão de desempenho).
+
+Para cada endpoint presente nos dois arquivos, compara as distribuições de
+latência com o teste de Mann-Whitney (unilateral: "a execução atual é mais
+lenta?") e a variação percentual do p50/p95. Quando os resultados trazem a
+contagem de consultas SQL por requisição, qualquer aumento acima da
+tolerância também é tratado como regressão.
+
+Sai com código 1 se houver regressão, permitindo uso em scripts de CI.
+
+Uso:
+    python BENCHMARK/comparar_resultados.py base.json atual.json --limite 10
+"""
+
+import sys
+import json
+import math
+import argparse
+
+from comum import resumir_amostras
+
+# Abaixo deste número de amostras o teste estatístico não é confiável
+MINIMO_AMOSTRAS = 8
+
+# Motivo que, sozinho, não reprova o endpoint: variação sem teste estatístico
+SEM_TESTE = "(amostras insuficientes para o teste)"
+
+
+def mann_whitney(base, atual):
+    """
+    Teste U de Mann-Whitney com aproximação normal, correção de empates e de
+    continuidade. Retorna o p-valor unilateral para 'atual > base'.
+    """
+    n1, n2 = len(base), len(atual)
+    n = n1 + n2
+    combinadas = sorted(
+        [(valor, 0) for valor in base] + [(valor, 1) for valor in atual]
+    )
+
+    # Atribui postos médios aos valores empatados
+    postos = [0.0] * n
+    correcao_empates = 0.0
+    i = 0
+    while i < n:
+        j = i
+        while j + 1 < n and combinadas[j + 1][0] == combinadas[i][0]:
+            j += 1
+        posto_medio = (i + j) / 2 + 1
+        for k in range(i, j + 1):
+            postos[k] = posto_medio
+        empatados = j - i + 1
+        correcao_empates += empatados**3 - empatados
+        i = j + 1
+
+    soma_postos_atual = sum(
+        posto for posto, (_, grupo) in zip(postos, combinadas) if grupo == 1
+    )
+    u_atual = soma_postos_atual - n2 * (n2 + 1) / 2
+    media = n1 * n2 / 2
+    variancia = n1 * n2 / 12 * ((n + 1) - correcao_empates / (n * (n - 1)))
+    if variancia <= 0:
+        return 1.0
+    z = (u_atual - media - 0.5) / math.sqrt(variancia)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def variacao_percentual(base, atual):
+    if base in (None, 0) or atual is None:
+        return None
+    return (atual - base) / base * 100
+
+
+def comparar_endpoint(base, atual, args):
+    """Compara um endpoint e retorna um dicionário com o veredito"""
+    amostras_base = base.get("amostras_ms") or []
+    amostras_atual = atual.get("amostras_ms") or []
+    resumo_base = resumir_amostras(amostras_base)
+    resumo_atual = resumir_amostras(amostras_atual)
+
+    delta_p50 = variacao_percentual(resumo_base["p50"], resumo_atual["p50"])
+    delta_p95 = variacao_percentual(resumo_base["p95"], resumo_atual["p95"])
+
+    p_valor = None
+    if min(len(amostras_base), len(amostras_atual)) >= MINIMO_AMOSTRAS:
+        p_valor = mann_whitney(amostras_base, amostras_atual)
+
+    motivos = []
+    if delta_p50 is not None and delta_p50 > args.limite:
+        if p_valor is None:
+            motivos.append(f"p50 {SEM_TESTE}")
+        elif p_valor < args.alfa:
+            motivos.append(f"p50 +{delta_p50:.1f}%")
+    if (
+        args.limite_p95 is not None
+        and delta_p95 is not None
+        and delta_p95 > args.limite_p95
+    ):
+        if p_valor is None:
+            motivos.append(f"p95 {SEM_TESTE}")
+        elif p_valor < args.alfa:
+            motivos.append(f"p95 +{delta_p95:.1f}%")
+
+    consultas_base = base.get("consultas")
+    consultas_atual = atual.get("consultas")
+    if consultas_base is not None and consultas_atual is not None:
+        if consultas_atual > consultas_base + args.tolerancia_consultas:
+            motivos.append(f"consultas {consultas_base:g} -> {consultas_atual:g}")
+
+    erros_novos = (atual.get("erros") or 0) - (base.get("erros") or 0)
+    if erros_novos > 0:
+        motivos.append(f"+{erros_novos} erros")
+
+    regressao = any(not motivo.endswith(SEM_TESTE) for motivo in motivos)
+    if regressao:
+        veredito = "REGRESSÃO"
+    elif motivos:
+        veredito = "inconclusivo"
+    elif (
+        delta_p50 is not None
+        and delta_p50 < -args.limite
+        and p_valor is not None
+        and 1 - p_valor < args.alfa
+    ):
+        veredito = "melhora"
+    else:
+        veredito = "ok"
+
+    return {
+        "p50_base": resumo_base["p50"],
+        "p50_atual": resumo_atual["p50"],
+        "delta_p50": delta_p50,
+        "p95_base": resumo_base["p95"],
+        "p95_atual": resumo_atual["p95"],
+        "delta_p95": delta_p95,
+        "p_valor": p_valor,
+        "consultas_base": consultas_base,
+        "consultas_atual": consultas_atual,
+        "veredito": veredito,
+        "motivos": motivos,
+    }
+
+
+def formatar(valor, sufixo="", casas=2):
+    if valor is None:
+        return "-"
+    if sufixo == "%":
+        return f"{valor:+.{casas}f}%"
+    return f"{valor:.{casas}f}{sufixo}"
+
+
+def imprimir_relatorio(meta_base, meta_atual, comparacoes, ausentes, args):
+    print("Comparação de benchmarks")
+    print(f"  base : {meta_base.get('data')} (versão {meta_base.get('versao')})")
+    print(f"  atual: {meta_atual.get('data')} (versão {meta_atual.get('versao')})")
+    print(
+        f"  critérios: p50 > +{args.limite}% com p < {args.alfa}"
+        + (f", p95 > +{args.limite_p95}%" if args.limite_p95 is not None else "")
+        + f", consultas > +{args.tolerancia_consultas:g}"
+    )
+    print()
+    print(
+        f"{'Endpoint':32} {'p50 base':>9} {'p50 atual':>9} {'Δp50':>9} "
+        f"{'Δp95':>9} {'p-valor':>8} {'SQL':>9}  Veredito"
+    )
+    for nome, c in comparacoes.items():
+        consultas = "-"
+        if c["consultas_base"] is not None and c["consultas_atual"] is not None:
+            consultas = f"{c['consultas_base']:g}→{c['consultas_atual']:g}"
+        print(
+            f"{nome:32} {formatar(c['p50_base']):>9} {formatar(c['p50_atual']):>9} "
+            f"{formatar(c['delta_p50'], '%', 1):>9} {formatar(c['delta_p95'], '%', 1):>9} "
+            f"{formatar(c['p_valor'], casas=3):>8} {consultas:>9}  {c['veredito']}"
+            + (f" ({', '.join(c['motivos'])})" if c["motivos"] else "")
+        )
+    for nome, origem in ausentes:
+        print(f"{nome:32} presente apenas em {origem}")
+
+    regressoes = [n for n, c in comparacoes.items() if c["veredito"] == "REGRESSÃO"]
+    print()
+    if regressoes:
+        print(f"{len(regressoes)} regressão(ões) detectada(s): {', '.join(regressoes)}")
+    else:
+        print("Nenhuma regressão detectada.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("base", help="Resultado de referência (JSON)")
+    parser.add_argument("atual", help="Resultado a ser avaliado (JSON)")
+    parser.add_argument(
+        "--limite",
+        type=float,
+        default=10.0,
+        help="Aumento percentual máximo aceito no p50 (padrão: 10)",
+    )
+    parser.add_argument(
+        "--limite-p95",
+        type=float,
+        default=None,
+        help="Aumento percentual máximo aceito no p95 (desativado por padrão)",
+    )
+    parser.add_argument(
+        "--alfa",
+        type=float,
+        default=0.05,
+        help="Nível de significância do teste de Mann-Whitney (padrão: 0.05)",
+    )
+    parser.add_argument(
+        "--tolerancia-consultas",
+        type=float,
+        default=0,
+        help="Aumento aceito na média de consultas SQL por requisição",
+    )
+    parser.add_argument("--endpoints", nargs="*", help="Compara apenas estes endpoints")
+    parser.add_argument("--json", help="Salva também a comparação em JSON")
+    args = parser.parse_args()
+
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.atual, encoding="utf-8") as f:
+        atual = json.load(f)
+
+    endpoints_base = base.get("endpoints", {})
+    endpoints_atual = atual.get("endpoints", {})
+    nomes = [
+        nome
+        for nome in endpoints_base
+        if nome in endpoints_atual and (not args.endpoints or nome in args.endpoints)
+    ]
+    ausentes = [(n, "base") for n in endpoints_base if n not in endpoints_atual] + [
+        (n, "atual") for n in endpoints_atual if n not in endpoints_base
+    ]
+
+    comparacoes = {
+        nome: comparar_endpoint(endpoints_base[nome], endpoints_atual[nome], args)
+        for nome in nomes
+    }
+    imprimir_relatorio(
+        base.get("meta", {}), atual.get("meta", {}), comparacoes, ausentes, args
+    )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(comparacoes, f, ensure_ascii=False, indent=2)
+
+    if any(c["veredito"] == "REGRESSÃO" for c in comparacoes.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Funções e caminhos compartilhados pelos scripts de benchmark do HelpHub.
+"""
+
+import os
+import sys
+import subprocess
+import statistics
+
+# Diretórios base
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+HELPHUB_DIR = os.path.abspath(os.path.join(BENCHMARK_DIR, ".."))
+SERVER_DIR = os.path.join(HELPHUB_DIR, "SERVER")
+
+# Banco descartável usado pelos benchmarks (nunca o banco de produção)
+BANCO_PADRAO = os.path.join(BENCHMARK_DIR, "dados", "benchmark.db")
+RESULTADOS_DIR = os.path.join(BENCHMARK_DIR, "resultados")
+
+
+def carregar_app(banco):
+    """
+    Importa o app.py apontando para o banco informado.
+    As variáveis HELPHUB_DATABASE e HELPHUB_PDF_CACHE precisam ser definidas
+    antes do import, pois os caminhos são lidos na inicialização do módulo.
+    O cache de PDFs fica ao lado do banco, para não misturar com o de produção.
+    """
+    banco = os.path.abspath(banco)
+    os.makedirs(os.path.dirname(banco), exist_ok=True)
+    os.environ["HELPHUB_DATABASE"] = banco
+    os.environ["HELPHUB_PDF_CACHE"] = os.path.join(os.path.dirname(banco), "cache_pdf")
+
+    if SERVER_DIR not in sys.path:
+        sys.path.insert(0, SERVER_DIR)
+
+    import app as helphub
+
+    if os.path.abspath(helphub.DATABASE) != banco:
+        raise RuntimeError(
+            f"app.py já estava carregado com outro banco: {helphub.DATABASE}"
+        )
+    return helphub
+
+
+def cliente_admin(helphub):
+    """
+    Cria um cliente de teste do Flask já autenticado como admin.
+    A sessão é montada diretamente, sem passar pelo login (que dispara o backup diário).
+    """
+    client = helphub.app.test_client()
+    with helphub.get_db_connection() as conn:
+        admin_id = conn.execute(
+            "SELECT id FROM usuarios WHERE username = 'admin'"
+        ).fetchone()[0]
+    with client.session_transaction() as sess:
+        sess["user_id"] = admin_id
+        sess["username"] = "admin"
+        sess["role"] = "admin"
+        sess.permanent = True
+    return client
+
+
+def percentil(amostras, p):
+    """Percentil com interpolação linear (funciona com poucas amostras)"""
+    if not amostras:
+        return None
+    ordenadas = sorted(amostras)
+    if len(ordenadas) == 1:
+        return ordenadas[0]
+    posicao = (len(ordenadas) - 1) * p / 100
+    inferior = int(posicao)
+    superior = min(inferior + 1, len(ordenadas) - 1)
+    fracao = posicao - inferior
+    return ordenadas[inferior] + (ordenadas[superior] - ordenadas[inferior]) * fracao
+
+
+def resumir_amostras(amostras):
+    """Calcula as estatísticas de latência (em ms) de uma lista de amostras"""
+    if not amostras:
+        return {"p50": None, "p95": None, "p99": None, "media": None}
+    return {
+        "p50": round(percentil(amostras, 50), 3),
+        "p95": round(percentil(amostras, 95), 3),
+        "p99": round(percentil(amostras, 99), 3),
+        "media": round(statistics.fmean(amostras), 3),
+        "minimo": round(min(amostras), 3),
+        "maximo": round(max(amostras), 3),
+    }
+
+
+def versao_codigo():
+    """Retorna o commit atual do repositório (se disponível) para identificar o resultado"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=HELPHUB_DIR,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).strip()
+    except Exception:
+        return None
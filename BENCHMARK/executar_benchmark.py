@@ -0,0 +1,427 @@
+"""
+Benchmark de latência e vazão dos principais endpoints do HelpHub.
+
+Dois modos de execução:
+- Cliente de teste do Flask (padrão): importa o app.py apontando para o banco
+  de benchmark e executa as requisições no mesmo processo.
+- HTTP (--url): dispara requisições contra um servidor em execução
+  (ex.: Gunicorn local iniciado com HELPHUB_DATABASE apontando para o banco
+  de benchmark), com concorrência configurável.
+
+O resultado (amostras brutas e percentis p50/p95/p99 por endpoint) é salvo
+em JSON para comparação entre execuções.
+
+Uso:
+    python BENCHMARK/executar_benchmark.py --iteracoes 50
+    python BENCHMARK/executar_benchmark.py --url http://127.0.0.1:5000 --concorrencia 8
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import sqlite3
+import argparse
+import platform
+import threading
+import urllib.parse
+import urllib.request
+import urllib.error
+from http.cookiejar import CookieJar
+from datetime import date, datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+from comum import (
+    BANCO_PADRAO,
+    RESULTADOS_DIR,
+    carregar_app,
+    cliente_admin,
+    resumir_amostras,
+    versao_codigo,
+)
+
+# Endpoints medidos. 'rota' recebe o gerador aleatório e o contexto com os ids
+# existentes no banco. 'peso' ajusta o número de iterações de endpoints caros.
+# Endpoints com 'escrita' alteram o banco e só rodam em HTTP com --incluir-escrita.
+ENDPOINTS = [
+    {
+        "nome": "clientes_listagem",
+        "metodo": "GET",
+        "rota": lambda rng, ctx: f"/clientes?pagina={rng.randint(1, ctx['paginas_clientes'])}&limite=10",
+    },
+    {
+        "nome": "clientes_listagem_ordenada",
+        "metodo": "GET",
+        "rota": lambda rng, ctx: f"/clientes?pagina=1&limite=50&order_field=nome&order_order=desc",
+    },
+    {
+        "nome": "clientes_buscar",
+        "metodo": "GET",
+        "rota": lambda rng, ctx: f"/clientes/buscar?termo={rng.choice(ctx['termos'])}",
+        "peso": 0.5,
+    },
+    {
+        "nome": "clientes_listagem_busca",
+        "metodo": "GET",
+        "rota": lambda rng, ctx: f"/clientes?search={rng.choice(ctx['termos'])}&pagina=1&limite=10&order_field=nome",
+    },
+    {
+        "nome": "autocomplete_clientes",
+        "metodo": "GET",
+        "rota": lambda rng, ctx: f"/autocomplete/clientes?q={rng.choice(ctx['termos'])[:rng.randint(2, 4)]}",
+    },
+    {
+        "nome": "autocomplete_chamados",
+        "metodo": "GET",
+        "rota": lambda rng, ctx: f"/autocomplete/chamados?q={rng.choice(ctx['termos'])[:rng.randint(2, 4)]}",
+    },
+    {
+        "nome": "cliente_detalhe",
+        "metodo": "GET",
+        "rota": lambda rng, ctx: f"/clientes/{rng.randint(1, ctx['max_cliente'])}",
+    },
+    {
+        "nome": "chamados_abertos",
+        "metodo": "GET",
+        "rota": lambda rng, ctx: "/chamados?status=Aberto&pagina=1&limite=10",
+    },
+    {
+        "nome": "chamados_finalizados_pagina",
+        "metodo": "GET",
+        "rota": lambda rng, ctx: f"/chamados?status=Finalizado&pagina={rng.randint(1, 100)}&limite=10",
+    },
+    {
+        "nome": "chamados_do_cliente",
+        "metodo": "GET",
+        "rota": lambda rng, ctx: f"/chamados?cliente_id={rng.randint(1, ctx['max_cliente'])}&status=Aberto,Finalizado&limite=50",
+    },
+    {
+        "nome": "chamado_detalhe",
+        "metodo": "GET",
+        "rota": lambda rng, ctx: f"/chamados/{rng.randint(1, ctx['max_chamado'])}",
+    },
+    {
+        "nome": "chamado_detalhes_completo",
+        "metodo": "GET",
+        "rota": lambda rng, ctx: f"/chamados/{rng.randint(1, ctx['max_chamado'])}/detalhes",
+    },
+    {
+        # Poucos chamados distintos: mede o caso comum de reimpressão (cache de PDF)
+        "nome": "ordem_servico_pdf",
+        "metodo": "GET",
+        "rota": lambda rng, ctx: f"/chamados/{rng.randint(1, 20)}/ordem-servico/pdf",
+    },
+    {
+        # Ordens de serviço do dia mais movimentado da agenda, em um único PDF
+        "nome": "ordens_servico_lote",
+        "metodo": "POST",
+        "rota": lambda rng, ctx: "/chamados/ordem-servico/lote",
+        "corpo": lambda rng, ctx: {"data_inicio": ctx["dia_mais_visitas"]},
+    },
+    {
+        "nome": "estatisticas_total",
+        "metodo": "GET",
+        "rota": lambda rng, ctx: "/estatisticas?periodo=total",
+    },
+    {
+        "nome": "estatisticas_mensal",
+        "metodo": "GET",
+        "rota": lambda rng, ctx: "/estatisticas?periodo=mensal",
+    },
+    {
+        "nome": "agendamentos",
+        "metodo": "GET",
+        "rota": lambda rng, ctx: "/agendamentos",
+        "peso": 0.3,
+    },
+    {
+        "nome": "agendamentos_semana",
+        "metodo": "GET",
+        "rota": lambda rng, ctx: semana_agenda(rng, ctx),
+    },
+    {
+        "nome": "agenda_horarios_livres",
+        "metodo": "GET",
+        "rota": lambda rng, ctx: (
+            f"/agendamentos/horarios-livres?chamado_id={rng.randint(1, ctx['max_chamado'])}"
+            f"&data={dia_agenda(rng, ctx).isoformat()}"
+        ),
+    },
+    {
+        "nome": "exportar_departamentos_csv",
+        "metodo": "GET",
+        "rota": lambda rng, ctx: "/export/csv/departamentos",
+    },
+    {
+        "nome": "exportar_clientes_csv",
+        "metodo": "GET",
+        "rota": lambda rng, ctx: "/export/csv/clientes",
+        "peso": 0.2,
+    },
+    {
+        "nome": "importar_departamentos",
+        "metodo": "POST",
+        "rota": lambda rng, ctx: "/admin/database/tables/departamentos/import",
+        "corpo": lambda rng, ctx: {
+            "mode": "append",
+            "columns": ["nome", "descricao"],
+            "data": [
+                {"nome": f"Importado {rng.getrandbits(48)}", "descricao": "Benchmark"}
+                for _ in range(100)
+            ],
+        },
+        "escrita": True,
+        "peso": 0.3,
+    },
+]
+
+
+def dia_agenda(rng, ctx):
+    """Sorteia um dia dentro do primeiro ano de agendamentos do banco"""
+    return date.fromisoformat(ctx["agenda_inicio"]) + timedelta(
+        days=rng.randint(0, 364)
+    )
+
+
+def semana_agenda(rng, ctx):
+    """Período de uma semana da agenda, como o pedido pela visão semanal do calendário"""
+    inicio = dia_agenda(rng, ctx)
+    fim = inicio + timedelta(days=7)
+    return f"/agendamentos?start={inicio.isoformat()}T00:00&end={fim.isoformat()}T00:00"
+
+
+def montar_contexto(banco):
+    """Lê do banco os limites de ids e termos de busca usados pelas rotas"""
+    conn = sqlite3.connect(banco)
+    try:
+        max_cliente = conn.execute("SELECT MAX(id) FROM clientes").fetchone()[0] or 1
+        max_chamado = conn.execute("SELECT MAX(id) FROM chamados").fetchone()[0] or 1
+        nomes = [
+            row[0]
+            for row in conn.execute(
+                "SELECT nome FROM clientes ORDER BY RANDOM() LIMIT 50"
+            )
+        ]
+        agenda_inicio = conn.execute(
+            "SELECT MIN(data_agendamento) FROM agendamentos"
+        ).fetchone()[0]
+        dia_mais_visitas = conn.execute(
+            """
+            SELECT substr(data_agendamento, 1, 10) AS dia FROM agendamentos
+            GROUP BY dia ORDER BY COUNT(*) DESC, dia LIMIT 1
+        """
+        ).fetchone()
+    finally:
+        conn.close()
+    termos = sorted({nome.split()[0][:4] for nome in nomes if nome}) or ["a"]
+    return {
+        "max_cliente": max_cliente,
+        "max_chamado": max_chamado,
+        "paginas_clientes": max(max_cliente // 10, 1),
+        "termos": [urllib.parse.quote(termo) for termo in termos],
+        "agenda_inicio": (agenda_inicio or "2024-01-01")[:10],
+        "dia_mais_visitas": dia_mais_visitas[0] if dia_mais_visitas else "2024-01-01",
+    }
+
+
+class ClienteFlask:
+    """
+    Executa requisições pelo cliente de teste do Flask, com sessão de admin.
+    Como roda no mesmo processo, também conta as consultas SQL de cada requisição.
+    """
+
+    def __init__(self, helphub):
+        self.helphub = helphub
+        self.client = cliente_admin(helphub)
+        self.consultas = []
+
+    def requisitar(self, metodo, rota, corpo=None):
+        with self.helphub.contar_consultas() as consultas:
+            resposta = self.client.open(rota, method=metodo, json=corpo)
+            resposta.get_data()
+        self.consultas.append(len(consultas))
+        return resposta.status_code
+
+
+class ClienteHTTP:
+    """Executa requisições contra um servidor em execução (ex.: Gunicorn)"""
+
+    def __init__(self, url, usuario, senha):
+        self.url = url.rstrip("/")
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(CookieJar())
+        )
+        status = self.requisitar(
+            "POST", "/auth/login", {"username": usuario, "password": senha}
+        )
+        if status != 200:
+            raise RuntimeError(f"Falha no login em {self.url} (HTTP {status})")
+
+    def requisitar(self, metodo, rota, corpo=None, timeout=120):
+        dados = json.dumps(corpo).encode("utf-8") if corpo is not None else None
+        requisicao = urllib.request.Request(
+            self.url + rota,
+            data=dados,
+            method=metodo,
+            headers={"Content-Type": "application/json"} if dados else {},
+        )
+        try:
+            with self.opener.open(requisicao, timeout=timeout) as resposta:
+                resposta.read()
+                return resposta.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+
+def medir_endpoint(cliente, endpoint, ctx, iteracoes, aquecimento, concorrencia, rng):
+    """Executa um endpoint várias vezes e retorna amostras de latência e vazão"""
+    gerar_corpo = endpoint.get("corpo")
+    requisicoes = [
+        (
+            endpoint["rota"](rng, ctx),
+            gerar_corpo(rng, ctx) if gerar_corpo else None,
+        )
+        for _ in range(aquecimento + iteracoes)
+    ]
+
+    for rota, corpo in requisicoes[:aquecimento]:
+        cliente.requisitar(endpoint["metodo"], rota, corpo)
+
+    contagem_consultas = getattr(cliente, "consultas", None)
+    if contagem_consultas is not None:
+        contagem_consultas.clear()
+
+    amostras = []
+    status = {}
+    lock = threading.Lock()
+
+    def executar(item):
+        rota, corpo = item
+        inicio = time.perf_counter()
+        codigo = cliente.requisitar(endpoint["metodo"], rota, corpo)
+        duracao_ms = (time.perf_counter() - inicio) * 1000
+        with lock:
+            amostras.append(duracao_ms)
+            status[str(codigo)] = status.get(str(codigo), 0) + 1
+
+    inicio_total = time.perf_counter()
+    if concorrencia > 1:
+        with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+            list(executor.map(executar, requisicoes[aquecimento:]))
+    else:
+        for item in requisicoes[aquecimento:]:
+            executar(item)
+    duracao_total = time.perf_counter() - inicio_total
+
+    erros = sum(qtd for codigo, qtd in status.items() if not codigo.startswith("2"))
+    return {
+        "metodo": endpoint["metodo"],
+        "exemplo_rota": requisicoes[-1][0],
+        "iteracoes": len(amostras),
+        "amostras_ms": [round(a, 3) for a in amostras],
+        **resumir_amostras(amostras),
+        "vazao_rps": round(len(amostras) / duracao_total, 2) if duracao_total else None,
+        "status": status,
+        "erros": erros,
+        # Média de consultas SQL por requisição (apenas no modo Flask)
+        "consultas": (
+            round(sum(contagem_consultas) / len(contagem_consultas), 2)
+            if contagem_consultas
+            else None
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--banco", default=BANCO_PADRAO, help="Banco de benchmark")
+    parser.add_argument("--iteracoes", type=int, default=30)
+    parser.add_argument("--aquecimento", type=int, default=2)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument(
+        "--endpoints", nargs="*", help="Mede apenas os endpoints com estes nomes"
+    )
+    parser.add_argument("--saida", help="Arquivo JSON de saída")
+    parser.add_argument("--url", help="URL de um servidor em execução (modo HTTP)")
+    parser.add_argument("--usuario", default="admin")
+    parser.add_argument("--senha", default="benchmark")
+    parser.add_argument("--concorrencia", type=int, default=1)
+    parser.add_argument(
+        "--incluir-escrita",
+        action="store_true",
+        help="No modo HTTP, inclui endpoints que alteram o banco",
+    )
+    args = parser.parse_args()
+
+    if not os.path.exists(args.banco):
+        sys.exit(
+            f"Banco de benchmark não encontrado: {args.banco}\n"
+            "Gere-o antes com: python BENCHMARK/gerar_dados.py"
+        )
+
+    rng = random.Random(args.semente)
+    ctx = montar_contexto(args.banco)
+
+    if args.url:
+        cliente = ClienteHTTP(args.url, args.usuario, args.senha)
+        modo = "http"
+    else:
+        cliente = ClienteFlask(carregar_app(args.banco))
+        modo = "flask"
+
+    endpoints = [
+        e
+        for e in ENDPOINTS
+        if (not args.endpoints or e["nome"] in args.endpoints)
+        and (modo == "flask" or args.incluir_escrita or not e.get("escrita"))
+    ]
+
+    resultado = {
+        "meta": {
+            "data": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "versao": versao_codigo(),
+            "modo": modo,
+            "url": args.url,
+            "banco": os.path.abspath(args.banco),
+            "iteracoes": args.iteracoes,
+            "concorrencia": args.concorrencia,
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "contexto": {k: v for k, v in ctx.items() if k != "termos"},
+        },
+        "endpoints": {},
+    }
+
+    print(
+        f"{'Endpoint':32} {'p50':>9} {'p95':>9} {'p99':>9} {'req/s':>9} {'erros':>6} {'SQL':>6}"
+    )
+    for endpoint in endpoints:
+        iteracoes = max(int(args.iteracoes * endpoint.get("peso", 1)), 1)
+        medicao = medir_endpoint(
+            cliente,
+            endpoint,
+            ctx,
+            iteracoes,
+            args.aquecimento,
+            args.concorrencia if modo == "http" else 1,
+            rng,
+        )
+        resultado["endpoints"][endpoint["nome"]] = medicao
+        print(
+            f"{endpoint['nome']:32} {medicao['p50']:9.2f} {medicao['p95']:9.2f} "
+            f"{medicao['p99']:9.2f} {medicao['vazao_rps']:9.1f} {medicao['erros']:6d} "
+            f"{medicao['consultas'] if medicao['consultas'] is not None else '-':>6}"
+        )
+
+    saida = args.saida or os.path.join(
+        RESULTADOS_DIR, f"benchmark_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    print(f"\nResultado salvo em {saida}")
+
+
+if __name__ == "__main__":
+    main()
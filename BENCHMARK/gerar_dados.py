@@ -0,0 +1,369 @@
+"""
+Gerador de dados sintéticos para benchmarks do HelpHub.
+
+Popula um banco descartável com volumes realistas. Na escala 1.0:
+100 mil clientes, 1 milhão de chamados, ~5 milhões de andamentos,
+100 mil agendamentos, departamentos e usuários.
+
+Uso:
+    python BENCHMARK/gerar_dados.py --escala 0.01
+    python BENCHMARK/gerar_dados.py --escala 1 --banco /tmp/helphub-bench.db
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import sqlite3
+from datetime import datetime, timedelta
+
+from comum import BANCO_PADRAO, carregar_app
+
+# Volumes na escala 1.0
+VOLUMES = {
+    "clientes": 100_000,
+    "chamados": 1_000_000,
+    "agendamentos": 100_000,
+}
+ANDAMENTOS_POR_CHAMADO = (1, 9)  # Média de 5 andamentos por chamado
+TOTAL_DEPARTAMENTOS = 12
+TOTAL_USUARIOS = 25
+
+# Tamanho do lote de inserção (executemany + commit)
+TAMANHO_LOTE = 50_000
+
+# Período coberto pelos chamados gerados
+INICIO_PERIODO = datetime(2022, 1, 1, 8, 0)
+DIAS_PERIODO = 3 * 365
+
+NOMES = [
+    "Ana",
+    "João",
+    "José",
+    "Maria",
+    "Márcia",
+    "Luís",
+    "Júlia",
+    "Antônio",
+    "Fábio",
+    "Cecília",
+    "Paulo",
+    "Lúcia",
+    "André",
+    "Beatriz",
+    "Sérgio",
+    "Conceição",
+    "Raimundo",
+    "Tânia",
+    "Vinícius",
+    "Patrícia",
+]
+SOBRENOMES = [
+    "Silva",
+    "Souza",
+    "Gonçalves",
+    "Araújo",
+    "Conceição",
+    "Pereira",
+    "Lima",
+    "Gomes",
+    "Ribeiro",
+    "Simões",
+    "Magalhães",
+    "Assunção",
+    "Carvalho",
+    "Fernandes",
+    "Brandão",
+    "Guimarães",
+    "Rocha",
+    "Mendonça",
+]
+SUFIXOS_EMPRESA = [
+    "Telecom",
+    "Soluções",
+    "Comércio",
+    "Informática",
+    "Serviços",
+    "Logística",
+    "Distribuidora",
+    "Construções",
+]
+CIDADES = [
+    ("Joinville", "SC"),
+    ("São Paulo", "SP"),
+    ("Florianópolis", "SC"),
+    ("Curitiba", "PR"),
+    ("Belo Horizonte", "MG"),
+    ("Salvador", "BA"),
+    ("Porto Alegre", "RS"),
+    ("Goiânia", "GO"),
+    ("Maceió", "AL"),
+    ("Ribeirão Preto", "SP"),
+]
+BAIRROS = ["Centro", "Iririú", "Saguaçu", "América", "Boa Vista", "Glória"]
+ASSUNTOS = [
+    "Problema com Wi-Fi",
+    "PC não liga",
+    "Instalação de impressora",
+    "Lentidão na rede",
+    "Troca de equipamento",
+    "Configuração de e-mail",
+    "Sem sinal de internet",
+    "Dúvida sobre fatura",
+    "Visita técnica",
+]
+TEXTOS_ANDAMENTO = [
+    "Cliente contatado por telefone.",
+    "Orientado corretamente sobre os valores.",
+    "Encaminhado para o técnico responsável.",
+    "Aguardando retorno do cliente.",
+    "Equipamento substituído.",
+    "Relatório da visita técnica: problema resolvido.",
+    "Configuração refeita remotamente.",
+    "Cliente compreendeu ok",
+]
+
+
+def data_chamado(chamado_id, total_chamados):
+    """Data de abertura determinística: ids maiores são chamados mais recentes"""
+    segundos = DIAS_PERIODO * 86400 * chamado_id / max(total_chamados, 1)
+    return INICIO_PERIODO + timedelta(seconds=int(segundos))
+
+
+def status_chamado(chamado_id, total_chamados):
+    """Chamados recentes tendem a estar abertos; os antigos quase sempre finalizados"""
+    if chamado_id > total_chamados * 0.9:
+        return "Aberto" if chamado_id % 3 else "Finalizado"
+    return "Aberto" if chamado_id % 50 == 0 else "Finalizado"
+
+
+def gerar_clientes(rng, total):
+    for cliente_id in range(1, total + 1):
+        cidade, estado = rng.choice(CIDADES)
+        sobrenome = rng.choice(SOBRENOMES)
+        if rng.random() < 0.6:
+            nome = f"{rng.choice(NOMES)} {sobrenome} {rng.choice(SOBRENOMES)}"
+            tipo, nome_fantasia = "Pessoa Física", None
+            documento = f"{rng.randint(100, 999)}.{rng.randint(100, 999)}.{rng.randint(100, 999)}-{rng.randint(10, 99)}"
+        else:
+            nome = f"{sobrenome} {rng.choice(SUFIXOS_EMPRESA)} Ltda"
+            tipo, nome_fantasia = "Comercial", f"{sobrenome} {cliente_id}"
+            documento = f"{rng.randint(10, 99)}.{rng.randint(100, 999)}.{rng.randint(100, 999)}/0001-{rng.randint(10, 99)}"
+        yield (
+            nome,
+            nome_fantasia,
+            f"{sobrenome.lower()}{cliente_id}@exemplo.com.br",
+            f"({rng.randint(11, 99)}) 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}",
+            "Sim",
+            tipo,
+            documento,
+            "Brasileiro",
+            f"{rng.randint(10000, 99999)}-{rng.randint(100, 999)}",
+            f"Rua {rng.choice(SOBRENOMES)}",
+            str(rng.randint(1, 3000)),
+            rng.choice(["", "", "Sala 2", "Casa 2", "Apto 101"]),
+            rng.choice(BAIRROS),
+            cidade,
+            estado,
+            "Brasil",
+        )
+
+
+def gerar_chamados(rng, total, total_clientes):
+    for chamado_id in range(1, total + 1):
+        abertura = data_chamado(chamado_id, total)
+        status = status_chamado(chamado_id, total)
+        cliente_id = rng.randint(1, total_clientes)
+        fechamento = None
+        if status == "Finalizado":
+            fechamento = (abertura + timedelta(hours=rng.randint(1, 240))).strftime(
+                "%Y-%m-%d %H:%M:%S"
+            )
+        yield (
+            cliente_id,
+            rng.randint(1, TOTAL_DEPARTAMENTOS),
+            f"Descrição do chamado {chamado_id}: {rng.choice(ASSUNTOS).lower()}.",
+            status,
+            abertura.strftime("%Y-%m-%d %H:%M:%S"),
+            fechamento,
+            abertura.strftime("%d%m%Y%H%M") + str(cliente_id),
+            rng.choice(ASSUNTOS),
+            f"({rng.randint(11, 99)}) 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}",
+            rng.choice(NOMES),
+        )
+
+
+def gerar_andamentos(rng, total_chamados, usuarios_ids):
+    minimo, maximo = ANDAMENTOS_POR_CHAMADO
+    for chamado_id in range(1, total_chamados + 1):
+        abertura = data_chamado(chamado_id, total_chamados)
+        for ordem in range(rng.randint(minimo, maximo)):
+            data_hora = abertura + timedelta(minutes=30 * (ordem + 1))
+            yield (
+                chamado_id,
+                data_hora.strftime("%Y-%m-%d %H:%M:%S"),
+                rng.choice(TEXTOS_ANDAMENTO),
+                rng.choice(usuarios_ids),
+            )
+
+
+def gerar_agendamentos(rng, total, total_chamados):
+    passo = max(total_chamados // max(total, 1), 1)
+    for chamado_id in range(passo, min(total * passo, total_chamados) + 1, passo):
+        inicio = data_chamado(chamado_id, total_chamados) + timedelta(
+            days=rng.randint(1, 5), hours=rng.randint(0, 8)
+        )
+        fim = inicio + timedelta(hours=rng.choice([1, 1, 2, 4]))
+        status = (
+            "Finalizado"
+            if status_chamado(chamado_id, total_chamados) == "Finalizado"
+            else "Aberto"
+        )
+        yield (
+            chamado_id,
+            inicio.strftime("%Y-%m-%dT%H:%M"),
+            fim.strftime("%Y-%m-%dT%H:%M"),
+            rng.choice(["", "Levar roteador reserva.", "Ir com urgência."]),
+            status,
+        )
+
+
+def inserir_em_lotes(conn, sql, linhas, descricao):
+    """Insere linhas de um gerador em lotes, com commit a cada lote"""
+    inicio = time.perf_counter()
+    total = 0
+    lote = []
+    for linha in linhas:
+        lote.append(linha)
+        if len(lote) >= TAMANHO_LOTE:
+            conn.executemany(sql, lote)
+            conn.commit()
+            total += len(lote)
+            lote = []
+    if lote:
+        conn.executemany(sql, lote)
+        conn.commit()
+        total += len(lote)
+    print(f"  {descricao}: {total} registros em {time.perf_counter() - inicio:.1f}s")
+    return total
+
+
+def gerar_banco(banco, escala, semente, senha_admin):
+    if os.path.exists(banco):
+        os.remove(banco)
+
+    # Importar o app cria o esquema completo (criar_tabelas) no banco novo
+    helphub = carregar_app(banco)
+    rng = random.Random(semente)
+
+    total_clientes = max(int(VOLUMES["clientes"] * escala), 10)
+    total_chamados = max(int(VOLUMES["chamados"] * escala), 10)
+    total_agendamentos = max(int(VOLUMES["agendamentos"] * escala), 1)
+
+    print(f"Gerando banco de benchmark em {banco} (escala {escala})")
+
+    conn = sqlite3.connect(banco)
+    # Ajustes válidos apenas nesta conexão, para acelerar a carga em massa
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA journal_mode = MEMORY")
+
+    # Senha conhecida para o admin, permitindo login via HTTP (modo Gunicorn)
+    conn.execute(
+        "UPDATE usuarios SET password = ?, senha_inicial_definida = TRUE WHERE username = 'admin'",
+        (helphub.generate_password_hash(senha_admin),),
+    )
+
+    inserir_em_lotes(
+        conn,
+        "INSERT INTO departamentos (nome, descricao) VALUES (?, ?)",
+        (
+            (f"Departamento {i}", f"Equipe {i} de atendimento")
+            for i in range(1, TOTAL_DEPARTAMENTOS + 1)
+        ),
+        "departamentos",
+    )
+    inserir_em_lotes(
+        conn,
+        "INSERT INTO usuarios (username, password, role, senha_inicial_definida) VALUES (?, NULL, ?, TRUE)",
+        (
+            (f"tecnico{i}", "admin" if i % 10 == 0 else "guest")
+            for i in range(1, TOTAL_USUARIOS)
+        ),
+        "usuarios",
+    )
+    usuarios_ids = [row[0] for row in conn.execute("SELECT id FROM usuarios")]
+    inserir_em_lotes(
+        conn,
+        "INSERT INTO usuario_departamento (usuario_id, departamento_id) VALUES (?, ?)",
+        (
+            (usuario_id, departamento_id)
+            for usuario_id in usuarios_ids
+            for departamento_id in rng.sample(
+                range(1, TOTAL_DEPARTAMENTOS + 1), rng.randint(1, 3)
+            )
+        ),
+        "vínculos usuário-departamento",
+    )
+    inserir_em_lotes(
+        conn,
+        """INSERT INTO clientes (
+            nome, nome_fantasia, email, telefone, ativo, tipo_cliente, cnpj_cpf,
+            nacionalidade, cep, rua, numero, complemento, bairro, cidade, estado, pais
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        gerar_clientes(rng, total_clientes),
+        "clientes",
+    )
+    inserir_em_lotes(
+        conn,
+        """INSERT INTO chamados (
+            cliente_id, departamento_id, descricao, status, data_abertura,
+            data_fechamento, protocolo, assunto, telefone, solicitante
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        gerar_chamados(rng, total_chamados, total_clientes),
+        "chamados",
+    )
+    inserir_em_lotes(
+        conn,
+        "INSERT INTO chamados_andamentos (chamado_id, data_hora, texto, usuario_id) VALUES (?, ?, ?, ?)",
+        gerar_andamentos(rng, total_chamados, usuarios_ids),
+        "andamentos",
+    )
+    inserir_em_lotes(
+        conn,
+        """INSERT INTO agendamentos (
+            chamado_id, data_agendamento, data_final_agendamento, observacoes, status
+        ) VALUES (?, ?, ?, ?, ?)""",
+        gerar_agendamentos(rng, total_agendamentos, total_chamados),
+        "agendamentos",
+    )
+
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+    print("Banco de benchmark gerado com sucesso.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--banco", default=BANCO_PADRAO, help="Arquivo do banco")
+    parser.add_argument(
+        "--escala",
+        type=float,
+        default=0.01,
+        help="Fator sobre os volumes de referência (1.0 = 100k clientes, 1M chamados)",
+    )
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--senha-admin", default="benchmark")
+    args = parser.parse_args()
+
+    if os.path.abspath(args.banco) == os.path.abspath(
+        os.path.join(os.path.dirname(__file__), "..", "DATABASE", "database.db")
+    ):
+        sys.exit("Recusado: o gerador não pode sobrescrever o banco de produção.")
+
+    gerar_banco(args.banco, args.escala, args.semente, args.senha_admin)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,743 @@
+"""
+Verificação de orçamento de consultas SQL por endpoint (detector de N+1).
+
+Gera um banco sintético pequeno e temporário, executa cada rota da API pelo
+cliente de teste do Flask e conta as consultas SQL emitidas pela camada de
+conexão (contar_consultas em app.py). O resultado é comparado com o
+orçamento fixado para cada rota em ORCAMENTOS:
+
+- Endpoint acima do orçamento: falha (uma consulta extra por linha
+  retornada é o sintoma típico de N+1).
+- Rota registrada no app sem orçamento nem justificativa em IGNORADOS:
+  falha, para que endpoints novos não escapem da verificação.
+- Fluxos de tela (FLUXOS) também têm orçamento de requisições e de
+  consultas, pegando N+1 entre o front-end e a API.
+- A mesma consulta repetida muitas vezes numa requisição falha, a menos que
+  o orçamento da rota justifique a repetição em 'repeticoes'.
+
+Sai com código 1 se algum orçamento for excedido. As mesmas verificações rodam
+no pytest (SERVER/test_orcamento_consultas.py).
+
+Uso:
+    python BENCHMARK/orcamento_consultas.py
+    python BENCHMARK/orcamento_consultas.py --detalhes
+    python -m pytest SERVER/test_orcamento_consultas.py
+"""
+
+import os
+import sys
+import shutil
+import argparse
+import tempfile
+from collections import Counter
+
+from comum import carregar_app, cliente_admin
+from gerar_dados import gerar_banco
+
+# Escala do banco sintético (0.001 = 100 clientes, 1.000 chamados)
+ESCALA = 0.001
+
+# Número de repetições da mesma consulta numa requisição tratado como N+1
+LIMITE_REPETICOES = 3
+
+# Orçamento de consultas por rota, na ordem de execução. As rotas que alteram
+# ou excluem registros ficam no fim para não interferir nas anteriores.
+# 'max' é o número máximo de consultas SQL aceito, fixado no valor medido;
+# nas rotas autenticadas, inclui as 6 consultas feitas em before_request (o
+# usuário da sessão e as 5 da validação de integridade do banco). Rotas
+# estáticas e públicas não consultam o banco. As rotas usam conexões
+# reaproveitadas do pool, que não repetem o PRAGMA foreign_keys de uma conexão
+# nova. 'status' é o código HTTP esperado (padrão 200). 'repeticoes' justifica
+# uma consulta repetida LIMITE_REPETICOES vezes ou mais na mesma requisição.
+ORCAMENTOS = [
+    # Páginas e arquivos estáticos
+    {"metodo": "GET", "regra": "/", "rota": "/", "max": 0},
+    {"metodo": "GET", "regra": "/p/<page>", "rota": "/p/clientes", "max": 0},
+    {"metodo": "GET", "regra": "/login", "rota": "/login", "max": 0, "status": 302},
+    {"metodo": "GET", "regra": "/help", "rota": "/help", "max": 6},
+    {"metodo": "GET", "regra": "/snake", "rota": "/snake", "max": 6},
+    {"metodo": "GET", "regra": "/favicon.ico", "rota": "/favicon.ico", "max": 0},
+    {
+        "metodo": "GET",
+        "regra": "/CSS/<path:filename>",
+        "rota": "/CSS/11-navbar.css",
+        "max": 0,
+    },
+    {
+        "metodo": "GET",
+        "regra": "/css/<path:filename>",
+        "rota": "/css/11-navbar.css",
+        "max": 0,
+    },
+    {
+        "metodo": "GET",
+        "regra": "/JS/<path:filename>",
+        "rota": "/JS/01-login.js",
+        "max": 0,
+    },
+    {
+        "metodo": "GET",
+        "regra": "/js/<path:filename>",
+        "rota": "/js/01-login.js",
+        "max": 0,
+    },
+    {
+        "metodo": "GET",
+        "regra": "/html/<path:filename>",
+        "rota": "/html/11-navbar.html",
+        "max": 0,
+    },
+    {
+        "metodo": "GET",
+        "regra": "/imagens/<path:filename>",
+        "rota": "/imagens/logo.png",
+        "max": 0,
+    },
+    {
+        "metodo": "GET",
+        "regra": "/docs/<path:filename>",
+        "rota": "/docs/01-login.md",
+        "max": 0,
+    },
+    {
+        "metodo": "GET",
+        "regra": "/docs/md/<topic>",
+        "rota": "/docs/md/01-login",
+        "max": 6,
+    },
+    # Autenticação
+    {
+        "metodo": "GET",
+        "regra": "/auth/check-session",
+        "rota": "/auth/check-session",
+        "max": 7,
+    },
+    {
+        "metodo": "GET",
+        "regra": "/auth/check-role",
+        "rota": "/auth/check-role",
+        "max": 6,
+    },
+    {
+        "metodo": "GET",
+        "regra": "/auth/check-first-access",
+        "rota": "/auth/check-first-access",
+        "max": 7,
+    },
+    {
+        "metodo": "POST",
+        "regra": "/auth/renew-session",
+        "rota": "/auth/renew-session",
+        "max": 6,
+    },
+    # Clientes
+    {
+        "metodo": "GET",
+        "regra": "/clientes",
+        "rota": "/clientes?pagina=2&limite=10",
+        "max": 8,
+    },
+    {
+        "metodo": "GET",
+        "regra": "/clientes",
+        "rota": "/clientes?search=silva&pagina=1&limite=10&order_field=nome",
+        "max": 8,
+    },
+    {
+        "metodo": "GET",
+        "regra": "/clientes/buscar",
+        "rota": "/clientes/buscar?termo=a",
+        "max": 7,
+    },
+    {"metodo": "GET", "regra": "/clientes/<int:id>", "rota": "/clientes/1", "max": 7},
+    {
+        "metodo": "GET",
+        "regra": "/clientes/<int:id>/notas",
+        "rota": "/clientes/1/notas",
+        "max": 7,
+    },
+    {
+        "metodo": "POST",
+        "regra": "/clientes",
+        "rota": "/clientes",
+        "corpo": {"nome": "Cliente Orçamento", "email": "orcamento@example.com"},
+        "max": 7,
+        "status": 201,
+    },
+    {
+        "metodo": "PUT",
+        "regra": "/clientes/<int:id>",
+        "rota": "/clientes/2",
+        "corpo": {"nome": "Cliente Editado", "tipo_cliente": "Pessoa Física"},
+        "max": 7,
+    },
+    {
+        "metodo": "PUT",
+        "regra": "/clientes/<int:id>/endereco",
+        "rota": "/clientes/2/endereco",
+        "corpo": {"cep": "01001-000", "rua": "Praça da Sé", "cidade": "São Paulo"},
+        "max": 7,
+    },
+    {
+        "metodo": "POST",
+        "regra": "/clientes/<int:id>/notas",
+        "rota": "/clientes/2/notas",
+        "corpo": {"notas": "Nota de teste"},
+        "max": 9,
+    },
+    # Chamados
+    {
+        "metodo": "GET",
+        "regra": "/chamados",
+        "rota": "/chamados?status=Aberto&pagina=1&limite=10",
+        "max": 8,
+    },
+    {
+        "metodo": "GET",
+        "regra": "/chamados",
+        "rota": "/chamados?cliente_id=1&status=Aberto,Finalizado&limite=50",
+        "max": 8,
+    },
+    {
+        "metodo": "GET",
+        "regra": "/chamados/buscar",
+        "rota": "/chamados/buscar?termo=a",
+        "max": 7,
+    },
+    {
+        "metodo": "GET",
+        "regra": "/chamados/buscar-abertos",
+        "rota": "/chamados/buscar-abertos?termo=a",
+        "max": 7,
+    },
+    {"metodo": "GET", "regra": "/chamados/<int:id>", "rota": "/chamados/1", "max": 8},
+    {
+        "metodo": "GET",
+        "regra": "/chamados/<int:id>/detalhes",
+        "rota": "/chamados/1/detalhes",
+        "max": 10,
+    },
+    {
+        "metodo": "POST",
+        "regra": "/chamados",
+        "rota": "/chamados",
+        "corpo": {"cliente_id": 1, "descricao": "Chamado de teste", "assunto": "Teste"},
+        "max": 8,
+        "status": 201,
+    },
+    {
+        "metodo": "PUT",
+        "regra": "/chamados/<int:id>",
+        "rota": "/chamados/3",
+        "corpo": {"descricao": "Descrição editada", "assunto": "Editado"},
+        "max": 8,
+    },
+    {
+        "metodo": "POST",
+        "regra": "/chamados/<int:chamado_id>/andamentos",
+        "rota": "/chamados/3/andamentos",
+        "corpo": {"texto": "Andamento de teste"},
+        "max": 8,
+        "status": 201,
+    },
+    {
+        "metodo": "PUT",
+        "regra": "/chamados/<int:id>/finalizar",
+        "rota": "/chamados/4/finalizar",
+        "max": 7,
+    },
+    {
+        "metodo": "POST",
+        "regra": "/chamados/lote",
+        "rota": "/chamados/lote",
+        "corpo": {
+            "acao": "finalizar",
+            "filtro": {"status": "Aberto", "data_fim": "2024-06-30"},
+            "andamento": "Encerrado por inatividade",
+        },
+        "max": 9,
+    },
+    # Autocomplete (primeira chamada, sem cache)
+    {
+        "metodo": "GET",
+        "regra": "/autocomplete/<tipo>",
+        "rota": "/autocomplete/clientes?q=1",
+        "max": 8,
+    },
+    {
+        "metodo": "GET",
+        "regra": "/autocomplete/<tipo>",
+        "rota": "/autocomplete/chamados?q=silva",
+        "max": 7,
+    },
+    # Agendamentos e ordem de serviço
+    {"metodo": "GET", "regra": "/agendamentos", "rota": "/agendamentos", "max": 7},
+    {
+        "metodo": "GET",
+        "regra": "/agendamentos",
+        "rota": "/agendamentos?start=2024-01-01T00:00&end=2024-01-08T00:00",
+        "max": 8,
+    },
+    {
+        "metodo": "GET",
+        "regra": "/agendamentos",
+        "rota": "/agendamentos?start=2024-01-01T00:00&end=2024-01-08T00:00"
+        "&updated_since=2999-01-01%2000:00:00.000",
+        "max": 9,
+    },
+    {
+        "metodo": "POST",
+        "regra": "/agendamentos/lote",
+        "rota": "/agendamentos/lote",
+        "corpo": {
+            "recorrencia": {
+                "chamado_ids": [11, 12, 13, 14, 15],
+                "inicio": "2030-02-04T09:00",
+                "duracao": 60,
+                "frequencia": "dias_uteis",
+            }
+        },
+        "max": 14,
+        "repeticoes": (
+            "uma busca de conflitos por departamento do lote (os 5 chamados "
+            "são de departamentos diferentes), não por item"
+        ),
+        "status": 201,
+    },
+    {
+        "metodo": "GET",
+        "regra": "/agendamentos/horarios-livres",
+        "rota": "/agendamentos/horarios-livres?chamado_id=1&data=2024-01-10",
+        "max": 8,
+    },
+    {
+        "metodo": "GET",
+        "regra": "/agendamentos/<int:id>",
+        "rota": "/agendamentos/1",
+        "max": 7,
+    },
+    {
+        "metodo": "POST",
+        "regra": "/agendamentos",
+        "rota": "/agendamentos",
+        "corpo": {
+            "chamado_id": 5,
+            "data_agendamento": "2030-01-10T09:00",
+            "data_final_agendamento": "2030-01-10T10:00",
+            "observacoes": "Visita de teste",
+        },
+        "max": 10,
+        "status": 201,
+    },
+    {
+        "metodo": "PUT",
+        "regra": "/agendamentos/<int:id>",
+        "rota": "/agendamentos/1",
+        "corpo": {
+            "data_agendamento": "2030-01-11T09:00",
+            "data_final_agendamento": "2030-01-11T10:00",
+            "observacoes": "Remarcado",
+        },
+        "max": 10,
+    },
+    {
+        "metodo": "GET",
+        "regra": "/chamados/<int:chamado_id>/ordem-servico",
+        "rota": "/chamados/5/ordem-servico",
+        "max": 11,
+    },
+    {
+        "metodo": "GET",
+        "regra": "/chamados/<int:chamado_id>/ordem-servico/pdf",
+        "rota": "/chamados/5/ordem-servico/pdf",
+        "max": 9,
+    },
+    {
+        # Três consultas (chamados, andamentos, agendamentos) para todo o lote
+        "metodo": "POST",
+        "regra": "/chamados/ordem-servico/lote",
+        "rota": "/chamados/ordem-servico/lote",
+        "corpo": {"ids": [10, 20, 30], "formato": "zip"},
+        "max": 9,
+    },
+    {
+        "metodo": "POST",
+        "regra": "/chamados/<int:chamado_id>/finalizar-ordem-servico",
+        "rota": "/chamados/5/finalizar-ordem-servico",
+        "corpo": {"relatorio_visita": "Visita realizada"},
+        "max": 9,
+    },
+    # Departamentos e usuários
+    {"metodo": "GET", "regra": "/departamentos", "rota": "/departamentos", "max": 7},
+    {
+        "metodo": "GET",
+        "regra": "/departamentos/<int:dep_id>/usuarios",
+        "rota": "/departamentos/1/usuarios",
+        "max": 7,
+    },
+    {"metodo": "GET", "regra": "/usuarios", "rota": "/usuarios", "max": 7},
+    {
+        "metodo": "GET",
+        "regra": "/usuarios",
+        "rota": "/usuarios?include=departamentos",
+        "max": 7,
+    },
+    {"metodo": "GET", "regra": "/usuarios/<int:id>", "rota": "/usuarios/2", "max": 7},
+    {
+        "metodo": "GET",
+        "regra": "/usuarios/<int:user_id>/departamentos",
+        "rota": "/usuarios/2/departamentos",
+        "max": 7,
+    },
+    {
+        "metodo": "POST",
+        "regra": "/departamentos",
+        "rota": "/departamentos",
+        "corpo": {"nome": "Departamento Orçamento", "descricao": "Teste"},
+        "max": 7,
+        "status": 201,
+    },
+    {
+        "metodo": "PUT",
+        "regra": "/departamentos/<int:dep_id>",
+        "rota": "/departamentos/1",
+        "corpo": {"nome": "Departamento Renomeado", "descricao": "Teste"},
+        "max": 7,
+    },
+    {
+        "metodo": "POST",
+        "regra": "/usuarios",
+        "rota": "/usuarios",
+        "corpo": {
+            "username": "orcamento",
+            "password": "senha-orcamento",
+            "role": "guest",
+        },
+        "max": 7,
+        "status": 201,
+    },
+    {
+        "metodo": "PUT",
+        "regra": "/usuarios/<int:id>",
+        "rota": "/usuarios/3",
+        "corpo": {"username": "tecnico-editado", "role": "guest"},
+        "max": 8,
+    },
+    {
+        "metodo": "PUT",
+        "regra": "/usuarios/<int:user_id>/departamentos",
+        "rota": "/usuarios/3/departamentos",
+        "corpo": {"departamentos": [1, 2, 3]},
+        "max": 8,
+    },
+    # Estatísticas, exportação e administração do banco
+    {
+        "metodo": "GET",
+        "regra": "/estatisticas",
+        "rota": "/estatisticas?periodo=total",
+        "max": 12,
+    },
+    {
+        "metodo": "GET",
+        "regra": "/export/<format>/<table_name>",
+        "rota": "/export/csv/departamentos",
+        "max": 8,
+    },
+    {
+        "metodo": "GET",
+        "regra": "/admin/database/stats",
+        "rota": "/admin/database/stats",
+        "max": 7,
+    },
+    {
+        "metodo": "GET",
+        "regra": "/admin/database/tables",
+        "rota": "/admin/database/tables",
+        "max": 7,
+    },
+    {
+        "metodo": "GET",
+        "regra": "/admin/database/tables/<table_name>/data",
+        "rota": "/admin/database/tables/clientes/data?page=1&per_page=10",
+        "max": 9,
+    },
+    {
+        "metodo": "POST",
+        "regra": "/admin/database/tables/<table_name>/import",
+        "rota": "/admin/database/tables/departamentos/import",
+        "corpo": {
+            "mode": "append",
+            "columns": ["nome", "descricao"],
+            "data": [
+                {"nome": f"Importado {i}", "descricao": "Lote"} for i in range(20)
+            ],
+        },
+        # Todas as linhas em um executemany, dentro de um savepoint
+        "max": 11,
+    },
+    {
+        "metodo": "GET",
+        "regra": "/admin/database/slow-queries",
+        "rota": "/admin/database/slow-queries",
+        "max": 6,
+    },
+    {
+        "metodo": "DELETE",
+        "regra": "/admin/database/slow-queries",
+        "rota": "/admin/database/slow-queries",
+        "max": 6,
+    },
+    {"metodo": "GET", "regra": "/admin/profiler", "rota": "/admin/profiler", "max": 6},
+    {
+        "metodo": "POST",
+        "regra": "/admin/profiler/iniciar",
+        "rota": "/admin/profiler/iniciar",
+        "corpo": {"modo": "cprofile", "duracao": 5, "fracao": 1},
+        "max": 6,
+    },
+    {
+        "metodo": "POST",
+        "regra": "/admin/profiler/parar",
+        "rota": "/admin/profiler/parar",
+        "max": 6,
+    },
+    {
+        "metodo": "GET",
+        "regra": "/admin/profiler/resultado",
+        "rota": "/admin/profiler/resultado",
+        "max": 6,
+    },
+    {
+        "metodo": "GET",
+        "regra": "/system/backup-config",
+        "rota": "/system/backup-config",
+        "max": 7,
+    },
+    # Exclusões
+    {
+        "metodo": "DELETE",
+        "regra": "/chamados/andamentos/<int:andamento_id>",
+        "rota": "/chamados/andamentos/1",
+        "max": 7,
+    },
+    {
+        "metodo": "DELETE",
+        "regra": "/agendamentos/<int:id>",
+        "rota": "/agendamentos/2",
+        "max": 7,
+    },
+    {
+        "metodo": "DELETE",
+        "regra": "/chamados/<int:id>",
+        "rota": "/chamados/6",
+        "max": 8,
+    },
+    {
+        "metodo": "DELETE",
+        "regra": "/clientes/<int:id>",
+        "rota": "/clientes/7",
+        "max": 9,
+    },
+    {
+        "metodo": "DELETE",
+        "regra": "/usuarios/<int:id>",
+        "rota": "/usuarios/4",
+        "max": 7,
+    },
+    {
+        "metodo": "DELETE",
+        "regra": "/departamentos/<int:dep_id>",
+        "rota": "/departamentos/12",
+        "max": 7,
+    },
+]
+
+# Rotas fora da verificação, com o motivo
+IGNORADOS = {
+    ("POST", "/auth/login"): "dispara o backup diário no diretório real de backups",
+    ("GET", "/auth/logout"): "encerra a sessão usada pelas demais verificações",
+    ("GET", "/force-logout"): "encerra a sessão usada pelas demais verificações",
+    (
+        "POST",
+        "/auth/set_initial_password",
+    ): "a senha inicial do admin já está definida no banco sintético",
+    ("POST", "/system/backup-config"): "altera o diretório real de backups",
+    ("POST", "/system/backup/manual"): "grava no diretório real de backups",
+    ("GET", "/system/backups"): "lê o diretório real de backups",
+    ("GET", "/logs/<logfile>"): "lê arquivos de LOGS do ambiente",
+    (
+        "GET",
+        "/eventos",
+    ): "stream contínuo; as leituras periódicas rodam na thread do canal, uma por worker",
+    (
+        "GET",
+        "/static/<path:filename>",
+    ): "rota padrão do Flask, sem pasta static no projeto",
+}
+
+# Fluxos de tela: sequência de requisições que o front-end faz para montar
+# uma tela. 'requisicoes' recebe o cliente e retorna as rotas a chamar, pois
+# algumas dependem da resposta anterior (é aí que o N+1 costuma aparecer).
+FLUXOS = [
+    {
+        "nome": "tela de administração (usuários e departamentos)",
+        "requisicoes": lambda client: [
+            "/usuarios?include=departamentos",
+            "/departamentos",
+        ],
+        # Não pode depender do número de usuários
+        "max_requisicoes": 2,
+        "max_consultas": 14,
+    },
+    {
+        "nome": "detalhes do chamado (modal)",
+        # Antes: /chamados/<id>, /clientes/<id> e /departamentos separados
+        "requisicoes": lambda client: ["/chamados/1/detalhes"],
+        "max_requisicoes": 1,
+        "max_consultas": 10,
+    },
+]
+
+
+def regras_do_app(helphub):
+    """Retorna o conjunto (método, regra) de todas as rotas registradas"""
+    return {
+        (metodo, regra.rule)
+        for regra in helphub.app.url_map.iter_rules()
+        for metodo in regra.methods - {"HEAD", "OPTIONS"}
+    }
+
+
+def consultas_repetidas(consultas):
+    """Consultas idênticas executadas várias vezes na mesma requisição"""
+    return {
+        sql: vezes
+        for sql, vezes in Counter(consultas).items()
+        if vezes >= LIMITE_REPETICOES
+    }
+
+
+def verificar_endpoints(helphub, client, detalhes):
+    falhas = []
+    print(f"{'Método':7} {'Rota':55} {'SQL':>4} {'Máx':>4}  Situação")
+    for orcamento in ORCAMENTOS:
+        with helphub.contar_consultas() as consultas:
+            resposta = client.open(
+                orcamento["rota"],
+                method=orcamento["metodo"],
+                json=orcamento.get("corpo"),
+            )
+            resposta.get_data()
+
+        status_esperado = orcamento.get("status", 200)
+        situacao = "ok"
+        if resposta.status_code != status_esperado:
+            situacao = f"HTTP {resposta.status_code} (esperado {status_esperado})"
+            falhas.append(f"{orcamento['metodo']} {orcamento['rota']}: {situacao}")
+        elif len(consultas) > orcamento["max"]:
+            situacao = "ACIMA DO ORÇAMENTO"
+            falhas.append(
+                f"{orcamento['metodo']} {orcamento['rota']}: "
+                f"{len(consultas)} consultas (máximo {orcamento['max']})"
+            )
+
+        print(
+            f"{orcamento['metodo']:7} {orcamento['rota'][:55]:55} "
+            f"{len(consultas):4d} {orcamento['max']:4d}  {situacao}"
+        )
+        for sql, vezes in consultas_repetidas(consultas).items():
+            if orcamento.get("repeticoes"):
+                print(
+                    f"{'':8}repetida {vezes}x ({orcamento['repeticoes']}): {sql[:60]}"
+                )
+                continue
+            print(f"{'':8}possível N+1, consulta repetida {vezes}x: {sql[:90]}")
+            falhas.append(
+                f"{orcamento['metodo']} {orcamento['rota']}: "
+                f"consulta repetida {vezes}x: {sql[:60]}"
+            )
+        if detalhes:
+            for sql in consultas:
+                print(f"{'':8}{sql[:110]}")
+    return falhas
+
+
+def verificar_fluxos(helphub, client):
+    falhas = []
+    print()
+    print(f"{'Fluxo':55} {'Req':>4} {'SQL':>5}")
+    for fluxo in FLUXOS:
+        rotas = fluxo["requisicoes"](client)
+        with helphub.contar_consultas() as consultas:
+            for rota in rotas:
+                client.get(rota).get_data()
+
+        situacao = "ok"
+        if len(rotas) > fluxo["max_requisicoes"]:
+            situacao = "ACIMA DO ORÇAMENTO"
+            falhas.append(
+                f"fluxo '{fluxo['nome']}': {len(rotas)} requisições "
+                f"(máximo {fluxo['max_requisicoes']})"
+            )
+        if len(consultas) > fluxo["max_consultas"]:
+            situacao = "ACIMA DO ORÇAMENTO"
+            falhas.append(
+                f"fluxo '{fluxo['nome']}': {len(consultas)} consultas "
+                f"(máximo {fluxo['max_consultas']})"
+            )
+        print(
+            f"{fluxo['nome'][:55]:55} {len(rotas):4d} {len(consultas):5d}  {situacao}"
+        )
+    return falhas
+
+
+def verificar_cobertura(helphub):
+    """Toda rota do app precisa de orçamento ou de justificativa em IGNORADOS"""
+    cobertas = {(o["metodo"], o["regra"]) for o in ORCAMENTOS} | set(IGNORADOS)
+    registradas = regras_do_app(helphub)
+    falhas = [
+        f"{metodo} {regra}: rota sem orçamento de consultas"
+        for metodo, regra in sorted(registradas - cobertas)
+    ]
+    falhas += [
+        f"{metodo} {regra}: orçamento para rota inexistente"
+        for metodo, regra in sorted(cobertas - registradas)
+    ]
+    return falhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--detalhes",
+        action="store_true",
+        help="Lista as consultas executadas em cada requisição",
+    )
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp(prefix="helphub-orcamento-")
+    try:
+        banco = os.path.join(diretorio, "orcamento.db")
+        gerar_banco(banco, ESCALA, semente=42, senha_admin="benchmark")
+        helphub = carregar_app(banco)
+        print()
+
+        falhas = verificar_cobertura(helphub)
+        client = cliente_admin(helphub)
+        falhas += verificar_fluxos(helphub, client)
+        print()
+        falhas += verificar_endpoints(helphub, client, args.detalhes)
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+    print()
+    if falhas:
+        print(f"{len(falhas)} falha(s):")
+        for falha in falhas:
+            print(f"  - {falha}")
+        sys.exit(1)
+    print("Todos os endpoints dentro do orçamento de consultas.")
+
+
+if __name__ == "__main__":
+    main()
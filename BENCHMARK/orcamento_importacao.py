@@ -0,0 +1,180 @@
+"""
+Verificação de orçamento de importação do app.py (partida a frio dos workers).
+
+Mede, em processos novos, a importação do app.py como acontece em um worker
+do Gunicorn (inicialização leve, com o banco já inicializado), usando
+'python -X importtime':
+
+- Tempo total de importação (mediana das repetições): falha acima de
+  ORCAMENTO_IMPORTACAO_MS.
+- Memória (pico de RSS) do processo após a importação: falha acima de
+  ORCAMENTO_RSS_MB.
+- Módulos pesados usados apenas por algumas rotas (MODULOS_SOB_DEMANDA) não
+  podem ser carregados na importação: devem ser importados no primeiro uso
+  (ou pré-carregados no master do Gunicorn, com preload_app).
+
+Os orçamentos foram fixados com folga sobre a medição de referência (cerca de
+270 ms e 40 MB em 1 CPU; antes da importação sob demanda, 540 ms e 57 MB) e
+podem ser ajustados para máquinas mais lentas com --limite-ms e
+--limite-rss-mb.
+
+Sai com código 1 se algum orçamento for excedido.
+
+Uso:
+    python BENCHMARK/orcamento_importacao.py
+    python BENCHMARK/orcamento_importacao.py --repeticoes 9 --detalhes
+"""
+
+import os
+import re
+import sys
+import shutil
+import argparse
+import statistics
+import tempfile
+import subprocess
+
+from comum import SERVER_DIR
+
+# Tempo máximo de importação do app.py em um worker (ms)
+ORCAMENTO_IMPORTACAO_MS = 400
+
+# Pico de memória máximo do processo após importar o app.py (MB)
+ORCAMENTO_RSS_MB = 48
+
+# Módulos que não podem ser carregados ao importar o app.py -> onde são usados
+MODULOS_SOB_DEMANDA = {
+    "openpyxl": "exportação de tabelas em XLSX",
+    "reportlab": "PDF da ordem de serviço",
+    "PIL": "build dos estáticos (compilar_estaticos.py)",
+}
+
+# Importa o app e informa o pico de memória (ru_maxrss, em KB no Linux)
+SCRIPT_MEDICAO = (
+    "import resource, app; print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+)
+
+# Linha do -X importtime: "import time: self | cumulativo | <indentação>módulo"
+LINHA_IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def executar(banco, argumentos, ambiente_extra=None):
+    ambiente = dict(
+        os.environ,
+        HELPHUB_DATABASE=banco,
+        HELPHUB_PDF_CACHE=os.path.join(os.path.dirname(banco), "cache_pdf"),
+        **(ambiente_extra or {}),
+    )
+    return subprocess.run(
+        [sys.executable, *argumentos],
+        cwd=SERVER_DIR,
+        env=ambiente,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def medir_importacao(banco, marcador):
+    """Importa o app.py em um processo novo, como um worker já inicializado"""
+    processo = executar(
+        banco,
+        ["-X", "importtime", "-c", SCRIPT_MEDICAO],
+        {"HELPHUB_INICIALIZADO": marcador},
+    )
+    modulos = {}
+    diretos = {}
+    # A saída lista cada módulo depois dos que ele importou: os de um nível de
+    # indentação acumulados até a linha do app são os importados por ele
+    pendentes = {}
+    for linha in processo.stderr.splitlines():
+        encontrado = LINHA_IMPORTTIME.match(linha)
+        if not encontrado:
+            continue
+        cumulativo_us = int(encontrado.group(2))
+        nivel = len(encontrado.group(3)) // 2
+        nome = encontrado.group(4)
+        modulos[nome] = cumulativo_us
+        if nivel == 1:
+            pendentes[nome] = cumulativo_us
+        elif nivel == 0:
+            if nome == "app":
+                diretos = pendentes
+            pendentes = {}
+    if "app" not in modulos:
+        raise RuntimeError("app.py não apareceu na saída do -X importtime")
+    return {
+        "total_ms": modulos["app"] / 1000,
+        "rss_mb": int(processo.stdout.split()[-1]) / 1024,
+        "modulos": set(modulos),
+        "diretos": diretos,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--limite-ms", type=float, default=ORCAMENTO_IMPORTACAO_MS)
+    parser.add_argument("--limite-rss-mb", type=float, default=ORCAMENTO_RSS_MB)
+    parser.add_argument(
+        "--detalhes",
+        action="store_true",
+        help="Lista os módulos importados diretamente pelo app.py mais lentos",
+    )
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp(prefix="helphub-importacao-")
+    try:
+        banco = os.path.join(diretorio, "importacao.db")
+        # Inicialização única (esquema e chave secreta), como no master do Gunicorn;
+        # também compila os .pyc, para que as medições não incluam a compilação
+        inicializacao = executar(banco, ["app.py", "--inicializar"])
+        marcador = inicializacao.stdout.strip().splitlines()[-1]
+        medicoes = [medir_importacao(banco, marcador) for _ in range(args.repeticoes)]
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+    total_ms = statistics.median(m["total_ms"] for m in medicoes)
+    rss_mb = statistics.median(m["rss_mb"] for m in medicoes)
+    carregados = set.union(*(m["modulos"] for m in medicoes))
+
+    print(
+        f"Importação do app.py: {total_ms:.0f} ms (orçamento {args.limite_ms:.0f} ms), "
+        f"mediana de {len(medicoes)} execuções"
+    )
+    print(
+        f"Pico de memória:      {rss_mb:.1f} MB (orçamento {args.limite_rss_mb:.0f} MB)"
+    )
+
+    if args.detalhes:
+        diretos = medicoes[-1]["diretos"]
+        print("\nMódulos importados pelo app.py (cumulativo, última execução):")
+        for nome, cumulativo_us in sorted(diretos.items(), key=lambda i: -i[1])[:15]:
+            print(f"  {cumulativo_us / 1000:8.1f} ms  {nome}")
+
+    falhas = []
+    if total_ms > args.limite_ms:
+        falhas.append(
+            f"importação em {total_ms:.0f} ms (orçamento {args.limite_ms:.0f} ms)"
+        )
+    if rss_mb > args.limite_rss_mb:
+        falhas.append(
+            f"pico de memória de {rss_mb:.1f} MB (orçamento {args.limite_rss_mb:.0f} MB)"
+        )
+    for modulo, uso in MODULOS_SOB_DEMANDA.items():
+        if modulo in carregados:
+            falhas.append(
+                f"'{modulo}' carregado na importação (deve ser importado no primeiro uso: {uso})"
+            )
+
+    print()
+    if falhas:
+        print(f"{len(falhas)} falha(s):")
+        for falha in falhas:
+            print(f"  - {falha}")
+        sys.exit(1)
+    print("Importação do app.py dentro do orçamento.")
+
+
+if __name__ == "__main__":
+    main()
@@ -176,8 +176,8 @@ function configurarBuscaClientes() {
  */
 async function buscarClientesAjax(termo) {
     try {
-        const response = await fetch(`/clientes/buscar?termo=${encodeURIComponent(termo)}`);
-        const clientes = await response.json();
+        const response = await fetch(`/autocomplete/clientes?q=${encodeURIComponent(termo)}&limite=5`);
+        const clientes = (await response.json()).itens || [];
         const resultadoBusca = document.getElementById('resultado-busca');
         if (!resultadoBusca) {
             return;
@@ -195,9 +195,9 @@ async function buscarClientesAjax(termo) {
                 item.innerHTML = `
                     <div class="d-flex justify-content-between align-items-center">
                         <div>
-                            <strong>${cliente.nome}</strong>
+                            <strong>${cliente.label}</strong>
                             <br>
-                            <small class="text-muted">ID: ${cliente.id}${cliente.email ? ' | ' + cliente.email : ''}</small>
+                            <small class="text-muted">ID: ${cliente.id}${cliente.detalhe ? ' | ' + cliente.detalhe : ''}</small>
                         </div>
                     </div>
                 `;
@@ -216,6 +216,36 @@ async function buscarClientesAjax(termo) {
     }
 }
 
+/**
+ * Atualiza as estatísticas quando chamados ou clientes mudam, avisado pelo
+ * canal de eventos do servidor; sem o canal, usa o ciclo periódico
+ */
+function configurarAtualizacaoAutomatica() {
+    if (!window.HelpHubEventos || !window.HelpHubEventos.disponivel) {
+        startAutoRefresh();
+        return;
+    }
+    let pendente = false;
+    let timer = null;
+    const atualizar = () => {
+        // Aba oculta: atualiza só quando voltar a ficar visível
+        if (document.visibilityState !== 'visible') {
+            pendente = true;
+            return;
+        }
+        pendente = false;
+        // Agrupa rajadas de alterações (ex.: operações em massa) em uma atualização
+        clearTimeout(timer);
+        timer = setTimeout(() => {
+            carregarEstatisticas(document.getElementById('periodo-estatisticas')?.value || 'total');
+        }, 2000);
+    };
+    ['chamados', 'clientes', 'ressincronizar'].forEach(tipo => window.HelpHubEventos.on(tipo, atualizar));
+    document.addEventListener('visibilitychange', () => {
+        if (pendente) atualizar();
+    });
+}
+
 /**
  * Inicia o ciclo de atualização automática das estatísticas
  */
@@ -332,6 +362,7 @@ document.addEventListener('DOMContentLoaded', function () {
         });
     }
     configurarBuscaClientes(); // Adicionado para configurar a busca de clientes ao carregar a página
+    configurarAtualizacaoAutomatica();
     // --- BUSCA DE CLIENTES HOME ---
     const searchInput = document.getElementById('busca-cliente');
     const clearBtn = document.getElementById('clear-search');
@@ -368,10 +399,10 @@ window.carregarEstatisticas = carregarEstatisticas;
 window.abrirDetalhesChamado = async function (id) {
     try {
         showLoading();
-        const resp = await fetch(`/chamados/${id}`);
+        const resp = await fetch(`/chamados/${id}/detalhes`);
         const data = await resp.json();
         if (!data.erro && typeof mostrarModalChamado === 'function') {
-            mostrarModalChamado(data);
+            mostrarModalChamado(data.chamado);
         } else {
             alert('Não foi possível abrir o chamado.');
         }
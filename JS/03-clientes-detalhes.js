@@ -201,18 +201,19 @@ document.addEventListener('DOMContentLoaded', function () {
     }
 
     // Carregar chamados do cliente na aba de Chamados
-    async function carregarChamadosCliente() {
+    const limiteChamadosCliente = 50;
+    let paginaChamadosCliente = 1;
+    let chamadosCliente = [];
+    async function carregarChamadosCliente(pagina = 1) {
         if (!id) return;
         try {
-            // Buscar todos os chamados do cliente (status aberto e finalizado)
-            const resAbertos = await fetch(`/chamados?cliente_id=${id}&status=Aberto&limite=100`);
-            const resFinalizados = await fetch(`/chamados?cliente_id=${id}&status=Finalizado&limite=100`);
-            const dataAbertos = await resAbertos.json();
-            const dataFinalizados = await resFinalizados.json();
-            const chamados = [...(dataAbertos.chamados || []), ...(dataFinalizados.chamados || [])];
-
-            // Filtrar apenas chamados do cliente atual
-            const chamadosCliente = chamados.filter(chamado => String(chamado[1]) === String(id));
+            // Chamados do cliente (abertos e finalizados) em uma única requisição, paginada
+            const res = await fetch(`/chamados?cliente_id=${id}&status=Aberto,Finalizado&pagina=${pagina}&limite=${limiteChamadosCliente}`);
+            const data = await res.json();
+            if (!res.ok) throw new Error(data.erro || 'Erro ao carregar chamados');
+            paginaChamadosCliente = pagina;
+            chamadosCliente = pagina === 1 ? (data.chamados || []) : [...chamadosCliente, ...(data.chamados || [])];
+            const totalPorStatus = data.total_por_status || {};
 
             let html = `<h5 class='mb-3'>Chamados do Cliente</h5>`;
             html += `<div class='d-flex justify-content-end mb-2'><a href='/p/chamados-cadastro?cliente_id=${id}' class='btn btn-primary'><i class='bi bi-plus-circle'></i> Novo Chamado</a></div>`;
@@ -225,12 +226,17 @@ document.addEventListener('DOMContentLoaded', function () {
                     html += `<tr><td>${chamado[6]}</td><td>${statusBadge}</td><td>${formatarDataHora(chamado[4])}</td><td>${chamado[7] || ''}</td><td><a href='/p/chamados?chamado_id=${chamado[0]}' class='btn btn-info btn-sm'>Ver Detalhes</a></td></tr>`;
                 });
                 html += `</tbody></table></div>`;
-                // Resumo
-                const abertos = chamadosCliente.filter(c => c[3] === 'Aberto').length;
-                const finalizados = chamadosCliente.filter(c => c[3] === 'Finalizado').length;
-                html += `<div class='mt-3'><strong>Total de chamados:</strong> ${chamadosCliente.length}<br><strong>Chamados abertos:</strong> ${abertos}<br><strong>Chamados finalizados:</strong> ${finalizados}</div>`;
+                if (paginaChamadosCliente < (data.total_paginas || 1)) {
+                    html += `<div class='text-center mb-2'><button class='btn btn-outline-primary btn-sm' id='btn-mais-chamados-cliente'>Carregar mais (${chamadosCliente.length} de ${data.total})</button></div>`;
+                }
+                // Resumo (totais calculados no servidor, independentes da paginação)
+                html += `<div class='mt-3'><strong>Total de chamados:</strong> ${data.total}<br><strong>Chamados abertos:</strong> ${totalPorStatus['Aberto'] || 0}<br><strong>Chamados finalizados:</strong> ${totalPorStatus['Finalizado'] || 0}</div>`;
             }
             document.getElementById('chamados-cliente-content').innerHTML = html;
+            const btnMais = document.getElementById('btn-mais-chamados-cliente');
+            if (btnMais) {
+                btnMais.addEventListener('click', () => carregarChamadosCliente(paginaChamadosCliente + 1));
+            }
         } catch (e) {
             document.getElementById('chamados-cliente-content').innerHTML = `<div class='alert alert-danger'>Erro ao carregar chamados do cliente.</div>`;
         }
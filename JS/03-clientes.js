@@ -133,22 +133,16 @@ async function carregarClientesPage() {
 async function carregarClientes() {
     try {
         showLoading();
-        let url, dados;
+        // A busca é feita no servidor, mantendo ordenação e paginação
+        let url = `/clientes?pagina=${paginaAtualClientes}&limite=${clientesPorPagina}&order_field=${ordemColuna}&order_order=${ordemDirecao}`;
         if (termoPesquisaClientes) {
-            url = `/clientes/buscar?termo=${encodeURIComponent(termoPesquisaClientes)}`;
-            const resposta = await fetch(url);
-            if (!resposta.ok) throw new Error('Erro ao buscar clientes');
-            const resultado = await resposta.json();
-            clientes = (Array.isArray(resultado) ? resultado : resultado.clientes) || [];
-            totalPaginasClientes = 1;
-        } else {
-            url = `/clientes?pagina=${paginaAtualClientes}&limite=${clientesPorPagina}&order_field=${ordemColuna}&order_order=${ordemDirecao}`;
-            const resposta = await fetch(url);
-            if (!resposta.ok) throw new Error('Erro ao carregar clientes');
-            dados = await resposta.json();
-            clientes = dados.clientes || [];
-            totalPaginasClientes = Math.max(1, Math.ceil((dados.total || 0) / clientesPorPagina));
+            url += `&search=${encodeURIComponent(termoPesquisaClientes)}`;
         }
+        const resposta = await fetch(url);
+        if (!resposta.ok) throw new Error('Erro ao carregar clientes');
+        const dados = await resposta.json();
+        clientes = dados.clientes || [];
+        totalPaginasClientes = Math.max(1, Math.ceil((dados.total || 0) / clientesPorPagina));
         renderizarClientes();
         atualizarPaginacaoClientes();
     } catch (erro) {
@@ -242,7 +236,6 @@ function configurarPesquisaClientes() {
             termoPesquisaClientes = e.target.value.trim();
             paginaAtualClientes = 1;
             carregarClientes();
-            document.getElementById('paginacao-clientes').style.display = termoPesquisaClientes ? 'none' : '';
         }, 300);
     });
 }
@@ -372,7 +365,6 @@ function atualizarPaginacaoClientes() {
     paginacao.querySelector('.page-info').textContent = `Página ${paginaAtualClientes} de ${totalPaginasClientes}`;
     paginacao.querySelector('#btn-pagina-anterior').disabled = paginaAtualClientes === 1;
     paginacao.querySelector('#btn-proxima-pagina').disabled = paginaAtualClientes === totalPaginasClientes;
-    paginacao.style.display = termoPesquisaClientes ? 'none' : '';
 
     // Após atualizar, reconfigurar paginação
     configurarPaginacaoClientes();
@@ -42,10 +42,10 @@ window.addEventListener('DOMContentLoaded', () => {
     const chamadoId = params.get('chamado_id') || params.get('id');
     if (chamadoId) {
         setTimeout(() => {
-            fetch(`/chamados/${chamadoId}`)
+            fetch(`/chamados/${chamadoId}/detalhes`)
                 .then(r => r.json())
                 .then(data => {
-                    if (!data.erro) mostrarModalChamado(data);
+                    if (!data.erro) mostrarModalChamado(data.chamado, data.departamentos);
                 });
         }, 500);
     }
@@ -234,11 +234,12 @@ function sortChamados(field) {
 function abrirDetalhesChamado(id) {
     if (id) {
         currentChamadoId = id;
-        fetch(`/chamados/${id}`)
+        // Chamado, cliente e departamentos em uma única requisição
+        fetch(`/chamados/${id}/detalhes`)
             .then(res => res.json())
             .then(data => {
-                if (data && data.id) {
-                    mostrarModalChamado(data);
+                if (data && data.chamado) {
+                    mostrarModalChamado(data.chamado, data.departamentos);
                 } else {
                     exibirMensagem('Detalhes do chamado não encontrados', 'erro');
                 }
@@ -252,7 +253,8 @@ function abrirDetalhesChamado(id) {
 }
 
 // Função para exibir os detalhes do chamado em um modal aprimorado
-function mostrarModalChamado(chamado) {
+// (departamentos pode vir junto da rota /chamados/<id>/detalhes)
+function mostrarModalChamado(chamado, departamentos = null) {
     let modal = document.getElementById('modal-detalhe-chamado');
     if (!modal) {
         modal = document.createElement('div');
@@ -292,8 +294,9 @@ function mostrarModalChamado(chamado) {
         </div>`;
     // Preencher campos principais
     // Carregar departamentos para o dropdown
-    let departamentosDisponiveis = [];
+    let departamentosDisponiveis = departamentos || [];
     async function getDepartamentos() {
+        if (departamentos) return;
         try {
             const resp = await fetch('/departamentos');
             if (resp.ok) {
@@ -672,23 +675,23 @@ function configurarBuscaClienteChamado() {
         if (termo.length < 2) return;
         showLoading();
         try {
-            const res = await fetch(`/clientes/buscar?termo=${encodeURIComponent(termo)}`);
+            const res = await fetch(`/autocomplete/clientes?q=${encodeURIComponent(termo)}`);
             const data = await res.json();
-            clientesEncontrados = data;
+            clientesEncontrados = data.itens || [];
             if (clientesEncontrados.length === 0) {
                 resultados.innerHTML = '<div class="list-group-item text-muted">Nenhum cliente encontrado</div>';
                 return;
             }
             resultados.innerHTML = clientesEncontrados.map((c, i) =>
                 `<button type="button" class="list-group-item list-group-item-action" data-index="${i}">
-                    <strong>${c.nome}</strong> <span class="text-muted">${c.email || ''}</span>
+                    <strong>${c.label}</strong> <span class="text-muted">${c.detalhe || ''}</span>
                 </button>`
             ).join('');
             // Clique para selecionar
             resultados.querySelectorAll('button').forEach(btn => {
                 btn.onclick = function () {
                     const idx = parseInt(this.getAttribute('data-index'));
-                    input.value = clientesEncontrados[idx].nome;
+                    input.value = clientesEncontrados[idx].label;
                     hiddenId.value = clientesEncontrados[idx].id;
                     resultados.innerHTML = '';
                 };
@@ -2,6 +2,14 @@
 let currentAgendamentoId = null;
 let chamadoSelecionadoId = null;
 let userRole = null;
+let calendario = null;
+
+// Sincronização incremental da agenda: período carregado e token da última leitura
+const INTERVALO_SINCRONIZACAO_AGENDA = 60000; // Só sem o canal de eventos do servidor
+const ESPERA_SINCRONIZACAO_EVENTO = 1000; // Agrupa rajadas de alterações em uma sincronização
+let agendaSincronizacao = null;
+let timerSincronizacaoAgenda = null;
+let sincronizacaoAgendaIniciada = false;
 
 // Inicialização ao carregar a página
 window.addEventListener('DOMContentLoaded', () => {
@@ -17,7 +25,7 @@ window.addEventListener('DOMContentLoaded', () => {
 function configurarCalendario() {
     const calendarEl = document.getElementById('calendario');
     if (!calendarEl) return;
-    const calendar = new FullCalendar.Calendar(calendarEl, {
+    const calendar = calendario = new FullCalendar.Calendar(calendarEl, {
         initialView: 'timeGridWeek',
         locale: 'pt-br',
         firstDay: 1,
@@ -53,15 +61,10 @@ function configurarCalendario() {
             const data_agendamento = info.event.startStr.slice(0, 16);
             const data_final_agendamento = info.event.endStr ? info.event.endStr.slice(0, 16) : data_agendamento;
             try {
-                const response = await fetch(`/agendamentos/${agendamentoId}`, {
-                    method: 'PUT',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({
-                        data_agendamento,
-                        data_final_agendamento
-                    })
+                const { response, data } = await enviarAgendamento(`/agendamentos/${agendamentoId}`, 'PUT', {
+                    data_agendamento,
+                    data_final_agendamento
                 });
-                const data = await response.json();
                 if (!response.ok) {
                     exibirMensagem(data.erro || 'Erro ao mover agendamento', 'erro');
                     info.revert();
@@ -74,11 +77,12 @@ function configurarCalendario() {
             }
         },
         events: function (fetchInfo, successCallback, failureCallback) {
-            carregarAgendamentos(successCallback, failureCallback);
+            carregarAgendamentos(fetchInfo, successCallback, failureCallback);
         },
         allDaySlot: false,
     });
     calendar.render();
+    iniciarSincronizacaoAgenda();
 }
 
 // Tooltip customizado para eventos
@@ -165,11 +169,11 @@ function configurarBuscaChamadosAgendamento() {
             return;
         }
         try {
-            const resp = await fetch(`/chamados/buscar?termo=${encodeURIComponent(termo)}`);
+            const resp = await fetch(`/autocomplete/chamados?q=${encodeURIComponent(termo)}`);
             const data = await resp.json();
-            lista.innerHTML = data.chamados.map(chamado => `
-                <a href="#" class="list-group-item list-group-item-action" data-id="${chamado[0]}" data-protocolo="${chamado[6]}" data-cliente="${chamado[10]}" onclick="selecionarChamadoAgendamento(event, this)">
-                    #${chamado[0]} - ${chamado[10] || 'Cliente removido'} - ${chamado[7] || ''}
+            lista.innerHTML = (data.itens || []).map(chamado => `
+                <a href="#" class="list-group-item list-group-item-action" data-id="${chamado.id}" data-protocolo="${chamado.protocolo}" data-cliente="${chamado.cliente}" onclick="selecionarChamadoAgendamento(event, this)">
+                    ${chamado.label}
                 </a>
             `).join('');
         } catch (e) {
@@ -209,22 +213,16 @@ async function salvarAgendamento() {
         return;
     }
     try {
-        const response = await fetch('/agendamentos', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({
-                chamado_id: chamadoSelecionadoId,
-                data_agendamento: dataAgendamento,
-                data_final_agendamento: dataFinalAgendamento,
-                observacoes
-            })
+        const { response, data } = await enviarAgendamento('/agendamentos', 'POST', {
+            chamado_id: chamadoSelecionadoId,
+            data_agendamento: dataAgendamento,
+            data_final_agendamento: dataFinalAgendamento,
+            observacoes
         });
-        const data = await response.json();
         if (response.ok) {
             exibirMensagem('Agendamento criado com sucesso!');
             bootstrap.Modal.getInstance(document.getElementById('agendamentoModal')).hide();
-            document.getElementById('calendario').innerHTML = '';
-            configurarCalendario();
+            sincronizarAgenda();
         } else {
             exibirMensagem(data.erro || 'Erro ao criar agendamento', 'erro');
         }
@@ -233,36 +231,130 @@ async function salvarAgendamento() {
     }
 }
 
-// Carrega agendamentos do backend
-async function carregarAgendamentos(successCallback, failureCallback) {
+// Envia um agendamento (criação ou alteração). Em conflito de horário no
+// departamento, mostra as visitas do período e permite agendar mesmo assim.
+async function enviarAgendamento(url, method, dados) {
+    const enviar = async corpo => {
+        const response = await fetch(url, {
+            method,
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(corpo)
+        });
+        return { response, data: await response.json() };
+    };
+    const resultado = await enviar(dados);
+    const conflitos = resultado.data && resultado.data.conflitos;
+    if (resultado.response.status !== 409 || !Array.isArray(conflitos)) return resultado;
+
+    const visitas = conflitos
+        .map(c => `• ${c.protocolo || 'Chamado'}: ${formatarData(c.data_inicio)} até ${formatarData(c.data_fim)}`)
+        .join('\n');
+    if (!confirm(`${resultado.data.erro}\n\nVisitas no período:\n${visitas}\n\nDeseja agendar mesmo assim?`)) {
+        return resultado;
+    }
+    return enviar({ ...dados, forcar: true });
+}
+
+// Converte um agendamento da API em evento do FullCalendar
+function converterAgendamentoEmEvento(agendamento) {
+    return {
+        id: agendamento.id,
+        title: `Visita Técnica - ${agendamento.protocolo}`,
+        start: agendamento.data_agendamento,
+        end: agendamento.data_final_agendamento,
+        backgroundColor: agendamento.chamado_status === 'Finalizado' ? '#28a745' : '#0d6efd',
+        borderColor: agendamento.chamado_status === 'Finalizado' ? '#28a745' : '#0d6efd',
+        extendedProps: {
+            cliente_nome: agendamento.cliente_nome,
+            assunto: agendamento.assunto,
+            endereco: agendamento.endereco,
+            cliente_telefone: agendamento.cliente_telefone,
+            chamado_status: agendamento.chamado_status,
+            protocolo: agendamento.protocolo,
+            chamado_id: agendamento.chamado_id,
+            departamento_nome: agendamento.departamento_nome,
+            observacoes: agendamento.observacoes
+        }
+    };
+}
+
+// Carrega do backend apenas os agendamentos do período visível no calendário
+async function carregarAgendamentos(fetchInfo, successCallback, failureCallback) {
     try {
-        const response = await fetch('/agendamentos');
+        const params = new URLSearchParams({ start: fetchInfo.startStr, end: fetchInfo.endStr });
+        const response = await fetch(`/agendamentos?${params}`);
         if (!response.ok) throw new Error('Falha ao carregar agendamentos');
-        const agendamentos = await response.json();
-        const eventos = agendamentos.map(agendamento => ({
-            id: agendamento.id,
-            title: `Visita Técnica - ${agendamento.protocolo}`,
-            start: agendamento.data_agendamento,
-            end: agendamento.data_final_agendamento,
-            backgroundColor: agendamento.chamado_status === 'Finalizado' ? '#28a745' : '#0d6efd',
-            borderColor: agendamento.chamado_status === 'Finalizado' ? '#28a745' : '#0d6efd',
-            extendedProps: {
-                cliente_nome: agendamento.cliente_nome,
-                assunto: agendamento.assunto,
-                endereco: agendamento.endereco,
-                cliente_telefone: agendamento.cliente_telefone,
-                chamado_status: agendamento.chamado_status,
-                protocolo: agendamento.protocolo,
-                chamado_id: agendamento.chamado_id,
-                departamento_nome: agendamento.departamento_nome
-            }
-        }));
-        successCallback(eventos);
+        const data = await response.json();
+        agendaSincronizacao = {
+            start: fetchInfo.startStr,
+            end: fetchInfo.endStr,
+            token: data.sincronizado_em
+        };
+        successCallback(data.agendamentos.map(converterAgendamentoEmEvento));
     } catch (error) {
         failureCallback(error);
     }
 }
 
+// Busca apenas o que mudou no período desde a última leitura e atualiza os eventos
+async function sincronizarAgenda() {
+    if (!calendario || !agendaSincronizacao) return;
+    const { start, end, token } = agendaSincronizacao;
+    try {
+        const params = new URLSearchParams({ start, end, updated_since: token });
+        const response = await fetch(`/agendamentos?${params}`);
+        if (response.status === 410) {
+            // Sincronização antiga demais: recarrega o período inteiro
+            calendario.refetchEvents();
+            return;
+        }
+        if (!response.ok) return;
+        const data = await response.json();
+        // O período pode ter mudado durante a requisição (navegação no calendário)
+        if (agendaSincronizacao.start !== start || agendaSincronizacao.end !== end) return;
+
+        const fonte = calendario.getEventSources()[0];
+        calendario.batchRendering(() => {
+            [...data.removidos, ...data.agendamentos.map(a => a.id)].forEach(id => {
+                const evento = calendario.getEventById(id);
+                if (evento) evento.remove();
+            });
+            data.agendamentos.forEach(agendamento => {
+                calendario.addEvent(converterAgendamentoEmEvento(agendamento), fonte);
+            });
+        });
+        agendaSincronizacao.token = data.sincronizado_em;
+    } catch (error) {
+        console.error('Erro ao sincronizar agenda:', error);
+    }
+}
+
+// Sincroniza quando o servidor avisa de alterações (canal de eventos) ou,
+// sem o canal, periodicamente enquanto a aba estiver visível
+function iniciarSincronizacaoAgenda() {
+    if (sincronizacaoAgendaIniciada) return;
+    sincronizacaoAgendaIniciada = true;
+    if (window.HelpHubEventos && window.HelpHubEventos.disponivel) {
+        const sincronizarEmBreve = () => {
+            if (document.hidden) return; // Sincroniza ao voltar para a aba
+            clearTimeout(timerSincronizacaoAgenda);
+            timerSincronizacaoAgenda = setTimeout(sincronizarAgenda, ESPERA_SINCRONIZACAO_EVENTO);
+        };
+        // Chamados e clientes também aparecem nos eventos do calendário
+        ['agendamentos', 'chamados', 'clientes'].forEach(tipo => {
+            window.HelpHubEventos.on(tipo, sincronizarEmBreve);
+        });
+        window.HelpHubEventos.on('ressincronizar', () => calendario.refetchEvents());
+    } else {
+        timerSincronizacaoAgenda = setInterval(() => {
+            if (!document.hidden) sincronizarAgenda();
+        }, INTERVALO_SINCRONIZACAO_AGENDA);
+    }
+    document.addEventListener('visibilitychange', () => {
+        if (!document.hidden) sincronizarAgenda();
+    });
+}
+
 // Abre modal de detalhes do agendamento
 function abrirModalDetalhesAgendamento(event) {
     const content = document.getElementById('detalhes-agendamento-content');
@@ -333,8 +425,7 @@ function abrirModalDetalhesAgendamento(event) {
                     if (resp.ok) {
                         exibirMensagem('Ordem de serviço finalizada com sucesso!');
                         bootstrap.Modal.getInstance(document.getElementById('agendamentoDetalhesModal')).hide();
-                        document.getElementById('calendario').innerHTML = '';
-                        configurarCalendario();
+                        sincronizarAgenda();
                     } else {
                         exibirMensagem(data.erro || 'Erro ao finalizar ordem de serviço', 'erro');
                     }
@@ -372,8 +463,7 @@ async function excluirAgendamentoModal(id) {
         if (response.ok) {
             exibirMensagem('Agendamento excluído com sucesso!');
             bootstrap.Modal.getInstance(document.getElementById('agendamentoDetalhesModal')).hide();
-            document.getElementById('calendario').innerHTML = '';
-            configurarCalendario();
+            sincronizarAgenda();
         } else {
             exibirMensagem('Erro ao excluir agendamento', 'erro');
         }
@@ -439,21 +529,15 @@ function abrirModalEdicaoAgendamento(event) {
             return;
         }
         try {
-            const response = await fetch(`/agendamentos/${event.id}`, {
-                method: 'PUT',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({
-                    data_agendamento: dataAgendamento,
-                    data_final_agendamento: dataFinalAgendamento,
-                    observacoes
-                })
+            const { response, data } = await enviarAgendamento(`/agendamentos/${event.id}`, 'PUT', {
+                data_agendamento: dataAgendamento,
+                data_final_agendamento: dataFinalAgendamento,
+                observacoes
             });
-            const data = await response.json();
             if (response.ok) {
                 exibirMensagem('Agendamento atualizado com sucesso!');
                 bootstrap.Modal.getInstance(document.getElementById('agendamentoModal')).hide();
-                document.getElementById('calendario').innerHTML = '';
-                configurarCalendario();
+                sincronizarAgenda();
             } else {
                 exibirMensagem(data.erro || 'Erro ao atualizar agendamento', 'erro');
             }
@@ -45,7 +45,8 @@ document.addEventListener('DOMContentLoaded', () => {
 async function carregarUsuarios() {
     try {
         showLoading();
-        const response = await fetch('/usuarios');
+        // Usuários e seus departamentos em uma única requisição
+        const response = await fetch('/usuarios?include=departamentos');
         if (!response.ok) {
             throw new Error('Falha ao carregar usuários');
         }
@@ -53,15 +54,10 @@ async function carregarUsuarios() {
         const usuariosOrdenados = [...usuarios].sort((a, b) => b.id - a.id);
         const filtroDep = document.getElementById('filtro-departamento');
         const depIdSelecionado = filtroDep ? parseInt(filtroDep.value) : null;
-        // Buscar todos os vínculos de usuários
+        // Vínculos de cada usuário, já retornados junto com a lista
         let vinculos = {};
         for (const usuario of usuariosOrdenados) {
-            const resp = await fetch(`/usuarios/${usuario.id}/departamentos`);
-            if (resp.ok) {
-                vinculos[usuario.id] = (await resp.json()) || [];
-            } else {
-                vinculos[usuario.id] = [];
-            }
+            vinculos[usuario.id] = usuario.departamentos || [];
         }
         let usuariosFiltrados = usuariosOrdenados;
         if (depIdSelecionado) {
@@ -350,20 +346,11 @@ function contarUsuariosPorDepartamento(usuarios) {
 async function renderizarDepartamentos() {
     const tbody = document.getElementById('departamentos-list');
     const departamentosOrdenados = [...departamentos].sort((a, b) => b.id - a.id);
-    // Carregar todos os usuários e seus departamentos
+    // Carregar todos os usuários e seus departamentos (uma única requisição)
     let usuarios = [];
     try {
-        const resp = await fetch('/usuarios');
+        const resp = await fetch('/usuarios?include=departamentos');
         if (resp.ok) usuarios = await resp.json();
-        // Para cada usuário, buscar os departamentos vinculados
-        for (const user of usuarios) {
-            const depResp = await fetch(`/usuarios/${user.id}/departamentos`);
-            if (depResp.ok) {
-                user.departamentos = await depResp.json();
-            } else {
-                user.departamentos = [];
-            }
-        }
     } catch (e) { usuarios = []; }
     const contagem = contarUsuariosPorDepartamento(usuarios);
     tbody.innerHTML = departamentosOrdenados.map(dep => `
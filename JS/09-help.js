@@ -32,7 +32,8 @@ const TOPICOS_AJUDA = [
     { title: 'Importação de Dados', file: '/docs/md/11-instrucoes-importacao' },
     { title: 'Exportação de Dados', file: '/docs/md/12-instrucoes-exportacao' },
     { title: 'Segurança do Sistema', file: '/docs/md/13-seguranca-sistema' },
-    { title: 'URLs Amigáveis', file: '/docs/md/14-urls-amigaveis' }
+    { title: 'URLs Amigáveis', file: '/docs/md/14-urls-amigaveis' },
+    { title: 'Desempenho e Diagnóstico', file: '/docs/md/15-desempenho' }
 ];
 
 // Função utilitária para remover acentos
@@ -4,9 +4,11 @@
   const loginPaths = ['/login', '/p/login', '/01-login.html'];
   if (loginPaths.some(path => window.location.pathname === path || window.location.pathname.endsWith(path))) return;
 
-  // Carrega a navbar
-  fetch('/html/11-navbar.html')
-    .then(response => response.text())
+  // Carrega a navbar (o build dos estáticos já a embute no pacote comum de scripts)
+  const navbarHtml = window.HELPHUB_NAVBAR_HTML !== undefined
+    ? Promise.resolve(window.HELPHUB_NAVBAR_HTML)
+    : fetch('/html/11-navbar.html').then(response => response.text());
+  navbarHtml
     .then(html => {
       // Cria um elemento temporário para parsear o HTML
       const temp = document.createElement('div');
@@ -8,7 +8,10 @@
     const SESSION_TIMEOUT = 8 * 60 * 60 * 1000; // 8 horas em millisegundos
     const WARNING_TIMEOUT = 7.5 * 60 * 60 * 1000; // 7.5 horas (30 min antes)
     const CHECK_INTERVAL = 60000; // Verifica a cada 1 minuto
-    const RENEW_THROTTLE = 30000; // Throttle de 30 segundos para renovação de sessão
+    // O servidor só reemite o cookie de sessão a cada 15 minutos: renovar mais
+    // vezes que isso não muda nada
+    const RENEW_THROTTLE = 15 * 60 * 1000;
+    const RECONEXAO_EVENTOS = 15000; // Nova tentativa após a conexão de eventos cair de vez
 
     let lastActivity = Date.now();
     let lastRenewAttempt = 0; // Controle de throttle para renovação
@@ -41,6 +44,63 @@
         });
     };
 
+    // === Canal de eventos do servidor (GET /eventos) ===
+    // Substitui as verificações periódicas: o servidor avisa quando a sessão
+    // pode ter sido invalidada e quando chamados, clientes ou agendamentos
+    // mudam. Só uma aba por navegador (a que obtém o lock) mantém a conexão e
+    // repassa os eventos às demais pelo BroadcastChannel; quando ela fecha, o
+    // lock é liberado e outra aba assume.
+    const TIPOS_EVENTOS = ['chamados', 'clientes', 'agendamentos', 'sessao', 'ressincronizar'];
+    const eventosDisponiveis = 'EventSource' in window;
+    const eventosCompartilhados = !!(navigator.locks && window.BroadcastChannel);
+    const canalAbas = eventosCompartilhados ? new BroadcastChannel('helphub-eventos') : null;
+    const ouvintesEventos = {};
+
+    function emitirEvento(tipo, dados) {
+        (ouvintesEventos[tipo] || []).forEach(ouvinte => {
+            try {
+                ouvinte(dados);
+            } catch (error) {
+                console.error(`Erro ao tratar o evento ${tipo}:`, error);
+            }
+        });
+    }
+
+    function repassarEvento(tipo, dados) {
+        emitirEvento(tipo, dados);
+        if (canalAbas) canalAbas.postMessage({ tipo, dados });
+    }
+
+    function conectarEventos(aposQueda) {
+        const fonte = new EventSource('/eventos');
+        TIPOS_EVENTOS.forEach(tipo => {
+            fonte.addEventListener(tipo, event => repassarEvento(tipo, JSON.parse(event.data || '{}')));
+        });
+        fonte.onopen = () => {
+            // Uma conexão nova não envia Last-Event-ID: o que mudou enquanto o
+            // canal esteve fechado é recuperado recarregando os dados da tela
+            if (aposQueda) repassarEvento('ressincronizar', {});
+            aposQueda = false;
+        };
+        fonte.onerror = () => {
+            // Quedas comuns o EventSource reconecta sozinho. Encerrada de vez
+            // (ex.: 401, servidor fora do ar ou worker lotado, 503): confere a
+            // sessão e tenta de novo depois, com uma espera aleatória para que
+            // os navegadores recusados juntos não voltem todos ao mesmo tempo
+            if (fonte.readyState === EventSource.CLOSED) {
+                repassarEvento('sessao', { motivo: 'conexao' });
+                setTimeout(() => conectarEventos(true), RECONEXAO_EVENTOS * (1 + Math.random()));
+            }
+        };
+    }
+
+    window.HelpHubEventos = {
+        disponivel: eventosDisponiveis,
+        on(tipo, ouvinte) {
+            (ouvintesEventos[tipo] = ouvintesEventos[tipo] || []).push(ouvinte);
+        }
+    };
+
     // Função para renovar a sessão com throttle
     function renewSession() {
         const now = Date.now();
@@ -275,9 +335,25 @@
         document.addEventListener(event, updateActivity, true);
     });
 
-    // Verifica autenticação e configura timers a cada minuto
+    // Sessão possivelmente invalidada (usuário excluído, banco substituído): confirma
+    window.HelpHubEventos.on('sessao', checkAuthStatus);
+
+    if (eventosDisponiveis) {
+        if (canalAbas) {
+            canalAbas.onmessage = event => emitirEvento(event.data.tipo, event.data.dados);
+            // A promessa nunca resolvida mantém o lock enquanto a aba estiver aberta
+            navigator.locks.request('helphub-eventos', () => {
+                conectarEventos();
+                return new Promise(() => { });
+            });
+        } else {
+            conectarEventos(); // Sem compartilhamento entre abas: uma conexão por aba
+        }
+    }
+
+    // Confere o tempo de inatividade a cada minuto (e, sem o canal de eventos, a sessão)
     setInterval(() => {
-        checkAuthStatus();
+        if (!eventosDisponiveis) checkAuthStatus();
 
         // Verifica se passou muito tempo desde a última atividade
         const timeSinceActivity = Date.now() - lastActivity;
@@ -302,6 +378,8 @@
 
 // === Função para validar sessão periodicamente (migrada da navbar) ===
 window.setupSessionValidation = function () {
+    // Com o canal de eventos, o servidor avisa quando a sessão é invalidada
+    if (window.HelpHubEventos && window.HelpHubEventos.disponivel) return;
     setInterval(() => {
         fetch('/auth/check-session')
             .then(response => {
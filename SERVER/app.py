@@ -1,5 +1,6 @@
 import os
 import math
+import calendar
 import re
 import secrets
 import shutil
@@ -7,13 +8,25 @@ import glob
 import tempfile
 import hashlib
 import unicodedata
+import sys
+import json
+import random
+import threading
+import weakref
+import mimetypes
+import zipfile
+import multiprocessing
+import cProfile
+import pstats
+from collections import deque, Counter, OrderedDict
 from datetime import datetime, timedelta
-from time import sleep
+from time import sleep, perf_counter, monotonic
 from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from functools import wraps
-from io import BytesIO
+from io import BytesIO, StringIO
 from html import escape
-from openpyxl import Workbook
 from flask import (
     Flask,
     request,
@@ -23,12 +36,16 @@ from flask import (
     redirect,
     abort,
     send_file,
+    has_request_context,
+    g,
+    Response,
 )
 from flask_cors import CORS
 import sqlite3
 import logging
 from logging.handlers import RotatingFileHandler
 from werkzeug.security import check_password_hash, generate_password_hash
+from werkzeug.utils import safe_join
 import unicodedata
 
 # ========================================================
@@ -40,7 +57,10 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 HELPHUB_DIR = os.path.abspath(os.path.join(BASE_DIR, ".."))
 LOGS_DIR = os.path.join(HELPHUB_DIR, "LOGS")
 BACKUP_DIR = os.path.join(HELPHUB_DIR, "BACKUP")
-DATABASE = os.path.join(HELPHUB_DIR, "DATABASE", "database.db")
+# O caminho do banco pode ser sobrescrito (ex.: banco descartável dos benchmarks)
+DATABASE = os.environ.get(
+    "HELPHUB_DATABASE", os.path.join(HELPHUB_DIR, "DATABASE", "database.db")
+)
 
 
 # Configuração de fallback para logs críticos
@@ -77,22 +97,25 @@ def sanitize_html(text):
 critical_logger = setup_critical_logger()
 
 try:
-    # Garante que o diretório de logs existe e tem permissões corretas
-    if not os.path.exists(LOGS_DIR):
-        os.makedirs(LOGS_DIR)
+    # Garante que o diretório de logs existe (a permissão de escrita é
+    # verificada uma única vez, em inicializar_aplicacao)
+    os.makedirs(LOGS_DIR, exist_ok=True)
+except Exception as e:
+    critical_logger.critical(f"Erro fatal ao configurar diretório de logs: {e}")
+    raise SystemExit(1)
 
-    # Testa permissões de escrita para evitar problemas futuros de acesso
+
+# Testa permissões de escrita para evitar problemas futuros de acesso
+def verificar_diretorio_logs():
     test_file = os.path.join(LOGS_DIR, "test.log")
     try:
         with open(test_file, "w") as f:
             f.write("test")
         os.remove(test_file)
     except (IOError, OSError) as e:
-        raise RuntimeError(f"Sem permissão de escrita em {LOGS_DIR}: {e}")
+        critical_logger.critical(f"Sem permissão de escrita em {LOGS_DIR}: {e}")
+        raise SystemExit(1)
 
-except Exception as e:
-    critical_logger.critical(f"Erro fatal ao configurar diretório de logs: {e}")
-    raise SystemExit(1)
 
 # Inicializa o aplicativo Flask com suporte a CORS (Cross-Origin Resource Sharing)
 app = Flask(__name__)
@@ -249,11 +272,6 @@ def test_loggers():
         return False
 
 
-# Testa os loggers durante a inicialização
-if not test_loggers():
-    critical_logger.critical("Falha na verificação dos loggers")
-    raise SystemExit(1)
-
 # ========================================================
 # SEGURANÇÃO E CONFIGURAÇÃO DA SESSÃO
 # ========================================================
@@ -303,8 +321,8 @@ def get_or_generate_secret_key():
     return new_key
 
 
-# Define a chave secreta para o Flask, usada para sessões e tokens CSRF
-app.secret_key = get_or_generate_secret_key()
+# A chave secreta do Flask (sessões e tokens CSRF) é definida na inicialização
+# (inicializar_aplicacao / inicializar_processo, no fim do arquivo)
 
 # Configuração do tempo da sessão
 app.permanent_session_lifetime = timedelta(minutes=480)  # Sessão dura 8 horas
@@ -398,9 +416,169 @@ def validate_database_integrity():
     return True
 
 
+# ========================================================
+# PERFILAMENTO SOB DEMANDA (PROFILER)
+# ========================================================
+
+# Duração máxima de uma sessão de perfilamento, para nunca ficar ativo indefinidamente
+PROFILER_MAX_SEGUNDOS = 300
+
+# Estado do profiler deste worker (cada processo do Gunicorn tem o seu)
+_profiler = {
+    "ativo": False,
+    "sessao": 0,
+    "modo": None,
+    "fracao": 1.0,
+    "intervalo": 0.01,
+    "iniciado_em": None,
+    "expira_em": 0.0,
+    "requisicoes": 0,
+    "ignoradas": 0,
+    "amostras": 0,
+    "stats": None,
+    "pilhas": Counter(),
+}
+_profiler_lock = threading.Lock()
+# Uma requisição perfilada por vez no worker: o cProfile mede só a thread que o
+# ativou, e perfis simultâneos somariam o custo do profiler às outras threads
+_perfil_requisicao_lock = threading.Lock()
+
+
+def profiler_expirado():
+    """Desativa o profiler se o tempo limite da sessão já passou"""
+    if _profiler["ativo"] and perf_counter() >= _profiler["expira_em"]:
+        _profiler["ativo"] = False
+        app_logger.info(
+            f"Sessão de perfilamento encerrada por tempo (PID {os.getpid()})"
+        )
+    return not _profiler["ativo"]
+
+
+def descrever_frame(frame):
+    """Formata um frame da pilha como 'funcao (arquivo:linha)'"""
+    code = frame.f_code
+    return (
+        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+
+
+def amostrar_pilhas(sessao):
+    """
+    Thread de amostragem: coleta periodicamente a pilha de todas as threads
+    do processo e acumula no formato de pilhas colapsadas (flamegraph).
+    """
+    proprio_id = threading.get_ident()
+    while not profiler_expirado() and _profiler["sessao"] == sessao:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == proprio_id:
+                continue
+            pilha = []
+            while frame is not None:
+                pilha.append(descrever_frame(frame))
+                frame = frame.f_back
+            with _profiler_lock:
+                _profiler["pilhas"][";".join(reversed(pilha))] += 1
+                _profiler["amostras"] += 1
+        sleep(_profiler["intervalo"])
+
+
+@app.before_request
+def iniciar_perfil_requisicao():
+    # Modo cProfile: perfila apenas a fração configurada das requisições
+    if profiler_expirado() or _profiler["modo"] != "cprofile":
+        return
+    if random.random() >= _profiler["fracao"]:
+        return
+    if not _perfil_requisicao_lock.acquire(blocking=False):
+        # Outra requisição já está sendo perfilada: esta segue sem o profiler
+        with _profiler_lock:
+            _profiler["ignoradas"] += 1
+        return
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Outra ferramenta de profiling já está ativa no processo
+        _perfil_requisicao_lock.release()
+        return
+    g.profiler = profiler
+
+
+@app.teardown_request
+def finalizar_perfil_requisicao(exc):
+    profiler = g.pop("profiler", None)
+    if profiler is None:
+        return
+    try:
+        profiler.disable()
+    finally:
+        _perfil_requisicao_lock.release()
+    with _profiler_lock:
+        if _profiler["stats"] is None:
+            _profiler["stats"] = pstats.Stats(profiler)
+        else:
+            _profiler["stats"].add(profiler)
+        _profiler["requisicoes"] += 1
+
+
+# ========================================================
+# CLASSIFICAÇÃO DE ROTAS
+# ========================================================
+
+# Arquivos estáticos: não leem a sessão nem o banco. Sem Set-Cookie e sem
+# "Vary: Cookie" na resposta, o navegador reaproveita o cache normalmente.
+ROTAS_ESTATICAS = {
+    "static",
+    "serve_html",
+    "serve_css",
+    "serve_js",
+    "serve_imagens",
+    "serve_docs",
+    "custom_css",
+    "custom_js",
+    "favicon",
+}
+
+# Páginas e rotas públicas: não validam o banco nem renovam a sessão. As
+# páginas verificam a sessão pelo JavaScript (/auth/check-session), que passa
+# pela validação completa.
+ROTAS_PUBLICAS = {
+    "index",
+    "friendly_page_p",
+    "redirect_login",
+    "force_logout",
+    "auth_login",
+}
+
+# As sessões são permanentes e expiram após 8 horas sem renovação. Em vez de
+# reemitir o cookie a cada requisição, renova apenas quando ele tem mais que
+# este intervalo: no máximo 4 Set-Cookie por hora por usuário, e a expiração
+# por inatividade antecipa no máximo 15 minutos.
+SESSAO_INTERVALO_RENOVACAO = timedelta(minutes=15)
+app.config["SESSION_REFRESH_EACH_REQUEST"] = False
+
+
+def classificar_rota(endpoint):
+    """Retorna 'estatica', 'publica' ou 'autenticada' (demais rotas, inclusive a API)"""
+    if endpoint in ROTAS_ESTATICAS:
+        return "estatica"
+    if endpoint is None or endpoint in ROTAS_PUBLICAS:
+        # Sem endpoint: URL inexistente (404) ou método não permitido
+        return "publica"
+    return "autenticada"
+
+
+def renovar_sessao():
+    """Reemite o cookie de sessão, reiniciando o prazo de expiração"""
+    session["renovada_em"] = int(datetime.now().timestamp())
+
+
 # Hook executado antes de cada requisição para manter a sessão ativa
 @app.before_request
 def before_request():
+    if classificar_rota(request.endpoint) != "autenticada":
+        return
+
     # Valida integridade do banco de dados
     if not validate_database_integrity():
         # Se for uma requisição AJAX/API, retorna JSON
@@ -429,9 +607,11 @@ def before_request():
             # Se for uma requisição de página HTML, redireciona diretamente
             return redirect("/p/login")
 
-    # Renova a sessão se o usuário estiver ativo
+    # Renova a sessão se o usuário estiver ativo e o cookie já tiver alguns minutos
     if "user_id" in session:
-        session.modified = True  # Atualiza o timestamp da sessão
+        emitida_ha = datetime.now().timestamp() - session.get("renovada_em", 0)
+        if emitida_ha >= SESSAO_INTERVALO_RENOVACAO.total_seconds():
+            renovar_sessao()
 
 
 # ========================================================
@@ -516,6 +696,7 @@ def auth_login():
                 session["username"] = usuario[1]
                 session["role"] = usuario[3]
                 session.permanent = True
+                renovar_sessao()
 
                 auth_logger.info(
                     f"Login bem-sucedido para o usuário {username} - IP: {client_ip}"
@@ -610,50 +791,285 @@ def get_stripped(d, key):
 # Define o número máximo de tentativas para operações no banco de dados
 MAX_RETRIES = 3
 
+# Quanto uma consulta espera (segundos) por um lock de outra conexão antes de
+# falhar com "database is locked". A espera acontece dentro do SQLite, então
+# retry_db_operation não precisa pausar entre as tentativas.
+DB_BUSY_TIMEOUT = 5.0
+
+# Máximo de conexões ociosas guardadas para reuso em cada worker. Cada thread
+# usa uma conexão exclusiva dentro do bloco 'with get_db_connection()'.
+DB_POOL_MAXIMO = int(os.environ.get("HELPHUB_DB_POOL", "16"))
+
+
+# ========================================================
+# MONITORAMENTO DE CONSULTAS LENTAS
+# ========================================================
+
+# Tempo (em milissegundos) a partir do qual uma consulta é registrada como lenta
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get("HELPHUB_SLOW_QUERY_MS", "200"))
+
+# Quantidade máxima de consultas lentas mantidas em memória (buffer circular)
+SLOW_QUERY_BUFFER_SIZE = int(os.environ.get("HELPHUB_SLOW_QUERY_BUFFER", "100"))
+
+_consultas_lentas = deque(maxlen=SLOW_QUERY_BUFFER_SIZE)
+_consultas_lentas_lock = threading.Lock()
+
+
+def descrever_parametros(parametros):
+    """
+    Descreve apenas o formato dos parâmetros de uma consulta (tipo e tamanho),
+    sem expor os valores, que podem conter senhas ou dados de clientes.
+    """
+    if isinstance(parametros, dict):
+        return {
+            chave: descrever_parametros([valor])[0]
+            for chave, valor in parametros.items()
+        }
+    formato = []
+    for valor in parametros or ():
+        if isinstance(valor, (str, bytes)):
+            formato.append(f"{type(valor).__name__}({len(valor)})")
+        else:
+            formato.append(type(valor).__name__)
+    return formato
+
+
+def registrar_consulta_lenta(conn, sql, parametros, duracao_ms):
+    """
+    Armazena uma consulta lenta no buffer circular, junto com o plano de execução
+    obtido via EXPLAIN QUERY PLAN na mesma conexão.
+    """
+    plano = []
+    try:
+        # Usa o execute original para não medir (nem registrar) a própria consulta de diagnóstico
+        linhas = sqlite3.Connection.execute(
+            conn, f"EXPLAIN QUERY PLAN {sql}", parametros
+        ).fetchall()
+        plano = [linha[3] for linha in linhas]
+    except Exception as e:
+        plano = [f"Plano indisponível: {e}"]
+
+    registro = {
+        "data_hora": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "duracao_ms": round(duracao_ms, 2),
+        "sql": " ".join(sql.split()),
+        "parametros": descrever_parametros(parametros),
+        "plano": plano,
+        "rota": request.path if has_request_context() else None,
+    }
+    with _consultas_lentas_lock:
+        _consultas_lentas.append(registro)
+
+    app_logger.warning(
+        f"Consulta lenta ({registro['duracao_ms']} ms): {registro['sql'][:200]}"
+    )
+
+
+# Contadores de consultas ativos em cada thread (ver contar_consultas)
+_contadores_consultas = threading.local()
+
+
+@contextmanager
+def contar_consultas():
+    """
+    Registra as consultas SQL executadas na thread atual dentro do bloco.
+    Usado pelos benchmarks e pela verificação de orçamento de consultas
+    (BENCHMARK/orcamento_consultas.py) para detectar padrões N+1.
+    """
+    consultas = []
+    ativos = getattr(_contadores_consultas, "ativos", None)
+    if ativos is None:
+        ativos = _contadores_consultas.ativos = []
+    ativos.append(consultas)
+    try:
+        yield consultas
+    finally:
+        ativos.remove(consultas)
+
+
+def medir_consulta(conn, sql, parametros, inicio):
+    """Verifica a duração de uma consulta e registra se ultrapassar o limite"""
+    duracao_ms = (perf_counter() - inicio) * 1000
+    for consultas in getattr(_contadores_consultas, "ativos", None) or ():
+        consultas.append(" ".join(sql.split()))
+    if duracao_ms >= SLOW_QUERY_THRESHOLD_MS:
+        registrar_consulta_lenta(conn, sql, parametros, duracao_ms)
+
+
+# Cursor que mede o tempo de cada consulta executada
+class CursorMonitorado(sqlite3.Cursor):
+    def execute(self, sql, parameters=()):
+        inicio = perf_counter()
+        resultado = super().execute(sql, parameters)
+        medir_consulta(self.connection, sql, parameters, inicio)
+        return resultado
+
+    def executemany(self, sql, seq_of_parameters):
+        # Materializa os parâmetros para poder reaproveitar o primeiro no EXPLAIN
+        seq_of_parameters = list(seq_of_parameters)
+        inicio = perf_counter()
+        resultado = super().executemany(sql, seq_of_parameters)
+        medir_consulta(
+            self.connection,
+            sql,
+            seq_of_parameters[0] if seq_of_parameters else (),
+            inicio,
+        )
+        return resultado
+
+
+# Conexão que cria cursores monitorados, inclusive nos atalhos conn.execute()
+class ConexaoMonitorada(sqlite3.Connection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Cursores abertos, fechados ao devolver a conexão ao pool
+        self.cursores = weakref.WeakSet()
+
+    def cursor(self, factory=CursorMonitorado):
+        cursor = super().cursor(factory)
+        self.cursores.add(cursor)
+        return cursor
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+# Pool de conexões ociosas: (conexão, arquivo do banco). list.append/pop são
+# atômicos, dispensando lock (que poderia ficar preso em um fork).
+_pool_conexoes = []
+# Conexões herdadas no fork: não podem ser usadas nem fechadas no processo filho
+_conexoes_herdadas = []
+
+
+def _reiniciar_pool_conexoes():
+    _conexoes_herdadas.extend(_pool_conexoes)
+    _pool_conexoes.clear()
+
+
+os.register_at_fork(after_in_child=_reiniciar_pool_conexoes)
+
+
+def fechar_conexoes_ociosas():
+    """
+    Fecha as conexões ociosas do pool. Usada pelo master do Gunicorn (com
+    preload_app) antes de criar os workers, para que eles não herdem conexões.
+    """
+    while _pool_conexoes:
+        try:
+            conn, _ = _pool_conexoes.pop()
+        except IndexError:
+            break
+        conn.close()
+
+
+def identificar_arquivo_banco():
+    """Identifica o arquivo do banco (caminho, dispositivo, inode), ou None"""
+    try:
+        info = os.stat(DATABASE)
+    except OSError:
+        return None
+    return (DATABASE, info.st_dev, info.st_ino)
+
+
+def abrir_conexao_banco():
+    """Nova conexão com medição de consultas, chaves estrangeiras e NORMALIZAR"""
+    # check_same_thread=False: a conexão passa de uma thread a outra pelo pool,
+    # mas nunca é usada por duas ao mesmo tempo
+    conn = sqlite3.connect(
+        DATABASE,
+        factory=ConexaoMonitorada,
+        timeout=DB_BUSY_TIMEOUT,
+        check_same_thread=False,
+    )
+    # Habilita o suporte a chaves estrangeiras no SQLite para integridade referencial
+    conn.execute("PRAGMA foreign_keys = ON")
+    # Registra a função customizada NORMALIZAR
+    conn.create_function("NORMALIZAR", 1, normalizar_sqlite)
+    return conn
+
+
+def devolver_conexao_banco(conn, arquivo):
+    """
+    Devolve a conexão ao pool no estado de uma conexão nova: sem cursores
+    abertos (que manteriam o lock de leitura), sem transação pendente (o que
+    não foi confirmado é descartado, como ao fechar) e sem row_factory.
+    """
+    try:
+        for cursor in list(conn.cursores):
+            cursor.close()
+        if conn.in_transaction:
+            conn.rollback()
+        conn.row_factory = None
+    except sqlite3.Error:
+        conn.close()
+        return
+    if arquivo is None or len(_pool_conexoes) >= DB_POOL_MAXIMO:
+        conn.close()
+        return
+    _pool_conexoes.append((conn, arquivo))
+
 
 # Context manager para gerenciar a conexão com o banco de dados SQLite
-# Garante que a conexão seja fechada após o uso, mesmo em caso de exceção
+# Reaproveita conexões do pool e as devolve após o uso, mesmo em caso de exceção
 @contextmanager
 def get_db_connection():
     conn = None
+    arquivo = identificar_arquivo_banco()
+    # Conexão de outro arquivo (banco trocado ou restaurado) é descartada
+    while conn is None and _pool_conexoes:
+        try:
+            candidata, origem = _pool_conexoes.pop()
+        except IndexError:
+            break
+        if origem == arquivo:
+            conn = candidata
+        else:
+            candidata.close()
+    reaproveitavel = True
     try:
-        # Estabelece uma conexão com o banco de dados SQLite
-        conn = sqlite3.connect(DATABASE)
-        # Habilita o suporte a chaves estrangeiras no SQLite para integridade referencial
-        conn.execute("PRAGMA foreign_keys = ON")
-        # Registra a função customizada NORMALIZAR
-        conn.create_function("NORMALIZAR", 1, normalizar_sqlite)
+        if conn is None:
+            # Estabelece uma conexão com o banco de dados SQLite (com medição de consultas)
+            conn = abrir_conexao_banco()
+            arquivo = arquivo or identificar_arquivo_banco()
         # Retorna a conexão para ser usada no bloco 'with'
         yield conn
     except sqlite3.Error as e:
         # Registra erros de banco de dados no log especializado
         app_logger.error(f"Erro no banco de dados: {e}")
+        reaproveitavel = False
         # Propaga a exceção para tratamento no chamador
         raise
     finally:
-        # Garante que a conexão seja fechada, mesmo em caso de exceção
         if conn:
-            conn.close()
+            if reaproveitavel:
+                devolver_conexao_banco(conn, arquivo)
+            else:
+                conn.close()
 
 
 # Decorador para executar novamente operações no banco de dados em caso de falha
-# Útil para lidar com condições de concorrência ou problemas transitórios
+# Só o banco ocupado (lock de outra conexão) é transitório; erros de SQL ou de
+# integridade falhariam de novo. A espera pelo lock já acontece dentro do
+# SQLite (DB_BUSY_TIMEOUT), sem sleep prendendo a thread entre as tentativas.
 def retry_db_operation(func):
+    @wraps(func)
     def wrapper(*args, **kwargs):
         for attempt in range(MAX_RETRIES):
             try:
                 # Tenta executar a função decorada
                 return func(*args, **kwargs)
-            except sqlite3.Error as e:
+            except sqlite3.OperationalError as e:
+                transitorio = "locked" in str(e) or "busy" in str(e)
                 # Se atingir o número máximo de tentativas, propaga a exceção
-                if attempt == MAX_RETRIES - 1:
+                if not transitorio or attempt == MAX_RETRIES - 1:
                     raise
                 # Registra um aviso sobre a falha e a nova tentativa
                 app_logger.warning(
-                    f"Operação no banco de dados falhou, tentando novamente... ({attempt + 1}/{MAX_RETRIES})"
+                    f"Banco de dados ocupado, tentando novamente... ({attempt + 1}/{MAX_RETRIES})"
                 )
-                # Aguarda um curto período antes de tentar novamente para resolver condições transitórias
-                sleep(1)
 
     return wrapper
 
@@ -663,8 +1079,392 @@ def retry_db_operation(func):
 # ========================================================
 
 
+# Tabela virtual FTS5 usada na busca de clientes: indexada, sem diferenciar
+# acentos nem maiúsculas. Mantida em sincronia com a tabela clientes por triggers.
+TABELA_BUSCA_CLIENTES = "clientes_busca"
+
+# Definido em criar_tabelas; sem FTS5 no SQLite a busca usa varredura com NORMALIZAR
+busca_fts_disponivel = False
+
+
+def somente_digitos_sql(expressao):
+    """Expressão SQL que remove a pontuação comum de telefones e CPF/CNPJ"""
+    for caractere in ["(", ")", "-", ".", "/", "+", " "]:
+        expressao = f"REPLACE({expressao}, '{caractere}', '')"
+    return expressao
+
+
+def criar_indice_busca_clientes(cursor):
+    """
+    Cria a tabela FTS5 de busca de clientes e os triggers de sincronização.
+    Na primeira criação, indexa os clientes já existentes.
+    Retorna False se o SQLite não tiver suporte a FTS5.
+    """
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+        (TABELA_BUSCA_CLIENTES,),
+    )
+    existente = cursor.fetchone() is not None
+
+    try:
+        # A coluna 'digitos' guarda telefone e CPF/CNPJ sem pontuação
+        cursor.execute(
+            f"""CREATE VIRTUAL TABLE IF NOT EXISTS {TABELA_BUSCA_CLIENTES} USING fts5(
+            nome, nome_fantasia, email, telefone, cnpj_cpf, digitos,
+            tokenize = 'unicode61 remove_diacritics 2'
+        )"""
+        )
+    except sqlite3.OperationalError as e:
+        app_logger.warning(f"FTS5 indisponível, busca de clientes sem índice: {e}")
+        return False
+
+    def valores(prefixo):
+        return f"""{prefixo}.id, {prefixo}.nome, {prefixo}.nome_fantasia, {prefixo}.email,
+            {prefixo}.telefone, {prefixo}.cnpj_cpf,
+            {somente_digitos_sql(f"COALESCE({prefixo}.telefone, '')")} || ' ' ||
+            {somente_digitos_sql(f"COALESCE({prefixo}.cnpj_cpf, '')")}"""
+
+    colunas = "rowid, nome, nome_fantasia, email, telefone, cnpj_cpf, digitos"
+    cursor.execute(
+        f"""CREATE TRIGGER IF NOT EXISTS clientes_busca_insert AFTER INSERT ON clientes
+        BEGIN
+            INSERT INTO {TABELA_BUSCA_CLIENTES} ({colunas}) VALUES ({valores("new")});
+        END"""
+    )
+    cursor.execute(
+        f"""CREATE TRIGGER IF NOT EXISTS clientes_busca_update AFTER UPDATE ON clientes
+        BEGIN
+            DELETE FROM {TABELA_BUSCA_CLIENTES} WHERE rowid = old.id;
+            INSERT INTO {TABELA_BUSCA_CLIENTES} ({colunas}) VALUES ({valores("new")});
+        END"""
+    )
+    cursor.execute(
+        f"""CREATE TRIGGER IF NOT EXISTS clientes_busca_delete AFTER DELETE ON clientes
+        BEGIN
+            DELETE FROM {TABELA_BUSCA_CLIENTES} WHERE rowid = old.id;
+        END"""
+    )
+
+    if not existente:
+        cursor.execute(
+            f"INSERT INTO {TABELA_BUSCA_CLIENTES} ({colunas}) SELECT {valores('c')} FROM clientes c"
+        )
+        app_logger.info("Índice de busca de clientes criado")
+    return True
+
+
+def montar_consulta_fts(termo):
+    """
+    Converte o termo digitado em uma consulta FTS5: todas as palavras precisam
+    aparecer, cada uma como prefixo ("joao silv" encontra "João Silva").
+    """
+    palavras = re.findall(r"\w+", normalizar_sqlite(termo))
+    return " ".join(f'"{palavra}"*' for palavra in palavras)
+
+
+def filtro_busca_clientes(termo, alias="clientes"):
+    """
+    Retorna (condição SQL, parâmetros) para filtrar clientes pelo termo em
+    nome, nome fantasia, e-mail, telefone e CPF/CNPJ. Termos numéricos também
+    encontram o cliente pelo ID.
+    """
+    termo = (termo or "").strip()
+    condicoes, parametros = [], []
+    if termo.isdigit():
+        condicoes.append(f"{alias}.id = ?")
+        parametros.append(int(termo))
+
+    if busca_fts_disponivel:
+        consulta = montar_consulta_fts(termo)
+        if consulta:
+            condicoes.append(
+                f"{alias}.id IN (SELECT rowid FROM {TABELA_BUSCA_CLIENTES} "
+                f"WHERE {TABELA_BUSCA_CLIENTES} MATCH ?)"
+            )
+            parametros.append(consulta)
+    elif termo:
+        # Sem FTS5: varredura completa ignorando acentos
+        termo_like = f"%{normalizar_sqlite(termo)}%"
+        for campo in ["nome", "nome_fantasia", "email", "telefone", "cnpj_cpf"]:
+            condicoes.append(f"NORMALIZAR({alias}.{campo}) LIKE ?")
+            parametros.append(termo_like)
+
+    if not condicoes:
+        return "1 = 1", []
+    return "(" + " OR ".join(condicoes) + ")", parametros
+
+
+# Registro dos agendamentos excluídos, consultado pela sincronização
+# incremental da agenda (parâmetro updated_since de GET /agendamentos)
+TABELA_AGENDAMENTOS_REMOVIDOS = "agendamentos_removidos"
+
+# Por quantos dias as exclusões ficam registradas; clientes com sincronização
+# mais antiga que isso precisam recarregar a agenda completa
+AGENDA_RETENCAO_REMOVIDOS_DIAS = 7
+
+# Agendamentos que começam antes do período pedido só são procurados até esta
+# distância, permitindo usar o índice de data (visitas duram horas, não semanas)
+AGENDA_DURACAO_MAXIMA_DIAS = 31
+
+# Formato (UTC) da coluna atualizado_em e do token de sincronização
+SQL_AGORA_SINCRONIZACAO = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
+
+def criar_sincronizacao_agenda(cursor):
+    """
+    Prepara a sincronização incremental da agenda: coluna atualizado_em em
+    agendamentos, registro de exclusões e triggers que marcam o agendamento
+    como alterado quando ele, o chamado ou o cliente relacionados mudam.
+    """
+    cursor.execute(
+        """
+        SELECT COUNT(*) FROM pragma_table_info('agendamentos')
+        WHERE name='atualizado_em'
+    """
+    )
+    if cursor.fetchone()[0] == 0:
+        cursor.execute("ALTER TABLE agendamentos ADD COLUMN atualizado_em TEXT")
+        cursor.execute(
+            f"UPDATE agendamentos SET atualizado_em = {SQL_AGORA_SINCRONIZACAO}"
+        )
+
+    cursor.execute(
+        f"""CREATE TABLE IF NOT EXISTS {TABELA_AGENDAMENTOS_REMOVIDOS} (
+        id INTEGER PRIMARY KEY,
+        removido_em TEXT NOT NULL
+    )"""
+    )
+
+    cursor.execute(
+        f"""CREATE TRIGGER IF NOT EXISTS agendamentos_sync_insert
+        AFTER INSERT ON agendamentos
+        BEGIN
+            UPDATE agendamentos SET atualizado_em = {SQL_AGORA_SINCRONIZACAO}
+            WHERE id = new.id;
+            DELETE FROM {TABELA_AGENDAMENTOS_REMOVIDOS} WHERE id = new.id;
+        END"""
+    )
+    cursor.execute(
+        f"""CREATE TRIGGER IF NOT EXISTS agendamentos_sync_update
+        AFTER UPDATE OF chamado_id, data_agendamento, data_final_agendamento,
+            observacoes, status ON agendamentos
+        BEGIN
+            UPDATE agendamentos SET atualizado_em = {SQL_AGORA_SINCRONIZACAO}
+            WHERE id = new.id;
+        END"""
+    )
+    cursor.execute(
+        f"""CREATE TRIGGER IF NOT EXISTS agendamentos_sync_delete
+        AFTER DELETE ON agendamentos
+        BEGIN
+            INSERT OR REPLACE INTO {TABELA_AGENDAMENTOS_REMOVIDOS} (id, removido_em)
+            VALUES (old.id, {SQL_AGORA_SINCRONIZACAO});
+            DELETE FROM {TABELA_AGENDAMENTOS_REMOVIDOS}
+            WHERE removido_em < strftime('%Y-%m-%d %H:%M:%f', 'now',
+                '-{AGENDA_RETENCAO_REMOVIDOS_DIAS} days');
+        END"""
+    )
+    # Dados do chamado e do cliente também aparecem nos eventos da agenda
+    cursor.execute(
+        f"""CREATE TRIGGER IF NOT EXISTS agendamentos_sync_chamado
+        AFTER UPDATE OF status, protocolo, assunto, cliente_id, departamento_id
+        ON chamados
+        BEGIN
+            UPDATE agendamentos SET atualizado_em = {SQL_AGORA_SINCRONIZACAO}
+            WHERE chamado_id = new.id;
+        END"""
+    )
+    cursor.execute(
+        f"""CREATE TRIGGER IF NOT EXISTS agendamentos_sync_cliente
+        AFTER UPDATE OF nome, telefone, rua, numero, complemento, bairro,
+            cidade, estado ON clientes
+        BEGIN
+            UPDATE agendamentos SET atualizado_em = {SQL_AGORA_SINCRONIZACAO}
+            WHERE chamado_id IN (SELECT id FROM chamados WHERE cliente_id = new.id);
+        END"""
+    )
+
+
+# Registro de alterações lido pelo canal de eventos (GET /eventos). Preenchido
+# por triggers, cobre qualquer escrita (rotas, operações em massa, importação)
+# e é compartilhado entre os workers do Gunicorn.
+TABELA_EVENTOS = "eventos"
+
+# Tabelas acompanhadas pelo canal de eventos -> colunas cuja alteração gera evento
+# (None: qualquer coluna). Em agendamentos, a coluna atualizado_em fica de fora
+# para que os triggers da sincronização da agenda não dupliquem os eventos.
+TABELAS_COM_EVENTOS = {
+    "chamados": None,
+    "clientes": None,
+    "agendamentos": "chamado_id, data_agendamento, data_final_agendamento, "
+    "observacoes, status",
+}
+
+# Quantos eventos ficam no banco para a retomada de conexões (Last-Event-ID)
+EVENTOS_RETENCAO = 5000
+
+
+def criar_feed_eventos(cursor):
+    """
+    Cria a tabela de eventos e os triggers que registram inclusões, alterações
+    e exclusões. AUTOINCREMENT garante que um id nunca é reaproveitado depois
+    da limpeza, condição para a retomada pelo Last-Event-ID.
+    """
+    cursor.execute(
+        f"""CREATE TABLE IF NOT EXISTS {TABELA_EVENTOS} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        tabela TEXT NOT NULL,
+        acao TEXT NOT NULL,
+        registro_id INTEGER
+    )"""
+    )
+    for tabela, colunas in TABELAS_COM_EVENTOS.items():
+        for acao, registro in [("insert", "new.id"), ("delete", "old.id")]:
+            cursor.execute(
+                f"""CREATE TRIGGER IF NOT EXISTS {tabela}_eventos_{acao}
+                AFTER {acao.upper()} ON {tabela}
+                BEGIN
+                    INSERT INTO {TABELA_EVENTOS} (tabela, acao, registro_id)
+                    VALUES ('{tabela}', '{acao}', {registro});
+                END"""
+            )
+        cursor.execute(
+            f"""CREATE TRIGGER IF NOT EXISTS {tabela}_eventos_update
+            AFTER UPDATE {f"OF {colunas} " if colunas else ""}ON {tabela}
+            BEGIN
+                INSERT INTO {TABELA_EVENTOS} (tabela, acao, registro_id)
+                VALUES ('{tabela}', 'update', new.id);
+            END"""
+        )
+    # Exclusão de usuário encerra as sessões dele na hora
+    cursor.execute(
+        f"""CREATE TRIGGER IF NOT EXISTS usuarios_eventos_delete
+        AFTER DELETE ON usuarios
+        BEGIN
+            INSERT INTO {TABELA_EVENTOS} (tabela, acao, registro_id)
+            VALUES ('usuarios', 'delete', old.id);
+        END"""
+    )
+    # Limpeza a cada 500 eventos, mantendo os EVENTOS_RETENCAO mais recentes
+    cursor.execute(
+        f"""CREATE TRIGGER IF NOT EXISTS eventos_limpeza
+        AFTER INSERT ON {TABELA_EVENTOS}
+        WHEN new.id % 500 = 0
+        BEGIN
+            DELETE FROM {TABELA_EVENTOS} WHERE id <= new.id - {EVENTOS_RETENCAO};
+        END"""
+    )
+
+
+# Índice de intervalos (R*Tree) da agenda, usado na detecção de conflitos de
+# horário por departamento. Cada agendamento guarda [início, fim] em minutos
+# desde 1970 na primeira dimensão e o departamento do chamado na segunda.
+TABELA_INTERVALOS_AGENDA = "agendamentos_intervalos"
+
+# Definido em criar_tabelas; sem R*Tree no SQLite os conflitos usam idx_agendamentos_data
+indice_agenda_disponivel = False
+
+
+def minutos_sql(expressao):
+    """Expressão SQL que converte uma data ISO 8601 em minutos desde 1970"""
+    return f"CAST(strftime('%s', {expressao}) AS INTEGER) / 60"
+
+
+def criar_indice_intervalos_agenda(cursor):
+    """
+    Cria o índice R*Tree de intervalos da agenda e os triggers de sincronização.
+    Na primeira criação, indexa os agendamentos já existentes.
+    Retorna False se o SQLite não tiver suporte a R*Tree.
+    """
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+        (TABELA_INTERVALOS_AGENDA,),
+    )
+    existente = cursor.fetchone() is not None
+
+    try:
+        cursor.execute(
+            f"""CREATE VIRTUAL TABLE IF NOT EXISTS {TABELA_INTERVALOS_AGENDA} USING rtree_i32(
+            id, inicio, fim, departamento_min, departamento_max
+        )"""
+        )
+    except sqlite3.OperationalError as e:
+        app_logger.warning(f"R*Tree indisponível, conflitos de agenda sem índice: {e}")
+        return False
+
+    # Agendamentos com datas que o SQLite não reconhece ficam fora do índice
+    def inserir(prefixo):
+        inicio = minutos_sql(f"{prefixo}.data_agendamento")
+        fim = minutos_sql(f"{prefixo}.data_final_agendamento")
+        return f"""INSERT OR REPLACE INTO {TABELA_INTERVALOS_AGENDA}
+            SELECT {prefixo}.id, MIN({inicio}, {fim}), MAX({inicio}, {fim}),
+                COALESCE(ch.departamento_id, 0), COALESCE(ch.departamento_id, 0)
+            FROM chamados ch
+            WHERE ch.id = {prefixo}.chamado_id AND {inicio} IS NOT NULL AND {fim} IS NOT NULL"""
+
+    cursor.execute(
+        f"""CREATE TRIGGER IF NOT EXISTS agendamentos_intervalos_insert
+        AFTER INSERT ON agendamentos
+        BEGIN
+            {inserir("new")};
+        END"""
+    )
+    cursor.execute(
+        f"""CREATE TRIGGER IF NOT EXISTS agendamentos_intervalos_update
+        AFTER UPDATE OF chamado_id, data_agendamento, data_final_agendamento
+        ON agendamentos
+        BEGIN
+            DELETE FROM {TABELA_INTERVALOS_AGENDA} WHERE id = old.id;
+            {inserir("new")};
+        END"""
+    )
+    cursor.execute(
+        f"""CREATE TRIGGER IF NOT EXISTS agendamentos_intervalos_delete
+        AFTER DELETE ON agendamentos
+        BEGIN
+            DELETE FROM {TABELA_INTERVALOS_AGENDA} WHERE id = old.id;
+        END"""
+    )
+    # O departamento vem do chamado: acompanha a troca de departamento
+    cursor.execute(
+        f"""CREATE TRIGGER IF NOT EXISTS agendamentos_intervalos_chamado
+        AFTER UPDATE OF departamento_id ON chamados
+        BEGIN
+            UPDATE {TABELA_INTERVALOS_AGENDA}
+            SET departamento_min = COALESCE(new.departamento_id, 0),
+                departamento_max = COALESCE(new.departamento_id, 0)
+            WHERE id IN (SELECT id FROM agendamentos WHERE chamado_id = new.id);
+        END"""
+    )
+
+    if not existente:
+        inicio = minutos_sql("ag.data_agendamento")
+        fim = minutos_sql("ag.data_final_agendamento")
+        cursor.execute(
+            f"""INSERT INTO {TABELA_INTERVALOS_AGENDA}
+            SELECT ag.id, MIN({inicio}, {fim}), MAX({inicio}, {fim}),
+                COALESCE(ch.departamento_id, 0), COALESCE(ch.departamento_id, 0)
+            FROM agendamentos ag
+            JOIN chamados ch ON ch.id = ag.chamado_id
+            WHERE {inicio} IS NOT NULL AND {fim} IS NOT NULL"""
+        )
+        app_logger.info("Índice de intervalos da agenda criado")
+    return True
+
+
+def normalizar_data_agenda(valor):
+    """
+    Converte uma data ISO 8601 (como as enviadas pelo FullCalendar, com ou sem
+    fuso) para o formato gravado nos agendamentos ('AAAA-MM-DDTHH:MM'),
+    mantendo o horário local. Lança ValueError se a data for inválida.
+    """
+    data = datetime.fromisoformat(valor.strip().replace("Z", "+00:00"))
+    return data.strftime("%Y-%m-%dT%H:%M")
+
+
 # Cria as tabelas no banco de dados se elas não existirem
 def criar_tabelas():
+    global busca_fts_disponivel, indice_agenda_disponivel
     with get_db_connection() as conn:
         cursor = conn.cursor()
 
@@ -742,6 +1542,7 @@ def criar_tabelas():
             data_final_agendamento TEXT NOT NULL,
             observacoes TEXT,
             status TEXT DEFAULT 'Aberto',
+            atualizado_em TEXT,
             FOREIGN KEY (chamado_id) REFERENCES chamados(id) ON DELETE CASCADE
         )"""
         )
@@ -821,6 +1622,50 @@ def criar_tabelas():
         )"""
         )
 
+        # Índices para as consultas de detalhe do chamado (andamentos e agendamento)
+        cursor.execute(
+            """CREATE INDEX IF NOT EXISTS idx_andamentos_chamado
+            ON chamados_andamentos (chamado_id, data_hora)"""
+        )
+        cursor.execute(
+            """CREATE INDEX IF NOT EXISTS idx_agendamentos_chamado
+            ON agendamentos (chamado_id)"""
+        )
+
+        # Índice para a busca de chamados por prefixo do protocolo (autocomplete)
+        cursor.execute(
+            """CREATE INDEX IF NOT EXISTS idx_chamados_protocolo
+            ON chamados (protocolo)"""
+        )
+
+        # Índice para a listagem de chamados de um cliente (filtro por status e ordem por data)
+        cursor.execute(
+            """CREATE INDEX IF NOT EXISTS idx_chamados_cliente_status
+            ON chamados (cliente_id, status, data_abertura)"""
+        )
+
+        # Índice para a agenda por período (parâmetros start/end de GET /agendamentos)
+        cursor.execute(
+            """CREATE INDEX IF NOT EXISTS idx_agendamentos_data
+            ON agendamentos (data_agendamento, data_final_agendamento)"""
+        )
+
+        # Índice de intervalos para detecção de conflitos de horário (R*Tree)
+        indice_agenda_disponivel = criar_indice_intervalos_agenda(cursor)
+
+        # Sincronização incremental da agenda (parâmetro updated_since)
+        criar_sincronizacao_agenda(cursor)
+        cursor.execute(
+            """CREATE INDEX IF NOT EXISTS idx_agendamentos_atualizado
+            ON agendamentos (atualizado_em)"""
+        )
+
+        # Registro de alterações do canal de eventos (GET /eventos)
+        criar_feed_eventos(cursor)
+
+        # Índice de busca textual de clientes (FTS5)
+        busca_fts_disponivel = criar_indice_busca_clientes(cursor)
+
         # Adiciona a coluna senha_inicial_definida se não existir
         cursor.execute(
             """
@@ -840,8 +1685,23 @@ def criar_tabelas():
         conn.commit()
 
 
-# Executa a criação das tabelas ao iniciar o aplicativo
-criar_tabelas()
+def detectar_recursos_banco():
+    """
+    Define busca_fts_disponivel e indice_agenda_disponivel a partir das
+    tabelas já criadas por criar_tabelas, sem executar DDL (workers que não
+    passaram pela inicialização única).
+    """
+    global busca_fts_disponivel, indice_agenda_disponivel
+    with get_db_connection() as conn:
+        existentes = {
+            row[0]
+            for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN (?, ?)",
+                (TABELA_BUSCA_CLIENTES, TABELA_INTERVALOS_AGENDA),
+            )
+        }
+    busca_fts_disponivel = TABELA_BUSCA_CLIENTES in existentes
+    indice_agenda_disponivel = TABELA_INTERVALOS_AGENDA in existentes
 
 
 # ========================================================
@@ -917,40 +1777,94 @@ def realizar_backup_diario():
 # ========================================================
 
 
+# Build dos estáticos (SERVER/compilar_estaticos.py): cópias com o hash do
+# conteúdo no nome, páginas com as referências reescritas e variantes .br/.gz.
+# Sem o build, os arquivos originais são servidos normalmente.
+ESTATICOS_DIR = os.environ.get(
+    "HELPHUB_ESTATICOS", os.path.join(HELPHUB_DIR, "ESTATICOS")
+)
+ESTATICOS_MAX_AGE = 365 * 24 * 3600  # Nomes com hash nunca mudam de conteúdo
+NOME_COM_HASH = re.compile(r"\.[0-9a-f]{10}\.[A-Za-z0-9]+$")
+VARIANTES_COMPRIMIDAS = [("br", ".br"), ("gzip", ".gz")]
+# Formatos alternativos das imagens (logo.<hash>.png.avif), em ordem de preferência
+VARIANTES_IMAGEM = [("image/avif", ".avif"), ("image/webp", ".webp")]
+
+
+def enviar_estatico_compilado(caminho, imutavel):
+    """
+    Envia um arquivo do build, usando o formato de imagem e a variante
+    pré-comprimida aceitos pelo navegador. Arquivos com hash recebem cache
+    imutável; páginas são revalidadas a cada acesso (ETag), pois mantêm o
+    mesmo nome entre builds.
+    """
+    mimetype = mimetypes.guess_type(caminho)[0] or "application/octet-stream"
+    enviar, tem_formato = caminho, False
+    # Só vale o tipo citado explicitamente: "*/*" também aceitaria AVIF
+    aceitos = {tipo for tipo, qualidade in request.accept_mimetypes if qualidade > 0}
+    for tipo, sufixo in VARIANTES_IMAGEM:
+        if os.path.isfile(caminho + sufixo):
+            tem_formato = True
+            if enviar == caminho and tipo in aceitos:
+                enviar, mimetype = caminho + sufixo, tipo
+
+    comprimido, codificacao, tem_variante = enviar, None, False
+    for nome, sufixo in VARIANTES_COMPRIMIDAS:
+        if os.path.isfile(enviar + sufixo):
+            tem_variante = True
+            if codificacao is None and request.accept_encodings[nome]:
+                comprimido, codificacao = enviar + sufixo, nome
+
+    # Sem max_age, o send_file responde com "no-cache" (revalidação por ETag)
+    resposta = send_file(
+        comprimido,
+        mimetype=mimetype,
+        max_age=ESTATICOS_MAX_AGE if imutavel else None,
+    )
+    if imutavel:
+        resposta.cache_control.immutable = True
+    if codificacao:
+        resposta.headers["Content-Encoding"] = codificacao
+    if tem_variante:
+        resposta.vary.add("Accept-Encoding")
+    if tem_formato:
+        resposta.vary.add("Accept")
+    return resposta
+
+
+def servir_estatico(pasta, filename):
+    """Serve um arquivo de HTML/, CSS/, JS/ ou IMAGENS/, preferindo a versão do build"""
+    compilado = safe_join(os.path.join(ESTATICOS_DIR, pasta.lower()), filename)
+    if compilado and os.path.isfile(compilado):
+        return enviar_estatico_compilado(
+            compilado, imutavel=bool(NOME_COM_HASH.search(filename))
+        )
+    return send_from_directory(os.path.join(HELPHUB_DIR, pasta), filename)
+
+
 # Rotas para servir arquivos HTML, CSS, JS, imagens e docs da nova estrutura modularizada
 @app.route("/html/<path:filename>")
 def serve_html(filename):
-    return send_from_directory(
-        os.path.abspath(os.path.join(BASE_DIR, "../HTML")), filename
-    )
+    return servir_estatico("HTML", filename)
 
 
 @app.route("/favicon.ico")
 def favicon():
-    return send_from_directory(
-        os.path.abspath(os.path.join(BASE_DIR, "../IMAGENS")), "favicon.ico"
-    )
+    return servir_estatico("IMAGENS", "favicon.ico")
 
 
 @app.route("/css/<path:filename>")
 def serve_css(filename):
-    return send_from_directory(
-        os.path.abspath(os.path.join(BASE_DIR, "../CSS")), filename
-    )
+    return servir_estatico("CSS", filename)
 
 
 @app.route("/js/<path:filename>")
 def serve_js(filename):
-    return send_from_directory(
-        os.path.abspath(os.path.join(BASE_DIR, "../JS")), filename
-    )
+    return servir_estatico("JS", filename)
 
 
 @app.route("/imagens/<path:filename>")
 def serve_imagens(filename):
-    return send_from_directory(
-        os.path.abspath(os.path.join(BASE_DIR, "../IMAGENS")), filename
-    )
+    return servir_estatico("IMAGENS", filename)
 
 
 @app.route("/docs/<path:filename>")
@@ -990,10 +1904,7 @@ PAGE_MAPPING = {
 @app.route("/p/<page>")
 def friendly_page_p(page):
     if page in PAGE_MAPPING:
-        html_file = PAGE_MAPPING[page]
-        return send_from_directory(
-            os.path.abspath(os.path.join(BASE_DIR, "../HTML")), html_file
-        )
+        return servir_estatico("HTML", PAGE_MAPPING[page])
     else:
         abort(404)
 
@@ -1010,9 +1921,7 @@ def index():
     app_logger.info(f"Acessando a página inicial. Sessão: {dict(session)}")
     if "user_id" not in session:
         return redirect("/p/login")
-    return send_from_directory(
-        os.path.abspath(os.path.join(BASE_DIR, "../HTML")), "02-home.html"
-    )
+    return servir_estatico("HTML", "02-home.html")
 
 
 @app.route("/force-logout")
@@ -1025,18 +1934,14 @@ def force_logout():
 @app.route("/help")
 @login_required
 def help_page():
-    return send_from_directory(
-        os.path.abspath(os.path.join(BASE_DIR, "../HTML")), "09-help.html"
-    )
+    return servir_estatico("HTML", "09-help.html")
 
 
 @app.route("/snake")
 @login_required
 def snake_game():
     app_logger.info("Easter Egg Acessado: Jogo Snake")
-    return send_from_directory(
-        os.path.abspath(os.path.join(BASE_DIR, "../HTML")), "10-snake.html"
-    )
+    return servir_estatico("HTML", "10-snake.html")
 
 
 # Atualizar rota de documentação para buscar em DOCS
@@ -1080,6 +1985,10 @@ def listar_clientes():
         # Constrói a cláusula ORDER BY de forma segura
         order_clause = f"ORDER BY {order_field} {order_order.upper()}"
 
+        # Filtro opcional de busca (índice FTS5, sem diferenciar acentos)
+        search = request.args.get("search", default="", type=str).strip()
+        where_clause, parametros = filtro_busca_clientes(search)
+
         # Query SQL para selecionar clientes com paginação
         query = f"""
         SELECT id, nome, nome_fantasia, email, telefone, ativo,
@@ -1088,18 +1997,21 @@ def listar_clientes():
                 sexo, profissao, estado_civil, inscricao_municipal,
                 cep, rua, numero, complemento, bairro, cidade, estado, pais
         FROM clientes
+        WHERE {where_clause}
         {order_clause} LIMIT ? OFFSET ?
         """
 
         with get_db_connection() as conn:
             cursor = conn.cursor()
 
-            # Conta o total de clientes para cálculo de paginação
-            cursor.execute("SELECT COUNT(*) FROM clientes")
+            # Conta o total de clientes (com o mesmo filtro) para cálculo de paginação
+            cursor.execute(
+                f"SELECT COUNT(*) FROM clientes WHERE {where_clause}", parametros
+            )
             total = cursor.fetchone()[0]
 
             # Executa a consulta principal
-            cursor.execute(query, (limite, offset))
+            cursor.execute(query, parametros + [limite, offset])
             rows = cursor.fetchall()
             colunas = [desc[0] for desc in cursor.description]
             clientes = [dict(zip(colunas, row)) for row in rows]
@@ -1109,7 +2021,7 @@ def listar_clientes():
 
             # Registra operação no log
             app_logger.info(
-                f"Listando clientes - Página: {pagina}, Limite: {limite}, Total: {total}"
+                f"Listando clientes - Página: {pagina}, Limite: {limite}, Busca: {search or '-'}, Total: {total}"
             )
 
             # Retorna os resultados paginados
@@ -1532,7 +2444,7 @@ def abrir_chamado():
         return jsonify({"erro": "Erro ao abrir chamado"}), 500
 
 
-# Rota para listar chamados com paginação e filtro por status
+# Rota para listar chamados com paginação e filtro por status e cliente
 @app.route("/chamados", methods=["GET"])
 @login_required
 def listar_chamados():
@@ -1540,15 +2452,36 @@ def listar_chamados():
         # Parâmetros de paginação e filtro
         pagina = request.args.get("pagina", default=1, type=int)
         limite = request.args.get("limite", default=10, type=int)
-        status = request.args.get("status", default="Aberto", type=str)
+        cliente_id = request.args.get("cliente_id", type=int)
         offset = (pagina - 1) * limite
 
+        # Aceita vários status em uma chamada: status=Aberto,Finalizado ou status repetido
+        status_lista = [
+            item.strip()
+            for valor in request.args.getlist("status")
+            for item in valor.split(",")
+            if item.strip()
+        ] or ["Aberto"]
+        status = ",".join(status_lista)
+
+        # Monta o filtro (usa o índice chamados(cliente_id, status, data_abertura))
+        condicoes = [f"c.status IN ({', '.join('?' for _ in status_lista)})"]
+        parametros = list(status_lista)
+        if cliente_id is not None:
+            condicoes.insert(0, "c.cliente_id = ?")
+            parametros.insert(0, cliente_id)
+        where = " AND ".join(condicoes)
+
         with get_db_connection() as conn:
             cursor = conn.cursor()
 
-            # Conta o total de chamados com o status especificado
-            cursor.execute("SELECT COUNT(*) FROM chamados WHERE status = ?", (status,))
-            total = cursor.fetchone()[0]
+            # Conta o total de chamados por status com o mesmo filtro
+            cursor.execute(
+                f"SELECT c.status, COUNT(*) FROM chamados c WHERE {where} GROUP BY c.status",
+                parametros,
+            )
+            total_por_status = dict(cursor.fetchall())
+            total = sum(total_por_status.values())
 
             # Query SQL para selecionar chamados com paginação e filtro por status
             query = """
@@ -1569,12 +2502,12 @@ def listar_chamados():
                 FROM chamados c
                 LEFT JOIN clientes cl ON c.cliente_id = cl.id
                 LEFT JOIN departamentos d ON c.departamento_id = d.id
-                WHERE c.status = ?
+                WHERE {where}
                 ORDER BY c.data_abertura DESC
                 LIMIT ? OFFSET ?
             """
 
-            cursor.execute(query, (status, limite, offset))
+            cursor.execute(query.format(where=where), parametros + [limite, offset])
             chamados = cursor.fetchall()
 
             # Processa os resultados para incluir o nome do cliente
@@ -1589,7 +2522,7 @@ def listar_chamados():
 
             # Registra operação no log
             app_logger.info(
-                f"Listando chamados - Status: {status}, Página: {pagina}, Limite: {limite}, Total: {total}"
+                f"Listando chamados - Status: {status}, Cliente: {cliente_id or '-'}, Página: {pagina}, Limite: {limite}, Total: {total}"
             )
 
             # Retorna os resultados paginados
@@ -1597,6 +2530,9 @@ def listar_chamados():
                 {
                     "chamados": chamados_processados,
                     "total": total,
+                    "total_por_status": {
+                        item: total_por_status.get(item, 0) for item in status_lista
+                    },
                     "pagina_atual": pagina,
                     "total_paginas": (total + limite - 1) // limite,
                 }
@@ -1743,6 +2679,196 @@ def finalizar_chamado(id):
         return jsonify({"erro": "Erro ao finalizar chamado"}), 500
 
 
+# Limite de chamados alterados por operação em lote
+CHAMADOS_LOTE_MAXIMO = 5000
+
+# Ações do lote: (descrição, SET do UPDATE, condição para o chamado ser alterado)
+ACOES_LOTE_CHAMADOS = {
+    "finalizar": (
+        "finalizado(s)",
+        "status = 'Finalizado', data_fechamento = ?",
+        "status != 'Finalizado'",
+    ),
+    "reabrir": (
+        "reaberto(s)",
+        "status = 'Aberto', data_fechamento = NULL",
+        "status != 'Aberto'",
+    ),
+    "atribuir": (
+        "atribuído(s) ao departamento",
+        "departamento_id = ?",
+        "departamento_id IS NOT ?",
+    ),
+}
+
+
+def filtro_lote_chamados(ids, filtro):
+    """
+    Monta (condição SQL, parâmetros) para selecionar os chamados do lote pela
+    lista de IDs e/ou por filtro: status (texto ou lista), departamento_id,
+    cliente_id e período de abertura (data_inicio/data_fim, AAAA-MM-DD).
+    Lança ValueError se nenhum critério for informado ou se o filtro não for
+    um objeto.
+    """
+    condicoes, parametros = [], []
+    if ids:
+        ids = [int(id_chamado) for id_chamado in ids]
+        condicoes.append(f"id IN ({', '.join('?' for _ in ids)})")
+        parametros.extend(ids)
+
+    filtro = filtro or {}
+    if not isinstance(filtro, dict):
+        raise ValueError("'filtro' deve ser um objeto")
+    status = filtro.get("status")
+    if status:
+        status = [status] if isinstance(status, str) else list(status)
+        condicoes.append(f"status IN ({', '.join('?' for _ in status)})")
+        parametros.extend(status)
+    for campo in ["departamento_id", "cliente_id"]:
+        if filtro.get(campo) is not None:
+            condicoes.append(f"{campo} = ?")
+            parametros.append(int(filtro[campo]))
+    if filtro.get("data_inicio"):
+        condicoes.append("data_abertura >= ?")
+        parametros.append(
+            datetime.strptime(filtro["data_inicio"], "%Y-%m-%d").strftime("%Y-%m-%d")
+        )
+    if filtro.get("data_fim"):
+        # Inclui o dia final inteiro
+        data_fim = datetime.strptime(filtro["data_fim"], "%Y-%m-%d") + timedelta(days=1)
+        condicoes.append("data_abertura < ?")
+        parametros.append(data_fim.strftime("%Y-%m-%d"))
+
+    if not condicoes:
+        raise ValueError("Informe 'ids' ou ao menos um critério em 'filtro'")
+    return " AND ".join(condicoes), parametros
+
+
+# Rota para aplicar uma ação a vários chamados de uma vez
+# Corpo: {"acao": "finalizar" | "reabrir" | "atribuir", "ids": [...] e/ou
+# "filtro": {...}, "departamento_id" (para atribuir), "andamento" (texto
+# registrado em cada chamado alterado), "simular" (apenas conta, sem alterar)}
+# Tudo é aplicado com executemany em uma única transação; os triggers mantêm a
+# agenda (sincronização e índice de intervalos) consistente.
+@app.route("/chamados/lote", methods=["POST"])
+@login_required
+def operacao_lote_chamados():
+    dados = sanitize_input(request.json or {})
+    if not isinstance(dados, dict):
+        return jsonify({"erro": "O corpo da requisição deve ser um objeto JSON"}), 400
+    acao = dados.get("acao")
+    if acao not in ACOES_LOTE_CHAMADOS:
+        return (
+            jsonify({"erro": f"Ação inválida. Use: {', '.join(ACOES_LOTE_CHAMADOS)}"}),
+            400,
+        )
+    try:
+        where, parametros = filtro_lote_chamados(dados.get("ids"), dados.get("filtro"))
+    except (ValueError, TypeError) as e:
+        return jsonify({"erro": f"Seleção de chamados inválida: {e}"}), 400
+
+    andamento = dados.get("andamento")
+    if andamento is not None and (
+        not isinstance(andamento, str) or not andamento.strip()
+    ):
+        return jsonify({"erro": "O texto do andamento não pode ser vazio"}), 400
+
+    descricao, atribuicao, condicao_alteracao = ACOES_LOTE_CHAMADOS[acao]
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+
+            valor_acao = None
+            if acao == "finalizar":
+                valor_acao = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            elif acao == "atribuir":
+                valor_acao = dados.get("departamento_id")
+                cursor.execute(
+                    "SELECT nome FROM departamentos WHERE id = ?", (valor_acao,)
+                )
+                departamento = cursor.fetchone()
+                if not departamento:
+                    return jsonify({"erro": "Departamento não encontrado"}), 404
+                descricao = f"{descricao} {departamento[0]}"
+
+            # Seleciona os chamados do lote; os que já estão no estado pedido
+            # são contados, mas não alterados
+            parametros_alteracao = [valor_acao] if acao == "atribuir" else []
+            cursor.execute(
+                f"""
+                SELECT id, CASE WHEN {condicao_alteracao} THEN 1 ELSE 0 END
+                FROM chamados
+                WHERE {where}
+                LIMIT ?
+            """,
+                parametros_alteracao + parametros + [CHAMADOS_LOTE_MAXIMO + 1],
+            )
+            selecionados = cursor.fetchall()
+            if len(selecionados) > CHAMADOS_LOTE_MAXIMO:
+                return (
+                    jsonify(
+                        {
+                            "erro": f"O lote excede {CHAMADOS_LOTE_MAXIMO} chamados. Refine o filtro."
+                        }
+                    ),
+                    400,
+                )
+            alterar = [linha[0] for linha in selecionados if linha[1]]
+
+            resposta = {
+                "acao": acao,
+                "total": len(selecionados),
+                "alterados": len(alterar),
+                "ignorados": len(selecionados) - len(alterar),
+                "andamentos": len(alterar) if andamento else 0,
+                "ids": alterar,
+            }
+            if dados.get("ids"):
+                encontrados = {linha[0] for linha in selecionados}
+                resposta["nao_encontrados"] = sorted(
+                    {int(i) for i in dados["ids"]} - encontrados
+                )
+            if dados.get("simular"):
+                return jsonify({**resposta, "simulacao": True})
+
+            if alterar:
+                valores = [] if valor_acao is None else [valor_acao]
+                cursor.executemany(
+                    f"UPDATE chamados SET {atribuicao} WHERE id = ?",
+                    [(*valores, id_chamado) for id_chamado in alterar],
+                )
+                if andamento:
+                    data_hora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    cursor.executemany(
+                        """
+                        INSERT INTO chamados_andamentos (chamado_id, data_hora, texto, usuario_id)
+                        VALUES (?, ?, ?, ?)
+                    """,
+                        [
+                            (
+                                id_chamado,
+                                data_hora,
+                                andamento.strip(),
+                                session.get("user_id"),
+                            )
+                            for id_chamado in alterar
+                        ],
+                    )
+                conn.commit()
+
+            app_logger.info(
+                f"Operação em lote '{acao}' por {session.get('username')}: "
+                f"{len(alterar)} chamado(s) {descricao}, "
+                f"{resposta['ignorados']} sem alteração"
+            )
+            return jsonify(
+                {**resposta, "mensagem": f"{len(alterar)} chamado(s) {descricao}"}
+            )
+    except Exception as e:
+        app_logger.error(f"Erro na operação em lote de chamados: {e}")
+        return jsonify({"erro": "Erro na operação em lote de chamados"}), 500
+
+
 # Rota para excluir um chamado existente
 @app.route("/chamados/<int:id>", methods=["DELETE"])
 @login_required
@@ -1857,16 +2983,9 @@ def adicionar_andamento(chamado_id):
             # Obtém o ID da nova entrada de progresso
             novo_id = cursor.lastrowid
 
-            # Confirma a transação
+            # Confirma a transação (os dados retornados são os mesmos que foram inseridos)
             conn.commit()
 
-            # Confirma que o andamento foi salvo
-            cursor.execute(
-                "SELECT id, data_hora, texto FROM chamados_andamentos WHERE id = ?",
-                (novo_id,),
-            )
-            andamento = cursor.fetchone()
-
             # Registra sucesso no log
             app_logger.info(f"Andamento criado com sucesso: ID={novo_id}")
 
@@ -1876,9 +2995,9 @@ def adicionar_andamento(chamado_id):
                     {
                         "mensagem": "Andamento adicionado com sucesso!",
                         "andamento": {
-                            "id": andamento[0],
-                            "data_hora": andamento[1],
-                            "texto": andamento[2],
+                            "id": novo_id,
+                            "data_hora": data_hora,
+                            "texto": texto.strip(),
                         },
                     }
                 ),
@@ -1928,119 +3047,147 @@ def excluir_andamento(andamento_id):
         return jsonify({"erro": "Erro ao excluir andamento"}), 500
 
 
+def consultar_chamado(cursor, id):
+    """
+    Retorna o chamado com cliente, departamento, andamentos e agendamento
+    (ou None se não existir). Usa duas consultas: o chamado com os JOINs
+    (incluindo o primeiro agendamento) e a lista de andamentos.
+    """
+    cursor.execute(
+        """
+        SELECT ch.id, ch.cliente_id, ch.descricao, ch.status, ch.data_abertura, 
+            ch.data_fechamento, ch.protocolo, ch.assunto, ch.telefone, ch.solicitante,
+            cl.nome as cliente_nome, cl.telefone as cliente_telefone, d.nome as departamento_nome, ch.departamento_id,
+            ag.id, ag.data_agendamento, ag.data_final_agendamento, ag.observacoes
+        FROM chamados ch
+        LEFT JOIN clientes cl ON ch.cliente_id = cl.id
+        LEFT JOIN departamentos d ON ch.departamento_id = d.id
+        LEFT JOIN agendamentos ag ON ag.id = (
+            SELECT MIN(id) FROM agendamentos WHERE chamado_id = ch.id
+        )
+        WHERE ch.id = ?
+    """,
+        (id,),
+    )
+    chamado = cursor.fetchone()
+    if not chamado:
+        return None
+
+    # Seleciona as entradas de progresso (andamentos) para o chamado, ordenadas por data e hora
+    cursor.execute(
+        """
+        SELECT ca.id, ca.data_hora, ca.texto, u.username
+        FROM chamados_andamentos ca
+        LEFT JOIN usuarios u ON ca.usuario_id = u.id
+        WHERE ca.chamado_id = ?
+        ORDER BY ca.data_hora
+    """,
+        (id,),
+    )
+    andamentos = cursor.fetchall()
+
+    return {
+        "id": chamado[0],
+        "cliente_id": chamado[1],
+        "descricao": sanitize_html(chamado[2]),
+        "status": chamado[3],
+        "data_abertura": chamado[4],
+        "data_fechamento": chamado[5],
+        "protocolo": chamado[6],
+        "assunto": sanitize_html(chamado[7]),
+        "telefone": chamado[8],
+        "solicitante": sanitize_html(chamado[9]),
+        "cliente_nome": chamado[10],
+        "cliente_telefone": chamado[11],
+        "departamento_nome": chamado[12] or "-",
+        "departamento_id": chamado[13],
+        "andamentos": [
+            {
+                "id": a[0],
+                "data_hora": a[1],
+                "texto": sanitize_html(a[2]),
+                "username": a[3],
+            }
+            for a in andamentos
+        ],
+        # Agendamento relacionado ao chamado (se existir)
+        "agendamento": (
+            {
+                "data_agendamento": chamado[15],
+                "data_final_agendamento": chamado[16],
+                "observacoes": chamado[17],
+            }
+            if chamado[14] is not None
+            else None
+        ),
+    }
+
+
 # Modifica o endpoint /chamados/<int:id> para incluir as entradas de progresso
 @app.route("/chamados/<int:id>", methods=["GET"])
 @login_required
 def obter_chamado(id):
     try:
         with get_db_connection() as conn:
-            cursor = conn.cursor()
-
-            # Seleciona os dados do chamado, incluindo o nome do cliente através de um JOIN
-            cursor.execute(
-                """
-                SELECT ch.id, ch.cliente_id, ch.descricao, ch.status, ch.data_abertura, 
-                    ch.data_fechamento, ch.protocolo, ch.assunto, ch.telefone, ch.solicitante,
-                    cl.nome as cliente_nome, cl.telefone as cliente_telefone, d.nome as departamento_nome, ch.departamento_id
-                FROM chamados ch
-                LEFT JOIN clientes cl ON ch.cliente_id = cl.id
-                LEFT JOIN departamentos d ON ch.departamento_id = d.id
-                WHERE ch.id = ?
-            """,
-                (id,),
-            )
-
-            # Obtém o resultado da consulta
-            chamado = cursor.fetchone()
+            chamado = consultar_chamado(conn.cursor(), id)
 
             # Verifica se o chamado foi encontrado
             if not chamado:
                 app_logger.warning(f"Chamado não encontrado: {id}")
                 return jsonify({"erro": "Chamado não encontrado"}), 404
 
-            # Seleciona as entradas de progresso (andamentos) para o chamado, ordenadas por data e hora
-            cursor.execute(
-                """
-                SELECT ca.id, ca.data_hora, ca.texto, u.username
-                FROM chamados_andamentos ca
-                LEFT JOIN usuarios u ON ca.usuario_id = u.id
-                WHERE ca.chamado_id = ?
-                ORDER BY ca.data_hora
-            """,
-                (id,),
-            )
+            # Registra sucesso no log
+            app_logger.info(f"Detalhes do chamado obtidos com sucesso: {id}")
 
-            # Obtém os dados dos andamentos
-            andamentos_data = cursor.fetchall()
+            # Retorna os dados do chamado, a lista de andamentos e o agendamento (se existir)
+            return jsonify(chamado)
+    except Exception as e:
+        # Registra falha no log
+        app_logger.error(f"Erro ao obter detalhes do chamado: {e}")
 
-            # Converte os dados dos andamentos em uma lista de dicionários
-            andamentos_list = [
-                {"id": row[0], "data_hora": row[1], "texto": row[2], "username": row[3]}
-                for row in andamentos_data
-            ]
+        # Retorna mensagem de erro genérica
+        return jsonify({"erro": "Erro ao obter detalhes do chamado"}), 500
 
-            # Busca os agendamentos relacionados ao chamado
-            cursor.execute(
-                """
-                SELECT data_agendamento, data_final_agendamento, observacoes
-                FROM agendamentos
-                WHERE chamado_id = ?
-            """,
-                (id,),
-            )
 
-            # Obtém os dados do agendamento
-            agendamento = cursor.fetchone()
+# Rota composta para a tela de detalhes do chamado: chamado (com andamentos e
+# agendamento), cadastro do cliente e lista de departamentos em uma única
+# requisição e uma única conexão, em vez de várias chamadas do front-end
+@app.route("/chamados/<int:id>/detalhes", methods=["GET"])
+@login_required
+def obter_detalhes_chamado(id):
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            chamado = consultar_chamado(cursor, id)
 
-            # Converte os dados do agendamento em um dicionário, se existir
-            agendamento_data = (
-                dict(
-                    zip(
-                        ["data_agendamento", "data_final_agendamento", "observacoes"],
-                        agendamento,
-                    )
-                )
-                if agendamento
+            if not chamado:
+                app_logger.warning(f"Chamado não encontrado: {id}")
+                return jsonify({"erro": "Chamado não encontrado"}), 404
+
+            cliente = (
+                consultar_cliente(cursor, chamado["cliente_id"])
+                if chamado["cliente_id"] is not None
                 else None
             )
 
-            # Registra sucesso no log
-            app_logger.info(f"Detalhes do chamado obtidos com sucesso: {id}")
+            cursor.execute(
+                "SELECT id, nome, descricao FROM departamentos ORDER BY id DESC"
+            )
+            departamentos = [
+                {"id": d[0], "nome": d[1], "descricao": d[2]} for d in cursor.fetchall()
+            ]
+
+            app_logger.info(f"Detalhes completos do chamado obtidos com sucesso: {id}")
 
-            # Retorna os dados do chamado, a lista de andamentos e o agendamento (se existir)
             return jsonify(
                 {
-                    "id": chamado[0],
-                    "cliente_id": chamado[1],
-                    "descricao": sanitize_html(chamado[2]),
-                    "status": chamado[3],
-                    "data_abertura": chamado[4],
-                    "data_fechamento": chamado[5],
-                    "protocolo": chamado[6],
-                    "assunto": sanitize_html(chamado[7]),
-                    "telefone": chamado[8],
-                    "solicitante": sanitize_html(chamado[9]),
-                    "cliente_nome": chamado[10],
-                    "cliente_telefone": chamado[11],
-                    "departamento_nome": chamado[12] or "-",
-                    "departamento_id": chamado[13],
-                    "andamentos": [
-                        {
-                            "id": a["id"],
-                            "data_hora": a["data_hora"],
-                            "texto": sanitize_html(a["texto"]),
-                            "username": a["username"],
-                        }
-                        for a in andamentos_list
-                    ],
-                    "agendamento": agendamento_data,
+                    "chamado": chamado,
+                    "cliente": cliente,
+                    "departamentos": departamentos,
                 }
             )
     except Exception as e:
-        # Registra falha no log
-        app_logger.error(f"Erro ao obter detalhes do chamado: {e}")
-
-        # Retorna mensagem de erro genérica
+        app_logger.error(f"Erro ao obter detalhes completos do chamado: {e}")
         return jsonify({"erro": "Erro ao obter detalhes do chamado"}), 500
 
 
@@ -2106,6 +3253,489 @@ def buscar_chamados():
         return jsonify({"erro": "Erro na busca de chamados"}), 500
 
 
+# ========================================================
+# AUTOCOMPLETE (BUSCA INCREMENTAL DE CLIENTES E CHAMADOS)
+# ========================================================
+
+# Limites de resultados por requisição (o padrão e o máximo aceito)
+AUTOCOMPLETE_LIMITE_PADRAO = 10
+AUTOCOMPLETE_LIMITE_MAX = 20
+
+# Cache LRU em memória (por processo) dos prefixos digitados recentemente
+AUTOCOMPLETE_CACHE_TAMANHO = 256
+AUTOCOMPLETE_CACHE_TTL = 30  # segundos
+_autocomplete_cache = OrderedDict()
+_autocomplete_cache_lock = threading.Lock()
+
+
+def obter_cache_autocomplete(chave):
+    with _autocomplete_cache_lock:
+        item = _autocomplete_cache.get(chave)
+        if item is None:
+            return None
+        criado_em, itens = item
+        if monotonic() - criado_em > AUTOCOMPLETE_CACHE_TTL:
+            del _autocomplete_cache[chave]
+            return None
+        _autocomplete_cache.move_to_end(chave)
+        return itens
+
+
+def salvar_cache_autocomplete(chave, itens):
+    with _autocomplete_cache_lock:
+        _autocomplete_cache[chave] = (monotonic(), itens)
+        _autocomplete_cache.move_to_end(chave)
+        while len(_autocomplete_cache) > AUTOCOMPLETE_CACHE_TAMANHO:
+            _autocomplete_cache.popitem(last=False)
+
+
+@app.after_request
+def invalidar_cache_autocomplete(response):
+    # Alterações em clientes ou chamados (inclusive importações) limpam o cache deste processo;
+    # nos demais processos do Gunicorn as entradas expiram pelo TTL
+    if (
+        request.method not in ("GET", "HEAD", "OPTIONS")
+        and response.status_code < 400
+        and request.path.startswith(("/clientes", "/chamados", "/admin/database"))
+    ):
+        with _autocomplete_cache_lock:
+            _autocomplete_cache.clear()
+    return response
+
+
+def autocomplete_clientes(cursor, termo, limite):
+    """Clientes pelo ID exato ou por prefixo das palavras (índice FTS5)"""
+    itens = []
+    if termo.isdigit():
+        cursor.execute(
+            "SELECT id, nome, nome_fantasia, email FROM clientes WHERE id = ?",
+            (int(termo),),
+        )
+        itens.extend(cursor.fetchall())
+
+    consulta = montar_consulta_fts(termo)
+    if consulta:
+        if busca_fts_disponivel:
+            # O LIMIT vem depois da ordenação, como na busca sem índice: os
+            # primeiros clientes em ordem alfabética entre todos os encontrados
+            # (um LIMIT dentro da busca FTS traria um subconjunto arbitrário)
+            cursor.execute(
+                f"""
+                SELECT c.id, c.nome, c.nome_fantasia, c.email
+                FROM clientes c
+                WHERE c.id IN (
+                    SELECT rowid FROM {TABELA_BUSCA_CLIENTES}
+                    WHERE {TABELA_BUSCA_CLIENTES} MATCH ?
+                )
+                ORDER BY c.nome, c.id
+                LIMIT ?
+            """,
+                (consulta, limite + len(itens)),
+            )
+        else:
+            where_clause, parametros = filtro_busca_clientes(termo, "c")
+            cursor.execute(
+                f"""SELECT c.id, c.nome, c.nome_fantasia, c.email FROM clientes c
+                WHERE {where_clause} ORDER BY c.nome, c.id LIMIT ?""",
+                parametros + [limite + len(itens)],
+            )
+        ids = {item[0] for item in itens}
+        itens.extend(linha for linha in cursor.fetchall() if linha[0] not in ids)
+
+    return [
+        {
+            "id": linha[0],
+            "label": linha[1],
+            "detalhe": linha[3] or linha[2] or "",
+        }
+        for linha in itens[:limite]
+    ]
+
+
+def autocomplete_chamados(cursor, termo, limite, status):
+    """
+    Chamados pelo ID exato, por prefixo do protocolo (índice em protocolo)
+    ou por prefixo do nome do cliente (índice FTS5 + índice por cliente).
+    O limite vale só para o resultado ordenado: um LIMIT na busca de clientes
+    descartaria chamados de clientes quaisquer antes da ordenação.
+    """
+    condicoes, parametros = [], []
+    if termo.isdigit():
+        condicoes.append("c.id = ?")
+        parametros.append(int(termo))
+        # Faixa equivalente a LIKE 'termo%' que aproveita o índice em protocolo
+        condicoes.append("(c.protocolo >= ? AND c.protocolo < ?)")
+        parametros.extend([termo, termo + "\uffff"])
+
+    consulta = montar_consulta_fts(termo)
+    if consulta and busca_fts_disponivel:
+        condicoes.append(
+            f"""c.cliente_id IN (
+                SELECT rowid FROM {TABELA_BUSCA_CLIENTES}
+                WHERE {TABELA_BUSCA_CLIENTES} MATCH ?
+            )"""
+        )
+        parametros.append(consulta)
+    elif consulta:
+        where_clause, parametros_cliente = filtro_busca_clientes(termo, "cl")
+        condicoes.append(where_clause)
+        parametros.extend(parametros_cliente)
+
+    if not condicoes:
+        return []
+
+    cursor.execute(
+        f"""
+        SELECT c.id, c.protocolo, c.assunto, cl.nome
+        FROM chamados c
+        LEFT JOIN clientes cl ON c.cliente_id = cl.id
+        WHERE c.status = ? AND ({" OR ".join(condicoes)})
+        ORDER BY c.data_abertura DESC, c.id DESC
+        LIMIT ?
+    """,
+        [status] + parametros + [limite],
+    )
+    return [
+        {
+            "id": linha[0],
+            "label": f"#{linha[0]} - {linha[3] or 'Cliente removido'} - {linha[2] or ''}",
+            "protocolo": linha[1],
+            "cliente": linha[3] or "Cliente removido",
+            "assunto": linha[2] or "",
+        }
+        for linha in cursor.fetchall()
+    ]
+
+
+# Rota leve para campos de busca incremental: retorna apenas id/rótulo, com limite fixo
+@app.route("/autocomplete/<tipo>", methods=["GET"])
+@login_required
+def autocomplete(tipo):
+    if tipo not in ("clientes", "chamados"):
+        return jsonify({"erro": "Tipo de autocomplete inválido"}), 404
+
+    termo = request.args.get("q", "").strip()
+    limite = request.args.get("limite", default=AUTOCOMPLETE_LIMITE_PADRAO, type=int)
+    limite = max(1, min(limite, AUTOCOMPLETE_LIMITE_MAX))
+    status = request.args.get("status", "Aberto")
+
+    if not termo:
+        return jsonify({"itens": []})
+
+    chave = (
+        tipo,
+        normalizar_sqlite(termo),
+        limite,
+        status if tipo == "chamados" else None,
+    )
+    itens = obter_cache_autocomplete(chave)
+    if itens is None:
+        try:
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                if tipo == "clientes":
+                    itens = autocomplete_clientes(cursor, termo, limite)
+                else:
+                    itens = autocomplete_chamados(cursor, termo, limite, status)
+        except Exception as e:
+            app_logger.error(f"Erro no autocomplete de {tipo}: {e}")
+            return jsonify({"erro": "Erro na busca"}), 500
+        salvar_cache_autocomplete(chave, itens)
+
+    return jsonify({"itens": itens})
+
+
+# ========================================================
+# CANAL DE EVENTOS (SSE)
+# ========================================================
+
+# GET /eventos mantém uma conexão Server-Sent Events por navegador (as abas
+# compartilham a conexão, ver 13-autenticador.js) e envia as alterações de
+# chamados, clientes e agendamentos e a invalidação da sessão, no lugar das
+# consultas periódicas de cada aba. Em cada worker, uma única thread lê a
+# tabela de eventos e acorda as conexões abertas, independente de quantas sejam.
+# Cada conexão ocupa uma thread: requer workers gthread (gunicorn_config.py),
+# que reserva parte das threads de cada worker para as demais requisições.
+EVENTOS_INTERVALO_CONSULTA = 1.0  # Segundos entre leituras da tabela, por worker
+EVENTOS_PING = 20  # Segundos sem eventos até um comentário de keep-alive
+EVENTOS_DURACAO_MAXIMA = (
+    300  # Depois disso a conexão é encerrada e o navegador reconecta
+)
+EVENTOS_RECONEXAO_MS = 3000  # Campo "retry": espera do navegador antes de reconectar
+EVENTOS_MEMORIA = 2000  # Eventos recentes mantidos em memória por worker
+EVENTOS_IDS_MAXIMOS = 100  # Ids enviados por tabela em cada mensagem
+EVENTOS_ESPERA_RECUSA = 30  # Retry-After (segundos) quando o worker está lotado
+
+# Conexões abertas aceitas por worker; None = sem limite (fora do Gunicorn)
+_eventos_conexoes_maximas = None
+
+# Estado do canal deste worker (cada processo do Gunicorn tem o seu)
+_feed_eventos = {}
+
+
+def limitar_conexoes_eventos(maximo):
+    """
+    Define quantas conexões do canal este worker mantém abertas (post_worker_init
+    do Gunicorn). Acima disso /eventos responde 503, e as threads restantes
+    continuam livres para as demais requisições; 0 recusa todas (workers sync).
+    """
+    global _eventos_conexoes_maximas
+    _eventos_conexoes_maximas = max(maximo, 0)
+
+
+def _reiniciar_feed_eventos():
+    """Estado inicial; chamado também no processo filho após um fork"""
+    _feed_eventos.update(
+        {
+            "condicao": threading.Condition(),
+            "thread": None,
+            "conexoes": 0,
+            "ultimo_id": 0,
+            "descartado_ate": 0,  # Maior id que já saiu da memória
+            "geracao": 0,  # Incrementada quando o arquivo do banco é substituído
+            "recentes": deque(),  # (id, tabela, acao, registro_id)
+        }
+    )
+
+
+_reiniciar_feed_eventos()
+# A thread de leitura não sobrevive ao fork: o worker começa com o canal vazio
+os.register_at_fork(after_in_child=_reiniciar_feed_eventos)
+
+
+def _acompanhar_eventos():
+    """Thread do worker: lê os eventos novos e acorda as conexões que esperam"""
+    feed = _feed_eventos
+    while True:
+        sleep(EVENTOS_INTERVALO_CONSULTA)
+        with feed["condicao"]:
+            if feed["conexoes"] == 0:
+                feed["thread"] = None
+                return
+            ultimo = feed["ultimo_id"]
+
+        novos = []
+        try:
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(f"SELECT MAX(id) FROM {TABELA_EVENTOS}")
+                maximo = cursor.fetchone()[0] or 0
+                if maximo > ultimo:
+                    cursor.execute(
+                        f"""SELECT id, tabela, acao, registro_id FROM {TABELA_EVENTOS}
+                        WHERE id > ? ORDER BY id""",
+                        (ultimo,),
+                    )
+                    novos = cursor.fetchall()
+        except sqlite3.Error as e:
+            if "no such table" not in str(e):
+                continue
+            maximo = 0  # Banco sem a tabela: foi trocado por outro arquivo
+
+        with feed["condicao"]:
+            if maximo < feed["ultimo_id"]:
+                # Os ids só crescem: um máximo menor indica troca do arquivo do banco
+                app_logger.warning(
+                    "Canal de eventos: banco de dados substituído, sessões serão revalidadas"
+                )
+                feed["geracao"] += 1
+                feed["recentes"].clear()
+                feed["ultimo_id"] = feed["descartado_ate"] = maximo
+            elif novos:
+                feed["recentes"].extend(novos)
+                while len(feed["recentes"]) > EVENTOS_MEMORIA:
+                    feed["descartado_ate"] = feed["recentes"].popleft()[0]
+                feed["ultimo_id"] = novos[-1][0]
+            else:
+                continue
+            feed["condicao"].notify_all()
+
+
+def _reservar_conexao_eventos():
+    """
+    Conta uma conexão nova, se o worker tiver vaga. A verificação e a contagem
+    acontecem juntas: após a reciclagem de um worker, todos os navegadores
+    reconectam ao mesmo tempo, e nenhum pode passar do limite.
+    """
+    feed = _feed_eventos
+    with feed["condicao"]:
+        maximas = _eventos_conexoes_maximas
+        if maximas is not None and feed["conexoes"] >= maximas:
+            return False
+        feed["conexoes"] += 1
+        return True
+
+
+def _liberar_conexao_eventos():
+    with _feed_eventos["condicao"]:
+        _feed_eventos["conexoes"] -= 1
+
+
+def _inscrever_feed_eventos(maximo):
+    """Inicia a thread de leitura do worker, se parada (a conexão já foi contada)"""
+    feed = _feed_eventos
+    with feed["condicao"]:
+        if feed["thread"] is None:
+            # Parada, a thread não acompanhou o banco: recomeça do máximo atual
+            feed["ultimo_id"] = feed["descartado_ate"] = maximo
+            feed["recentes"].clear()
+            feed["thread"] = threading.Thread(
+                target=_acompanhar_eventos, name="canal-eventos", daemon=True
+            )
+            feed["thread"].start()
+        return feed["geracao"]
+
+
+def agrupar_eventos(eventos, usuario_id):
+    """
+    Agrupa os eventos em uma mensagem por tabela (uma operação em massa vira uma
+    mensagem, não centenas). Retorna (mensagens, sessão encerrada).
+    """
+    por_tabela = {}
+    for _, tabela, acao, registro_id in eventos:
+        if tabela == "usuarios":
+            if registro_id == usuario_id:
+                return [("sessao", {"motivo": "usuario_excluido"})], True
+            continue
+        grupo = por_tabela.setdefault(tabela, {"acoes": set(), "ids": set()})
+        grupo["acoes"].add(acao)
+        grupo["ids"].add(registro_id)
+
+    mensagens = []
+    for tabela, grupo in sorted(por_tabela.items()):
+        ids = sorted(grupo["ids"])
+        mensagens.append(
+            (
+                tabela,
+                {
+                    "acoes": sorted(grupo["acoes"]),
+                    "ids": ids[:EVENTOS_IDS_MAXIMOS],
+                    "total": len(ids),
+                },
+            )
+        )
+    return mensagens, False
+
+
+def formatar_mensagem_sse(tipo, dados, id_evento=None):
+    linhas = [f"id: {id_evento}"] if id_evento is not None else []
+    linhas += [f"event: {tipo}", f"data: {json.dumps(dados)}"]
+    return "\n".join(linhas) + "\n\n"
+
+
+@app.route("/eventos")
+@login_required
+def eventos():
+    """
+    Stream de eventos (text/event-stream). Na reconexão, o navegador envia o
+    cabeçalho Last-Event-ID e recebe o que perdeu; se os eventos já tiverem sido
+    descartados, recebe "ressincronizar" e recarrega os dados da tela.
+    """
+    usuario_id = session["user_id"]
+    try:
+        desde = int(request.headers.get("Last-Event-ID", ""))
+    except ValueError:
+        desde = None
+
+    iniciais, perdidos = [], []
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT MIN(id), MAX(id) FROM {TABELA_EVENTOS}")
+        minimo, maximo = cursor.fetchone()
+        minimo, maximo = minimo or 0, maximo or 0
+        if desde is not None and desde > maximo:
+            iniciais.append(("sessao", {"motivo": "banco_substituido"}))
+        elif desde is not None and desde < minimo - 1:
+            iniciais.append(("ressincronizar", {}))
+        elif desde is not None and desde < maximo:
+            cursor.execute(
+                f"""SELECT id, tabela, acao, registro_id FROM {TABELA_EVENTOS}
+                WHERE id > ? ORDER BY id LIMIT ?""",
+                (desde, EVENTOS_MEMORIA + 1),
+            )
+            perdidos = cursor.fetchall()
+            if len(perdidos) > EVENTOS_MEMORIA:
+                iniciais.append(("ressincronizar", {}))
+                perdidos = []
+
+    # A verificação e a contagem acontecem juntas, depois da leitura do banco:
+    # daqui até o Response nada pode falhar, e a vaga é liberada quando a
+    # resposta é fechada (call_on_close), mesmo que o stream nunca seja iniciado
+    if not _reservar_conexao_eventos():
+        # Sem isso, as conexões ocupariam todas as threads e as demais
+        # requisições do worker ficariam na fila. O navegador tenta de novo
+        # mais tarde (13-autenticador.js) e recarrega os dados da tela.
+        app_logger.warning(
+            f"Canal de eventos lotado neste worker ({_eventos_conexoes_maximas} conexões): conexão recusada"
+        )
+        return (
+            jsonify({"erro": "Canal de eventos lotado. Tente novamente em instantes."}),
+            503,
+            {"Retry-After": str(EVENTOS_ESPERA_RECUSA)},
+        )
+
+    def gerar():
+        feed = _feed_eventos
+        condicao = feed["condicao"]
+        geracao = _inscrever_feed_eventos(maximo)
+        yield f"retry: {EVENTOS_RECONEXAO_MS}\n\n"
+        mensagens, encerrar = agrupar_eventos(perdidos, usuario_id)
+        for indice, (tipo, dados) in enumerate(iniciais + mensagens):
+            ultima = indice == len(iniciais) + len(mensagens) - 1
+            yield formatar_mensagem_sse(tipo, dados, maximo if ultima else None)
+        if encerrar or any(tipo == "sessao" for tipo, _ in iniciais):
+            return
+
+        visto = maximo
+        limite = monotonic() + EVENTOS_DURACAO_MAXIMA
+        while True:
+            restante = limite - monotonic()
+            if restante <= 0:
+                return
+            novos, mensagens = [], []
+            with condicao:
+                condicao.wait_for(
+                    lambda: feed["ultimo_id"] > visto or feed["geracao"] != geracao,
+                    timeout=min(EVENTOS_PING, restante),
+                )
+                if feed["geracao"] != geracao:
+                    mensagens = [("sessao", {"motivo": "banco_substituido"})]
+                elif visto < feed["descartado_ate"]:
+                    mensagens = [("ressincronizar", {})]
+                else:
+                    # Os mais novos ficam no fim: percorre de trás para frente
+                    for evento in reversed(feed["recentes"]):
+                        if evento[0] <= visto:
+                            break
+                        novos.append(evento)
+                    novos.reverse()
+                visto = max(visto, feed["ultimo_id"])
+
+            if mensagens and mensagens[0][0] == "sessao":
+                yield formatar_mensagem_sse(*mensagens[0])
+                return
+            if novos:
+                mensagens, encerrar = agrupar_eventos(novos, usuario_id)
+                if encerrar:
+                    yield formatar_mensagem_sse(*mensagens[0])
+                    return
+            if mensagens:
+                for indice, (tipo, dados) in enumerate(mensagens):
+                    ultima = indice == len(mensagens) - 1
+                    yield formatar_mensagem_sse(tipo, dados, visto if ultima else None)
+            else:
+                # Keep-alive: detecta conexões fechadas e evita timeouts de proxies
+                yield ": ping\n\n"
+
+    resposta = Response(
+        gerar(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    resposta.call_on_close(_liberar_conexao_eventos)
+    return resposta
+
+
 # ========================================================
 # API DE ESTATÍSTICAS
 # ========================================================
@@ -2356,7 +3986,7 @@ def check_role():
 def renew_session():
     if "user_id" in session:
         # Renova a sessão
-        session.modified = True
+        renovar_sessao()
         # Não loga renovações bem-sucedidas para reduzir spam
         return jsonify({"success": True})
 
@@ -2669,29 +4299,65 @@ def listar_usuarios():
             )
             return jsonify({"error": "Acesso não autorizado"}), 403
 
+        # Com include=departamentos, retorna também os departamentos de cada usuário
+        # (evita uma requisição /usuarios/<id>/departamentos por usuário)
+        incluir = {
+            item.strip()
+            for item in request.args.get("include", "").split(",")
+            if item.strip()
+        }
+
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(
-                """
-                SELECT id, username, role, created_at 
-                FROM usuarios 
-                ORDER BY created_at DESC
-            """
-            )
-            usuarios = cursor.fetchall()
 
-            # Registra sucesso no log
-            app_logger.info(
-                f"Usuário {session.get('username', 'desconhecido')} listou usuários com sucesso."
-            )
-
-            # Retorna a lista de usuários
-            return jsonify(
-                [
+            if "departamentos" in incluir:
+                # Uma única consulta com LEFT JOIN, agrupada por usuário abaixo
+                cursor.execute(
+                    """
+                    SELECT u.id, u.username, u.role, u.created_at,
+                           d.id, d.nome, d.descricao
+                    FROM usuarios u
+                    LEFT JOIN usuario_departamento ud ON ud.usuario_id = u.id
+                    LEFT JOIN departamentos d ON d.id = ud.departamento_id
+                    ORDER BY u.created_at DESC, u.id, d.nome
+                """
+                )
+                usuarios = {}
+                for linha in cursor.fetchall():
+                    usuario = usuarios.get(linha[0])
+                    if usuario is None:
+                        usuario = usuarios[linha[0]] = {
+                            "id": linha[0],
+                            "username": linha[1],
+                            "role": linha[2],
+                            "created_at": linha[3],
+                            "departamentos": [],
+                        }
+                    if linha[4] is not None:
+                        usuario["departamentos"].append(
+                            {"id": linha[4], "nome": linha[5], "descricao": linha[6]}
+                        )
+                resultado = list(usuarios.values())
+            else:
+                cursor.execute(
+                    """
+                    SELECT id, username, role, created_at 
+                    FROM usuarios 
+                    ORDER BY created_at DESC
+                """
+                )
+                resultado = [
                     {"id": u[0], "username": u[1], "role": u[2], "created_at": u[3]}
-                    for u in usuarios
+                    for u in cursor.fetchall()
                 ]
+
+            # Registra sucesso no log
+            app_logger.info(
+                f"Usuário {session.get('username', 'desconhecido')} listou usuários com sucesso."
             )
+
+            # Retorna a lista de usuários
+            return jsonify(resultado)
     except Exception as e:
         # Registra falha no log
         app_logger.error(f"Erro ao listar usuários: {e}")
@@ -2964,11 +4630,10 @@ def atualizar_departamentos_usuario(user_id):
             cursor.execute(
                 "DELETE FROM usuario_departamento WHERE usuario_id=?", (user_id,)
             )
-            for dep_id in departamentos:
-                cursor.execute(
-                    "INSERT INTO usuario_departamento (usuario_id, departamento_id) VALUES (?, ?)",
-                    (user_id, dep_id),
-                )
+            cursor.executemany(
+                "INSERT INTO usuario_departamento (usuario_id, departamento_id) VALUES (?, ?)",
+                [(user_id, dep_id) for dep_id in departamentos],
+            )
             conn.commit()
         app_logger.info(
             f"Departamentos do usuário {user_id} atualizados por {session.get('username', 'desconhecido')}."
@@ -3147,6 +4812,150 @@ def listar_usuarios_departamento(dep_id):
 # ========================================================
 
 
+# Expediente padrão da consulta de horários livres
+AGENDA_EXPEDIENTE_INICIO = "08:00"
+AGENDA_EXPEDIENTE_FIM = "18:00"
+
+
+def consultar_agendamentos_sobrepostos(
+    cursor, departamento_id, inicio, fim, ignorar_id=None
+):
+    """
+    Retorna os agendamentos do departamento que se sobrepõem ao período
+    [inicio, fim), como (id, data_agendamento, data_final_agendamento, protocolo).
+    Usa o índice R*Tree; sem ele, a busca por período de idx_agendamentos_data.
+    """
+    departamento_id = departamento_id or 0
+    if indice_agenda_disponivel:
+        cursor.execute(
+            f"""
+            SELECT ag.id, ag.data_agendamento, ag.data_final_agendamento, ch.protocolo
+            FROM {TABELA_INTERVALOS_AGENDA} r
+            JOIN agendamentos ag ON ag.id = r.id
+            JOIN chamados ch ON ch.id = ag.chamado_id
+            WHERE r.inicio < {minutos_sql("?")} AND r.fim > {minutos_sql("?")}
+              AND r.departamento_min <= ? AND r.departamento_max >= ?
+              AND r.id != ?
+            ORDER BY ag.data_agendamento
+        """,
+            (fim, inicio, departamento_id, departamento_id, ignorar_id or 0),
+        )
+    else:
+        limite_busca = (
+            datetime.fromisoformat(inicio) - timedelta(days=AGENDA_DURACAO_MAXIMA_DIAS)
+        ).strftime("%Y-%m-%dT%H:%M")
+        cursor.execute(
+            """
+            SELECT ag.id, ag.data_agendamento, ag.data_final_agendamento, ch.protocolo
+            FROM agendamentos ag
+            JOIN chamados ch ON ch.id = ag.chamado_id
+            WHERE ag.data_agendamento >= ? AND ag.data_agendamento < ?
+              AND ag.data_final_agendamento > ?
+              AND COALESCE(ch.departamento_id, 0) = ? AND ag.id != ?
+            ORDER BY ag.data_agendamento
+        """,
+            (limite_busca, fim, inicio, departamento_id, ignorar_id or 0),
+        )
+    return cursor.fetchall()
+
+
+def ocupacao_agenda(agendamentos, inicio, fim):
+    """
+    Divide [inicio, fim) em trechos com o número de visitas simultâneas.
+    Retorna uma lista de (início, fim, quantidade) com datas 'AAAA-MM-DDTHH:MM'.
+    """
+    eventos = []
+    for agendamento in agendamentos:
+        try:
+            inicio_visita = max(normalizar_data_agenda(agendamento[1]), inicio)
+            fim_visita = min(normalizar_data_agenda(agendamento[2]), fim)
+        except ValueError:
+            continue
+        if inicio_visita < fim_visita:
+            eventos.extend([(inicio_visita, 1), (fim_visita, -1)])
+
+    # No mesmo instante, os términos (-1) vêm antes dos inícios (+1)
+    eventos.sort()
+    trechos, atual, quantidade = [], inicio, 0
+    for instante, variacao in eventos:
+        if instante > atual:
+            trechos.append((atual, instante, quantidade))
+            atual = instante
+        quantidade += variacao
+    if atual < fim:
+        trechos.append((atual, fim, quantidade))
+    return trechos
+
+
+def capacidade_departamento(cursor, chamado_id):
+    """
+    Retorna (departamento_id, capacidade) do chamado. A capacidade é o número
+    de técnicos vinculados ao departamento, no mínimo 1; chamados sem
+    departamento não disputam técnicos e retornam (None, None), sem limite.
+    """
+    cursor.execute(
+        """
+        SELECT ch.departamento_id,
+            (SELECT COUNT(*) FROM usuario_departamento ud
+             WHERE ud.departamento_id = ch.departamento_id)
+        FROM chamados ch
+        WHERE ch.id = ?
+    """,
+        (chamado_id,),
+    )
+    linha = cursor.fetchone()
+    if not linha or linha[0] is None:
+        return None, None
+    return linha[0], max(linha[1], 1)
+
+
+def verificar_conflito_agenda(cursor, chamado_id, inicio, fim, ignorar_id=None):
+    """
+    Verifica se uma visita em [inicio, fim) excede a capacidade do departamento
+    do chamado. Retorna (capacidade, agendamentos conflitantes); a lista fica
+    vazia quando há técnico livre em todo o período ou o chamado não tem
+    departamento.
+    """
+    departamento_id, capacidade = capacidade_departamento(cursor, chamado_id)
+    if capacidade is None:
+        return None, []
+    sobrepostos = consultar_agendamentos_sobrepostos(
+        cursor, departamento_id, inicio, fim, ignorar_id
+    )
+    if len(sobrepostos) < capacidade:
+        return capacidade, []
+
+    pico = max(
+        (quantidade for _, _, quantidade in ocupacao_agenda(sobrepostos, inicio, fim)),
+        default=0,
+    )
+    if pico < capacidade:
+        return capacidade, []
+    return capacidade, [
+        {
+            "id": agendamento[0],
+            "data_inicio": agendamento[1],
+            "data_fim": agendamento[2],
+            "protocolo": agendamento[3],
+        }
+        for agendamento in sobrepostos
+    ]
+
+
+def resposta_conflito_agenda(capacidade, conflitos):
+    """Resposta 409 padrão para conflito de horário na agenda"""
+    return (
+        jsonify(
+            {
+                "erro": "Conflito de horário: não há técnico livre no departamento",
+                "capacidade": capacidade,
+                "conflitos": conflitos,
+            }
+        ),
+        409,
+    )
+
+
 # Rota para criar um novo agendamento
 @app.route("/agendamentos", methods=["POST"])
 @login_required
@@ -3198,6 +5007,24 @@ def criar_agendamento():
                     409,
                 )
 
+            # Verifica se há técnico livre no departamento do chamado
+            # ('forcar' permite agendar mesmo assim, após confirmação do usuário)
+            if not dados.get("forcar"):
+                try:
+                    inicio = normalizar_data_agenda(data_agendamento)
+                    fim = normalizar_data_agenda(data_final_agendamento)
+                except ValueError:
+                    return jsonify({"erro": "Formato de data inválido"}), 400
+                capacidade, conflitos = verificar_conflito_agenda(
+                    cursor, chamado_id, inicio, fim
+                )
+                if conflitos:
+                    app_logger.warning(
+                        f"Conflito de horário ao agendar o chamado {chamado_id}: "
+                        f"{len(conflitos)} visita(s) no período"
+                    )
+                    return resposta_conflito_agenda(capacidade, conflitos)
+
             # Insere o novo agendamento no banco de dados
             cursor.execute(
                 """
@@ -3236,17 +5063,365 @@ def criar_agendamento():
         return jsonify({"erro": "Erro ao criar agendamento"}), 500
 
 
+# Limite de itens por requisição de agendamento em lote
+AGENDAMENTO_LOTE_MAXIMO = 500
+
+FREQUENCIAS_RECORRENCIA = ["diaria", "dias_uteis", "semanal", "mensal"]
+RECORRENCIA_INTERVALO_MAXIMO = 366  # Em unidades da frequência (dias, semanas...)
+RECORRENCIA_DURACAO_MAXIMA = 24 * 60  # Minutos de cada ocorrência
+
+
+def somar_meses(data, meses):
+    """Soma meses a uma data, limitando o dia ao último dia do mês de destino"""
+    mes = data.month - 1 + meses
+    ano, mes = data.year + mes // 12, mes % 12 + 1
+    dia = min(data.day, calendar.monthrange(ano, mes)[1])
+    return data.replace(year=ano, month=mes, day=dia)
+
+
+def somar_dias_uteis(data, dias):
+    """Avança 'dias' dias úteis (segunda a sexta), de semana em semana"""
+    if data.weekday() >= 5:
+        # Partindo do fim de semana, o primeiro dia útil é a segunda-feira
+        data += timedelta(days=7 - data.weekday())
+        dias -= 1
+    semanas, dias = divmod(dias, 5)
+    data += timedelta(weeks=semanas)
+    for _ in range(dias):
+        data += timedelta(days=3 if data.weekday() == 4 else 1)
+    return data
+
+
+def expandir_recorrencia(regra):
+    """
+    Converte uma regra de recorrência em itens de agendamento: um chamado por
+    ocorrência, na ordem informada. Exemplo:
+    {"chamado_ids": [1, 2], "inicio": "2025-03-03T09:00", "duracao": 60,
+     "frequencia": "semanal", "intervalo": 1, "observacoes": "Preventiva"}
+    Lança ValueError se a regra for inválida.
+    """
+    if not isinstance(regra, dict):
+        raise ValueError("Informe 'recorrencia' como um objeto")
+    chamado_ids = regra.get("chamado_ids")
+    if not isinstance(chamado_ids, list) or not chamado_ids:
+        raise ValueError("Informe a lista 'chamado_ids' da recorrência")
+    frequencia = regra.get("frequencia", "semanal")
+    if frequencia not in FREQUENCIAS_RECORRENCIA:
+        raise ValueError(
+            f"Frequência inválida. Use: {', '.join(FREQUENCIAS_RECORRENCIA)}"
+        )
+    intervalo = int(regra.get("intervalo", 1))
+    duracao = int(regra.get("duracao", 60))
+    if intervalo < 1 or duracao < 1:
+        raise ValueError("Intervalo e duração devem ser positivos")
+    if intervalo > RECORRENCIA_INTERVALO_MAXIMO:
+        raise ValueError(f"O intervalo máximo é {RECORRENCIA_INTERVALO_MAXIMO}")
+    if duracao > RECORRENCIA_DURACAO_MAXIMA:
+        raise ValueError(f"A duração máxima é {RECORRENCIA_DURACAO_MAXIMA} minutos")
+    inicio = datetime.fromisoformat(normalizar_data_agenda(str(regra.get("inicio"))))
+
+    itens, data = [], inicio
+    for indice, chamado_id in enumerate(chamado_ids):
+        if indice > 0:
+            if frequencia == "diaria":
+                data += timedelta(days=intervalo)
+            elif frequencia == "dias_uteis":
+                data = somar_dias_uteis(data, intervalo)
+            elif frequencia == "semanal":
+                data += timedelta(weeks=intervalo)
+            else:
+                data = somar_meses(inicio, indice * intervalo)
+        itens.append(
+            {
+                "chamado_id": chamado_id,
+                "data_agendamento": data.strftime("%Y-%m-%dT%H:%M"),
+                "data_final_agendamento": (data + timedelta(minutes=duracao)).strftime(
+                    "%Y-%m-%dT%H:%M"
+                ),
+                "observacoes": regra.get("observacoes", ""),
+            }
+        )
+    return itens
+
+
+# Rota para criar vários agendamentos de uma vez (lista de itens ou recorrência)
+# Todos os itens são validados em uma passada (chamado existente, chamado já
+# agendado, duplicados no lote e conflito de horário por departamento, inclusive
+# entre os próprios itens) e gravados com executemany em uma única transação.
+# Com "atomico": true, qualquer falha cancela o lote inteiro.
+@app.route("/agendamentos/lote", methods=["POST"])
+@login_required
+def criar_agendamentos_lote():
+    dados = request.json or {}
+    if not isinstance(dados, dict):
+        return jsonify({"erro": "O corpo da requisição deve ser um objeto JSON"}), 400
+    forcar = bool(dados.get("forcar"))
+    atomico = bool(dados.get("atomico"))
+
+    try:
+        if dados.get("recorrencia"):
+            itens = expandir_recorrencia(dados["recorrencia"])
+        else:
+            itens = dados.get("itens")
+            if not isinstance(itens, list) or not itens:
+                return jsonify({"erro": "Informe 'itens' ou 'recorrencia'"}), 400
+    except (ValueError, TypeError, OverflowError) as e:
+        return jsonify({"erro": f"Recorrência inválida: {e}"}), 400
+
+    if len(itens) > AGENDAMENTO_LOTE_MAXIMO:
+        return (
+            jsonify(
+                {"erro": f"Máximo de {AGENDAMENTO_LOTE_MAXIMO} agendamentos por lote"}
+            ),
+            400,
+        )
+
+    # Validação dos dados de cada item (sem acesso ao banco)
+    resultados, validos = [], []
+    for indice, item in enumerate(itens):
+        item = item if isinstance(item, dict) else {}
+        resultado = {"indice": indice, "chamado_id": item.get("chamado_id")}
+        resultados.append(resultado)
+        try:
+            chamado_id = int(item.get("chamado_id"))
+            inicio = normalizar_data_agenda(str(item.get("data_agendamento")))
+            fim = normalizar_data_agenda(str(item.get("data_final_agendamento")))
+        except (ValueError, TypeError):
+            resultado.update(status="erro", erro="Chamado e datas são obrigatórios")
+            continue
+        if fim <= inicio:
+            resultado.update(
+                status="erro", erro="O horário final deve ser maior que o inicial"
+            )
+            continue
+        resultado["chamado_id"] = chamado_id
+        validos.append(
+            (resultado, chamado_id, inicio, fim, item.get("observacoes") or "")
+        )
+
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            chamado_ids = sorted({item[1] for item in validos})
+            marcadores = ",".join("?" * len(chamado_ids))
+
+            # Chamados do lote com departamento, capacidade e agendamento existente
+            chamados = {}
+            if chamado_ids:
+                cursor.execute(
+                    f"""
+                    SELECT ch.id, ch.protocolo, ch.departamento_id,
+                        (SELECT COUNT(*) FROM usuario_departamento ud
+                         WHERE ud.departamento_id = ch.departamento_id),
+                        (SELECT MIN(ag.data_agendamento) FROM agendamentos ag
+                         WHERE ag.chamado_id = ch.id)
+                    FROM chamados ch
+                    WHERE ch.id IN ({marcadores})
+                """,
+                    chamado_ids,
+                )
+                chamados = {linha[0]: linha[1:] for linha in cursor.fetchall()}
+
+            aceitos, vistos = [], set()
+            for resultado, chamado_id, inicio, fim, observacoes in validos:
+                chamado = chamados.get(chamado_id)
+                if not chamado:
+                    resultado.update(status="erro", erro="Chamado não encontrado")
+                elif chamado[3] or chamado_id in vistos:
+                    resultado.update(
+                        status="erro",
+                        erro="Protocolo já agendado",
+                        protocolo=chamado[0],
+                    )
+                else:
+                    vistos.add(chamado_id)
+                    aceitos.append((resultado, chamado_id, inicio, fim, observacoes))
+
+            # Conflitos de horário: uma consulta ao índice de intervalos por
+            # departamento, cobrindo o período de todos os itens dele. Chamados
+            # sem departamento não disputam técnicos e não são verificados.
+            if not forcar:
+                por_departamento = {}
+                for aceito in aceitos:
+                    departamento_id = chamados[aceito[1]][1]
+                    por_departamento.setdefault(departamento_id, []).append(aceito)
+
+                aceitos = por_departamento.pop(None, [])
+                for departamento_id, grupo in por_departamento.items():
+                    capacidade = max(chamados[grupo[0][1]][2], 1)
+                    existentes = consultar_agendamentos_sobrepostos(
+                        cursor,
+                        departamento_id,
+                        min(item[2] for item in grupo),
+                        max(item[3] for item in grupo),
+                    )
+                    ocupados = []
+                    for ag in existentes:
+                        try:
+                            ocupados.append(
+                                (
+                                    ag[0],
+                                    normalizar_data_agenda(ag[1]),
+                                    normalizar_data_agenda(ag[2]),
+                                    ag[3],
+                                )
+                            )
+                        except ValueError:
+                            continue
+
+                    # Na ordem do pedido: itens anteriores têm prioridade
+                    for aceito in grupo:
+                        resultado, chamado_id, inicio, fim, _ = aceito
+                        sobrepostos = [
+                            ag for ag in ocupados if ag[1] < fim and ag[2] > inicio
+                        ]
+                        pico = max(
+                            (
+                                q
+                                for _, _, q in ocupacao_agenda(sobrepostos, inicio, fim)
+                            ),
+                            default=0,
+                        )
+                        if pico >= capacidade:
+                            resultado.update(
+                                status="erro",
+                                erro="Conflito de horário: não há técnico livre no departamento",
+                                conflitos=[
+                                    {
+                                        "id": ag[0],
+                                        "data_inicio": ag[1],
+                                        "data_fim": ag[2],
+                                        "protocolo": ag[3],
+                                    }
+                                    for ag in sobrepostos
+                                ],
+                            )
+                            continue
+                        # Os itens aceitos passam a ocupar a agenda para os seguintes
+                        ocupados.append((None, inicio, fim, chamados[chamado_id][0]))
+                        aceitos.append(aceito)
+
+            falhas = [r for r in resultados if r.get("status") == "erro"]
+            if atomico and falhas:
+                app_logger.warning(
+                    f"Agendamento em lote cancelado: {len(falhas)} item(ns) com erro"
+                )
+                return (
+                    jsonify(
+                        {
+                            "erro": "Lote cancelado: há itens com erro",
+                            "criados": 0,
+                            "falhas": len(falhas),
+                            "resultados": resultados,
+                        }
+                    ),
+                    409,
+                )
+
+            if aceitos:
+                cursor.executemany(
+                    """
+                    INSERT INTO agendamentos (chamado_id, data_agendamento, data_final_agendamento, observacoes)
+                    VALUES (?, ?, ?, ?)
+                """,
+                    [item[1:] for item in aceitos],
+                )
+
+                # Cada chamado tem um único agendamento: os IDs são obtidos pelo chamado
+                marcadores = ",".join("?" * len(aceitos))
+                cursor.execute(
+                    f"SELECT chamado_id, id FROM agendamentos WHERE chamado_id IN ({marcadores})",
+                    [item[1] for item in aceitos],
+                )
+                ids = dict(cursor.fetchall())
+                conn.commit()
+
+                for resultado, chamado_id, *_ in aceitos:
+                    resultado.update(status="criado", id=ids.get(chamado_id))
+
+            criados = len(aceitos)
+            falhas = len(resultados) - criados
+            app_logger.info(
+                f"Agendamento em lote: {criados} criado(s), {falhas} com erro"
+            )
+            return (
+                jsonify(
+                    {
+                        "mensagem": f"{criados} agendamento(s) criado(s)",
+                        "criados": criados,
+                        "falhas": falhas,
+                        "resultados": resultados,
+                    }
+                ),
+                201 if criados else 409,
+            )
+    except Exception as e:
+        app_logger.error(f"Erro ao criar agendamentos em lote: {e}")
+        return jsonify({"erro": "Erro ao criar agendamentos em lote"}), 500
+
+
 # Rota para listar os agendamentos
+# Parâmetros opcionais:
+#   start/end      - período visível no calendário (agendamentos que o intersectam)
+#   updated_since  - token 'sincronizado_em' de uma resposta anterior; retorna
+#                    apenas os agendamentos alterados desde então e, em 'removidos',
+#                    os IDs excluídos ou que saíram do período
+# Sem parâmetros, retorna a lista completa (formato antigo).
 @app.route("/agendamentos", methods=["GET"])
 @login_required
 def listar_agendamentos():
+    atualizado_desde = request.args.get("updated_since")
+    try:
+        inicio = request.args.get("start")
+        inicio = normalizar_data_agenda(inicio) if inicio else None
+        fim = request.args.get("end")
+        fim = normalizar_data_agenda(fim) if fim else None
+        if atualizado_desde:
+            # Valida o token, que é comparado como texto com atualizado_em
+            datetime.fromisoformat(atualizado_desde)
+    except ValueError:
+        app_logger.warning("Parâmetros inválidos na listagem de agendamentos")
+        return jsonify({"erro": "Data inválida nos parâmetros da agenda"}), 400
+
+    def no_periodo(data_inicial, data_final):
+        return (not fim or data_inicial < fim) and (not inicio or data_final > inicio)
+
+    condicoes, parametros = [], []
+    if atualizado_desde:
+        # Na sincronização o período não entra no filtro: um agendamento movido
+        # para fora dele precisa ser informado como removido. A comparação
+        # inclusiva pode repetir itens, mas não perde alterações no mesmo milissegundo
+        condicoes.append("ag.atualizado_em >= ?")
+        parametros.append(atualizado_desde)
+    else:
+        if inicio:
+            limite_busca = (
+                datetime.strptime(inicio, "%Y-%m-%dT%H:%M")
+                - timedelta(days=AGENDA_DURACAO_MAXIMA_DIAS)
+            ).strftime("%Y-%m-%dT%H:%M")
+            condicoes.append(
+                "ag.data_agendamento >= ? AND ag.data_final_agendamento > ?"
+            )
+            parametros.extend([limite_busca, inicio])
+        if fim:
+            condicoes.append("ag.data_agendamento < ?")
+            parametros.append(fim)
+    where = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
 
+            # Marca o instante da leitura antes da consulta: alterações feitas
+            # durante a listagem voltam na próxima sincronização
+            sincronizado_em = None
+            if inicio or fim or atualizado_desde:
+                cursor.execute(f"SELECT {SQL_AGORA_SINCRONIZACAO}")
+                sincronizado_em = cursor.fetchone()[0]
+
             # Query SQL para selecionar agendamentos com dados adicionais
             cursor.execute(
-                """
+                f"""
                 SELECT 
                     ag.id, 
                     ag.chamado_id, 
@@ -3267,13 +5442,19 @@ def listar_agendamentos():
                 JOIN chamados ch ON ag.chamado_id = ch.id
                 LEFT JOIN clientes cl ON ch.cliente_id = cl.id
                 LEFT JOIN departamentos d ON ch.departamento_id = d.id
-            """
+                {where}
+            """,
+                parametros,
             )
             agendamentos = cursor.fetchall()
 
             # Converte os resultados em uma lista de dicionários
             agendamentos_list = []
+            fora_do_periodo = []
             for agendamento in agendamentos:
+                if not no_periodo(agendamento[2], agendamento[3]):
+                    fora_do_periodo.append(agendamento[0])
+                    continue
                 agendamentos_list.append(
                     {
                         "id": agendamento[0],
@@ -3291,11 +5472,43 @@ def listar_agendamentos():
                     }
                 )
 
-            # Registra sucesso no log
-            app_logger.info("Agendamentos listados com sucesso")
+            # Sem parâmetros, mantém a resposta antiga (lista simples)
+            if not (inicio or fim or atualizado_desde):
+                app_logger.info("Agendamentos listados com sucesso")
+                return jsonify(agendamentos_list), 200
 
-            # Retorna a lista de agendamentos
-            return jsonify(agendamentos_list), 200
+            resposta = {
+                "agendamentos": agendamentos_list,
+                "sincronizado_em": sincronizado_em,
+            }
+            if atualizado_desde:
+                # Exclusões mais antigas que a retenção já foram descartadas:
+                # o cliente precisa recarregar o período inteiro
+                limite_retencao = datetime.fromisoformat(sincronizado_em) - timedelta(
+                    days=AGENDA_RETENCAO_REMOVIDOS_DIAS
+                )
+                if datetime.fromisoformat(atualizado_desde) < limite_retencao:
+                    return (
+                        jsonify(
+                            {
+                                "erro": "Sincronização expirada, recarregue a agenda",
+                                "recarregar": True,
+                            }
+                        ),
+                        410,
+                    )
+                cursor.execute(
+                    f"SELECT id FROM {TABELA_AGENDAMENTOS_REMOVIDOS} WHERE removido_em >= ?",
+                    (atualizado_desde,),
+                )
+                resposta["removidos"] = fora_do_periodo + [
+                    row[0] for row in cursor.fetchall()
+                ]
+
+            app_logger.info(
+                f"Agendamentos listados com sucesso ({len(agendamentos_list)} itens)"
+            )
+            return jsonify(resposta), 200
     except Exception as e:
         # Registra falha no log
         app_logger.error(f"Erro ao listar agendamentos: {e}")
@@ -3379,6 +5592,32 @@ def atualizar_agendamento(id):
         with get_db_connection() as conn:
             cursor = conn.cursor()
 
+            # Verifica se o novo horário tem técnico livre no departamento do chamado
+            if not dados.get("forcar"):
+                cursor.execute(
+                    "SELECT chamado_id FROM agendamentos WHERE id = ?", (id,)
+                )
+                agendamento = cursor.fetchone()
+                if not agendamento:
+                    app_logger.warning(
+                        f"Tentativa de atualizar agendamento inexistente com ID: {id}"
+                    )
+                    return jsonify({"erro": "Agendamento não encontrado"}), 404
+                try:
+                    inicio = normalizar_data_agenda(data_agendamento)
+                    fim = normalizar_data_agenda(data_final_agendamento)
+                except ValueError:
+                    return jsonify({"erro": "Formato de data inválido"}), 400
+                capacidade, conflitos = verificar_conflito_agenda(
+                    cursor, agendamento[0], inicio, fim, ignorar_id=id
+                )
+                if conflitos:
+                    app_logger.warning(
+                        f"Conflito de horário ao atualizar o agendamento {id}: "
+                        f"{len(conflitos)} visita(s) no período"
+                    )
+                    return resposta_conflito_agenda(capacidade, conflitos)
+
             # Constrói a query dinamicamente baseado nos campos recebidos
             campos_atualizacao = []
             valores = []
@@ -3429,6 +5668,93 @@ def atualizar_agendamento(id):
         return jsonify({"erro": f"Erro ao atualizar agendamento: {str(e)}"}), 500
 
 
+# Rota para consultar os horários livres de um departamento em um dia
+# Parâmetros: data (AAAA-MM-DD), chamado_id ou departamento_id, duracao (minutos),
+# inicio/fim do expediente (HH:MM) e ignorar_id (agendamento em edição)
+@app.route("/agendamentos/horarios-livres", methods=["GET"])
+@login_required
+def horarios_livres_agenda():
+    chamado_id = request.args.get("chamado_id", type=int)
+    departamento_id = request.args.get("departamento_id", type=int)
+    duracao = request.args.get("duracao", default=60, type=int)
+    ignorar_id = request.args.get("ignorar_id", type=int)
+
+    if not chamado_id and departamento_id is None:
+        return jsonify({"erro": "Informe o chamado ou o departamento"}), 400
+    if duracao <= 0:
+        return jsonify({"erro": "Duração inválida"}), 400
+    try:
+        dia = datetime.strptime(request.args.get("data", ""), "%Y-%m-%d").date()
+        inicio = normalizar_data_agenda(
+            f"{dia}T{request.args.get('inicio', AGENDA_EXPEDIENTE_INICIO)}"
+        )
+        fim = normalizar_data_agenda(
+            f"{dia}T{request.args.get('fim', AGENDA_EXPEDIENTE_FIM)}"
+        )
+    except ValueError:
+        return jsonify({"erro": "Data ou horário inválido"}), 400
+    if fim <= inicio:
+        return jsonify({"erro": "O fim do expediente deve ser após o início"}), 400
+
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+
+            if chamado_id:
+                departamento_id, capacidade = capacidade_departamento(
+                    cursor, chamado_id
+                )
+            else:
+                cursor.execute(
+                    "SELECT COUNT(*) FROM usuario_departamento WHERE departamento_id = ?",
+                    (departamento_id,),
+                )
+                capacidade = max(cursor.fetchone()[0], 1)
+
+            # Chamado sem departamento: sem limite de técnicos, o dia todo é livre
+            sobrepostos = (
+                consultar_agendamentos_sobrepostos(
+                    cursor, departamento_id, inicio, fim, ignorar_id
+                )
+                if capacidade is not None
+                else []
+            )
+
+            # Junta os trechos consecutivos com técnico livre e mantém os que
+            # comportam a duração pedida
+            livres = []
+            for trecho_inicio, trecho_fim, quantidade in ocupacao_agenda(
+                sobrepostos, inicio, fim
+            ):
+                if capacidade is not None and quantidade >= capacidade:
+                    continue
+                if livres and livres[-1]["fim"] == trecho_inicio:
+                    livres[-1]["fim"] = trecho_fim
+                else:
+                    livres.append({"inicio": trecho_inicio, "fim": trecho_fim})
+            minimo = timedelta(minutes=duracao)
+            livres = [
+                trecho
+                for trecho in livres
+                if datetime.fromisoformat(trecho["fim"])
+                - datetime.fromisoformat(trecho["inicio"])
+                >= minimo
+            ]
+
+            return jsonify(
+                {
+                    "data": dia.isoformat(),
+                    "departamento_id": departamento_id,
+                    "capacidade": capacidade,
+                    "duracao": duracao,
+                    "horarios": livres,
+                }
+            )
+    except Exception as e:
+        app_logger.error(f"Erro ao consultar horários livres: {e}")
+        return jsonify({"erro": "Erro ao consultar horários livres"}), 500
+
+
 # Rota para obter detalhes de um agendamento específico
 @app.route("/agendamentos/<int:id>", methods=["GET"])
 @login_required
@@ -3772,217 +6098,632 @@ def obter_ordem_servico(chamado_id):
         )
 
 
-@app.route("/chamados/<int:chamado_id>/ordem-servico/pdf", methods=["GET"])
-@login_required
-def gerar_pdf_ordem_servico(chamado_id):
-    """
-    Gera PDF da ordem de serviço usando reportlab
-    Retorna arquivo PDF para download
-    """
-    try:
-        from reportlab.lib.pagesizes import A4
-        from reportlab.platypus import (
-            SimpleDocTemplate,
-            Paragraph,
-            Spacer,
-            Table,
-            TableStyle,
-        )
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.lib.units import inch
-        from reportlab.lib import colors
+# ========================================================
+# SERVIÇO DE PDF DA ORDEM DE SERVIÇO
+# ========================================================
 
-        # Obter dados da ordem de serviço
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
+# PDFs gerados ficam em disco, identificados pelo chamado e por um hash do
+# conteúdo (chamado, cliente, andamentos e agendamento). Qualquer alteração
+# nesses dados muda o hash, então um arquivo desatualizado nunca é enviado.
+PDF_CACHE_DIR = os.environ.get(
+    "HELPHUB_PDF_CACHE", os.path.join(HELPHUB_DIR, "CACHE", "pdf")
+)
+PDF_CACHE_MAX_ARQUIVOS = 2000
 
-            # Buscar dados do chamado
-            cursor.execute(
-                """
-                SELECT 
-                    c.id, c.protocolo, c.assunto, c.descricao, c.status,
-                    c.data_abertura, c.data_fechamento, c.cliente_id,
-                    cl.nome, cl.nome_fantasia, cl.email, cl.telefone,
-                    cl.tipo_cliente, cl.cnpj_cpf, cl.cep, cl.rua, cl.numero,
-                    cl.complemento, cl.bairro, cl.cidade, cl.estado, cl.pais,
-                    c.solicitante, d.nome as departamento_nome
-                FROM chamados c
-                LEFT JOIN clientes cl ON c.cliente_id = cl.id
-                LEFT JOIN departamentos d ON c.departamento_id = d.id
-                WHERE c.id = ?
-            """,
-                (chamado_id,),
-            )
+# Incrementar ao mudar o layout do PDF, para descartar os arquivos já gerados
+PDF_LAYOUT_VERSAO = 1
 
-            chamado_data = cursor.fetchone()
-            if not chamado_data:
-                return jsonify({"erro": "Chamado não encontrado"}), 404
+# Exportação em lote: máximo de ordens por pedido e processos de renderização.
+# Abaixo de PDF_LOTE_MINIMO_PARALELO PDFs pendentes, renderiza no próprio worker.
+PDF_LOTE_MAXIMO = 500
+PDF_LOTE_PROCESSOS = int(
+    os.environ.get("HELPHUB_PDF_PROCESSOS", min(4, os.cpu_count() or 1))
+)
+PDF_LOTE_MINIMO_PARALELO = 8
 
-            # Buscar histórico de andamentos
-            cursor.execute(
-                """
-                SELECT data_hora, texto
-                FROM chamados_andamentos
-                WHERE chamado_id = ?
-                ORDER BY data_hora ASC
-            """,
-                (chamado_id,),
-            )
+# Lotes renderizados ao mesmo tempo em cada worker; os demais aguardam até
+# PDF_LOTE_ESPERA segundos por uma vaga e depois recebem 503
+PDF_LOTES_SIMULTANEOS = int(os.environ.get("HELPHUB_PDF_LOTES", "2"))
+PDF_LOTE_ESPERA = 30
+_lotes_pdf_semaforo = threading.BoundedSemaphore(PDF_LOTES_SIMULTANEOS)
 
-            andamentos = cursor.fetchall()
+# Pool de processos de renderização do worker (iniciar_pool_pdf)
+_pool_pdf = None
 
-            # Buscar agendamento relacionado
-            cursor.execute(
-                """
-                SELECT id, data_agendamento, data_final_agendamento, observacoes, status
-                FROM agendamentos
-                WHERE chamado_id = ?
-                ORDER BY data_agendamento DESC
-                LIMIT 1
-            """,
-                (chamado_id,),
-            )
+_recursos_pdf = None
+_recursos_pdf_lock = threading.Lock()
 
-            agendamento = cursor.fetchone()
 
-        # Criar PDF
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4)
-        story = []
+def aquecer_servico_pdf():
+    """
+    Importa o reportlab e monta os estilos do PDF uma única vez por processo.
+    No Gunicorn com preload_app é chamado no master, antes de criar os workers
+    (que herdam os módulos já carregados); fora dele, na primeira geração de PDF.
+    """
+    global _recursos_pdf
+    if _recursos_pdf is not None:
+        return _recursos_pdf
+    with _recursos_pdf_lock:
+        if _recursos_pdf is None:
+            from reportlab.lib.pagesizes import A4
+            from reportlab.platypus import (
+                SimpleDocTemplate,
+                Paragraph,
+                Spacer,
+                PageBreak,
+            )
+            from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+            from reportlab.lib import colors
+
+            styles = getSampleStyleSheet()
+            _recursos_pdf = {
+                "A4": A4,
+                "SimpleDocTemplate": SimpleDocTemplate,
+                "Paragraph": Paragraph,
+                "Spacer": Spacer,
+                "PageBreak": PageBreak,
+                "titulo": ParagraphStyle(
+                    "CustomTitle",
+                    parent=styles["Heading1"],
+                    fontSize=18,
+                    spaceAfter=30,
+                    alignment=1,  # Centralizado
+                    textColor=colors.darkblue,
+                ),
+                "subtitulo": ParagraphStyle(
+                    "CustomSubtitle",
+                    parent=styles["Heading2"],
+                    fontSize=14,
+                    spaceAfter=20,
+                    textColor=colors.darkblue,
+                ),
+                "normal": styles["Normal"],
+            }
+            app_logger.info("Serviço de PDF carregado (reportlab e estilos)")
+    return _recursos_pdf
 
-        # Estilos
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            "CustomTitle",
-            parent=styles["Heading1"],
-            fontSize=18,
-            spaceAfter=30,
-            alignment=1,  # Centralizado
-            textColor=colors.darkblue,
-        )
 
-        subtitle_style = ParagraphStyle(
-            "CustomSubtitle",
-            parent=styles["Heading2"],
-            fontSize=14,
-            spaceAfter=20,
-            textColor=colors.darkblue,
+def consultar_dados_ordens_servico(cursor, ids):
+    """
+    Busca os dados do PDF da ordem de serviço de vários chamados com uma
+    consulta por tabela. Retorna {chamado_id: (chamado com cliente e
+    departamento, andamentos, último agendamento)}; chamados inexistentes
+    ficam de fora.
+    """
+    ids = list(dict.fromkeys(int(id_chamado) for id_chamado in ids))
+    if not ids:
+        return {}
+    marcadores = ", ".join("?" for _ in ids)
+
+    cursor.execute(
+        f"""
+        SELECT 
+            c.id, c.protocolo, c.assunto, c.descricao, c.status,
+            c.data_abertura, c.data_fechamento, c.cliente_id,
+            cl.nome, cl.nome_fantasia, cl.email, cl.telefone,
+            cl.tipo_cliente, cl.cnpj_cpf, cl.cep, cl.rua, cl.numero,
+            cl.complemento, cl.bairro, cl.cidade, cl.estado, cl.pais,
+            c.solicitante, d.nome as departamento_nome
+        FROM chamados c
+        LEFT JOIN clientes cl ON c.cliente_id = cl.id
+        LEFT JOIN departamentos d ON c.departamento_id = d.id
+        WHERE c.id IN ({marcadores})
+    """,
+        ids,
+    )
+    chamados = {linha[0]: tuple(linha) for linha in cursor.fetchall()}
+    if not chamados:
+        return {}
+
+    # Histórico de andamentos
+    andamentos = {id_chamado: [] for id_chamado in chamados}
+    cursor.execute(
+        f"""
+        SELECT chamado_id, data_hora, texto
+        FROM chamados_andamentos
+        WHERE chamado_id IN ({marcadores})
+        ORDER BY chamado_id, data_hora ASC
+    """,
+        ids,
+    )
+    for chamado_id, data_hora, texto in cursor.fetchall():
+        andamentos[chamado_id].append((data_hora, texto))
+
+    # Agendamento mais recente de cada chamado
+    cursor.execute(
+        f"""
+        SELECT chamado_id, id, data_agendamento, data_final_agendamento,
+               observacoes, status
+        FROM (
+            SELECT a.*, ROW_NUMBER() OVER (
+                PARTITION BY chamado_id ORDER BY data_agendamento DESC
+            ) AS ordem
+            FROM agendamentos a
+            WHERE chamado_id IN ({marcadores})
         )
-
-        normal_style = styles["Normal"]
-
-        # Cabeçalho
-        story.append(Paragraph("ORDEM DE SERVIÇO", title_style))
-        story.append(Spacer(1, 20))
-
-        # Informações do chamado
-        story.append(Paragraph("DADOS DO CHAMADO", subtitle_style))
-        story.append(Paragraph(f"<b>Protocolo:</b> {chamado_data[1]}", normal_style))
-        story.append(Paragraph(f"<b>Assunto:</b> {chamado_data[2]}", normal_style))
-        story.append(Paragraph(f"<b>Descrição:</b> {chamado_data[3]}", normal_style))
-        story.append(Paragraph(f"<b>Status:</b> {chamado_data[4]}", normal_style))
+        WHERE ordem = 1
+    """,
+        ids,
+    )
+    agendamentos = {linha[0]: tuple(linha[1:]) for linha in cursor.fetchall()}
+
+    return {
+        id_chamado: (chamado, andamentos[id_chamado], agendamentos.get(id_chamado))
+        for id_chamado, chamado in chamados.items()
+    }
+
+
+def hash_ordem_servico(dados):
+    """Hash do conteúdo do PDF: muda com qualquer alteração nos dados ou no layout"""
+    return hashlib.sha256(repr((PDF_LAYOUT_VERSAO, dados)).encode()).hexdigest()[:32]
+
+
+def montar_story_ordem_servico(recursos, chamado_data, andamentos, agendamento):
+    """Monta a lista de elementos (flowables) do PDF de uma ordem de serviço"""
+    Paragraph, Spacer = recursos["Paragraph"], recursos["Spacer"]
+    title_style = recursos["titulo"]
+    subtitle_style = recursos["subtitulo"]
+    normal_style = recursos["normal"]
+    story = []
+
+    # Cabeçalho
+    story.append(Paragraph("ORDEM DE SERVIÇO", title_style))
+    story.append(Spacer(1, 20))
+
+    # Informações do chamado
+    story.append(Paragraph("DADOS DO CHAMADO", subtitle_style))
+    story.append(Paragraph(f"<b>Protocolo:</b> {chamado_data[1]}", normal_style))
+    story.append(Paragraph(f"<b>Assunto:</b> {chamado_data[2]}", normal_style))
+    story.append(Paragraph(f"<b>Descrição:</b> {chamado_data[3]}", normal_style))
+    story.append(Paragraph(f"<b>Status:</b> {chamado_data[4]}", normal_style))
+    story.append(Paragraph(f"<b>Data de Abertura:</b> {chamado_data[5]}", normal_style))
+    if chamado_data[6]:
         story.append(
-            Paragraph(f"<b>Data de Abertura:</b> {chamado_data[5]}", normal_style)
+            Paragraph(f"<b>Data de Fechamento:</b> {chamado_data[6]}", normal_style)
         )
-        if chamado_data[6]:
-            story.append(
-                Paragraph(f"<b>Data de Fechamento:</b> {chamado_data[6]}", normal_style)
-            )
-        story.append(Spacer(1, 20))
+    story.append(Spacer(1, 20))
 
-        # Informações do cliente
-        story.append(Paragraph("DADOS DO CLIENTE", subtitle_style))
-        story.append(Paragraph(f"<b>Nome:</b> {chamado_data[8]}", normal_style))
-        if chamado_data[9]:
+    # Informações do cliente
+    story.append(Paragraph("DADOS DO CLIENTE", subtitle_style))
+    story.append(Paragraph(f"<b>Nome:</b> {chamado_data[8]}", normal_style))
+    if chamado_data[9]:
+        story.append(
+            Paragraph(f"<b>Nome Fantasia:</b> {chamado_data[9]}", normal_style)
+        )
+    story.append(Paragraph(f"<b>Email:</b> {chamado_data[10]}", normal_style))
+    story.append(Paragraph(f"<b>Telefone:</b> {chamado_data[11]}", normal_style))
+    story.append(Paragraph(f"<b>Tipo:</b> {chamado_data[12]}", normal_style))
+    if chamado_data[13]:
+        story.append(Paragraph(f"<b>CNPJ/CPF:</b> {chamado_data[13]}", normal_style))
+    story.append(Spacer(1, 10))
+
+    # Endereço
+    story.append(Paragraph("<b>Endereço:</b>", normal_style))
+    endereco_parts = []
+    if chamado_data[15]:  # rua
+        endereco_parts.append(chamado_data[15])
+    if chamado_data[16]:  # numero
+        endereco_parts.append(chamado_data[16])
+    if chamado_data[17]:  # complemento
+        endereco_parts.append(chamado_data[17])
+    if chamado_data[18]:  # bairro
+        endereco_parts.append(chamado_data[18])
+    if chamado_data[19]:  # cidade
+        endereco_parts.append(chamado_data[19])
+    if chamado_data[20]:  # estado
+        endereco_parts.append(chamado_data[20])
+    if chamado_data[14]:  # cep
+        endereco_parts.append(f"CEP: {chamado_data[14]}")
+
+    if endereco_parts:
+        story.append(Paragraph(", ".join(endereco_parts), normal_style))
+
+    story.append(Spacer(1, 20))
+
+    # Agendamento (se existir)
+    if agendamento:
+        story.append(Paragraph("AGENDAMENTO", subtitle_style))
+        story.append(Paragraph(f"<b>Data Agendada:</b> {agendamento[1]}", normal_style))
+        if agendamento[2]:
             story.append(
-                Paragraph(f"<b>Nome Fantasia:</b> {chamado_data[9]}", normal_style)
+                Paragraph(f"<b>Data Final:</b> {agendamento[2]}", normal_style)
             )
-        story.append(Paragraph(f"<b>Email:</b> {chamado_data[10]}", normal_style))
-        story.append(Paragraph(f"<b>Telefone:</b> {chamado_data[11]}", normal_style))
-        story.append(Paragraph(f"<b>Tipo:</b> {chamado_data[12]}", normal_style))
-        if chamado_data[13]:
+        if agendamento[3]:
             story.append(
-                Paragraph(f"<b>CNPJ/CPF:</b> {chamado_data[13]}", normal_style)
+                Paragraph(f"<b>Observações:</b> {agendamento[3]}", normal_style)
             )
+        story.append(Paragraph(f"<b>Status:</b> {agendamento[4]}", normal_style))
+        story.append(Spacer(1, 20))
+
+    # Histórico de andamentos
+    story.append(Paragraph("HISTÓRICO DE ANDAMENTOS", subtitle_style))
+    for andamento in andamentos:
+        story.append(Paragraph(f"<b>{andamento[0]}</b>", normal_style))
+        story.append(Paragraph(andamento[1], normal_style))
         story.append(Spacer(1, 10))
 
-        # Endereço
-        story.append(Paragraph("<b>Endereço:</b>", normal_style))
-        endereco_parts = []
-        if chamado_data[15]:  # rua
-            endereco_parts.append(chamado_data[15])
-        if chamado_data[16]:  # numero
-            endereco_parts.append(chamado_data[16])
-        if chamado_data[17]:  # complemento
-            endereco_parts.append(chamado_data[17])
-        if chamado_data[18]:  # bairro
-            endereco_parts.append(chamado_data[18])
-        if chamado_data[19]:  # cidade
-            endereco_parts.append(chamado_data[19])
-        if chamado_data[20]:  # estado
-            endereco_parts.append(chamado_data[20])
-        if chamado_data[14]:  # cep
-            endereco_parts.append(f"CEP: {chamado_data[14]}")
-
-        if endereco_parts:
-            story.append(Paragraph(", ".join(endereco_parts), normal_style))
+    story.append(
+        Paragraph(f"<b>Solicitante:</b> {chamado_data[22] or '-'}", normal_style)
+    )
+    story.append(
+        Paragraph(f"<b>Departamento:</b> {chamado_data[23] or '-'}", normal_style)
+    )
+    story.append(Paragraph(f"<b>Data de Abertura:</b> {chamado_data[5]}", normal_style))
+    return story
 
-        story.append(Spacer(1, 20))
 
-        # Agendamento (se existir)
-        if agendamento:
-            story.append(Paragraph("AGENDAMENTO", subtitle_style))
-            story.append(
-                Paragraph(f"<b>Data Agendada:</b> {agendamento[1]}", normal_style)
+def renderizar_pdf_ordem_servico(chamado_data, andamentos, agendamento):
+    """Gera o PDF da ordem de serviço e retorna o conteúdo em bytes"""
+    recursos = aquecer_servico_pdf()
+    buffer = BytesIO()
+    doc = recursos["SimpleDocTemplate"](buffer, pagesize=recursos["A4"])
+    doc.build(
+        montar_story_ordem_servico(recursos, chamado_data, andamentos, agendamento)
+    )
+    return buffer.getvalue()
+
+
+def caminho_pdf_cache(chamado_id, conteudo_hash):
+    return os.path.join(PDF_CACHE_DIR, f"os-{chamado_id}-{conteudo_hash}.pdf")
+
+
+def gravar_pdf_cache(chamado_id, conteudo_hash, pdf):
+    """
+    Grava o PDF no cache e remove as versões anteriores do mesmo chamado.
+    Lança OSError se o cache não puder ser gravado.
+    """
+    caminho = caminho_pdf_cache(chamado_id, conteudo_hash)
+    os.makedirs(PDF_CACHE_DIR, exist_ok=True)
+
+    # Grava em arquivo temporário e renomeia: downloads simultâneos nunca veem
+    # um PDF pela metade
+    descritor, temporario = tempfile.mkstemp(dir=PDF_CACHE_DIR, suffix=".tmp")
+    with os.fdopen(descritor, "wb") as arquivo:
+        arquivo.write(pdf)
+    os.replace(temporario, caminho)
+
+    for antigo in glob.glob(os.path.join(PDF_CACHE_DIR, f"os-{chamado_id}-*.pdf")):
+        if antigo != caminho:
+            try:
+                os.remove(antigo)
+            except OSError:
+                pass
+    return caminho
+
+
+def abrir_pdf_cache(chamado_id, conteudo_hash):
+    """
+    Abre o PDF em cache, ou retorna None se não houver. O arquivo aberto
+    continua legível mesmo que outra thread o remova em seguida (nova versão
+    do mesmo chamado ou limpeza do cache). Marca o uso na data de modificação,
+    que ordena a limpeza (o atime não é confiável com relatime/noatime).
+    """
+    caminho = caminho_pdf_cache(chamado_id, conteudo_hash)
+    try:
+        arquivo = open(caminho, "rb")
+    except FileNotFoundError:
+        return None
+    try:
+        os.utime(caminho)
+    except OSError:
+        pass
+    return arquivo
+
+
+def obter_pdf_ordem_servico(chamado_id, dados):
+    """
+    Retorna (arquivo aberto do PDF, hash do conteúdo), gerando o PDF só quando
+    não houver um em cache para este conteúdo. Se o cache não puder ser
+    gravado, o PDF gerado é retornado em memória.
+    """
+    conteudo_hash = hash_ordem_servico(dados)
+    arquivo = abrir_pdf_cache(chamado_id, conteudo_hash)
+    if arquivo is not None:
+        return arquivo, conteudo_hash
+
+    pdf = renderizar_pdf_ordem_servico(*dados)
+    try:
+        gravar_pdf_cache(chamado_id, conteudo_hash, pdf)
+        limpar_cache_pdf()
+    except OSError as e:
+        app_logger.warning(f"Cache de PDF indisponível ({PDF_CACHE_DIR}): {e}")
+    return BytesIO(pdf), conteudo_hash
+
+
+def limpar_cache_pdf():
+    """Mantém no máximo PDF_CACHE_MAX_ARQUIVOS, removendo os usados há mais tempo"""
+    arquivos = []
+    for caminho in glob.glob(os.path.join(PDF_CACHE_DIR, "*.pdf")):
+        try:
+            arquivos.append((os.stat(caminho).st_mtime, caminho))
+        except FileNotFoundError:
+            # Removido por outra thread entre a listagem e o stat
+            continue
+    if len(arquivos) <= PDF_CACHE_MAX_ARQUIVOS:
+        return
+    arquivos.sort()
+    for _, caminho in arquivos[: len(arquivos) - PDF_CACHE_MAX_ARQUIVOS]:
+        try:
+            os.remove(caminho)
+        except OSError:
+            pass
+
+
+@app.route("/chamados/<int:chamado_id>/ordem-servico/pdf", methods=["GET"])
+@login_required
+def gerar_pdf_ordem_servico(chamado_id):
+    """
+    Retorna o PDF da ordem de serviço para download.
+    Se o conteúdo não mudou desde a última geração, envia o arquivo em cache.
+    """
+    try:
+        with get_db_connection() as conn:
+            dados = consultar_dados_ordens_servico(conn.cursor(), [chamado_id]).get(
+                chamado_id
             )
-            if agendamento[2]:
-                story.append(
-                    Paragraph(f"<b>Data Final:</b> {agendamento[2]}", normal_style)
-                )
-            if agendamento[3]:
-                story.append(
-                    Paragraph(f"<b>Observações:</b> {agendamento[3]}", normal_style)
-                )
-            story.append(Paragraph(f"<b>Status:</b> {agendamento[4]}", normal_style))
-            story.append(Spacer(1, 20))
+        if not dados:
+            return jsonify({"erro": "Chamado não encontrado"}), 404
 
-        # Histórico de andamentos
-        story.append(Paragraph("HISTÓRICO DE ANDAMENTOS", subtitle_style))
-        for andamento in andamentos:
-            story.append(Paragraph(f"<b>{andamento[0]}</b>", normal_style))
-            story.append(Paragraph(andamento[1], normal_style))
-            story.append(Spacer(1, 10))
+        arquivo, conteudo_hash = obter_pdf_ordem_servico(chamado_id, dados)
 
-        story.append(
-            Paragraph(f"<b>Solicitante:</b> {chamado_data[22] or '-'}", normal_style)
+        app_logger.info(f"PDF da ordem de serviço enviado para chamado {chamado_id}")
+
+        # O hash do conteúdo é o ETag: o navegador revalida e recebe 304 se nada mudou
+        return send_file(
+            arquivo,
+            as_attachment=True,
+            download_name=f"ordem-servico-{chamado_id}.pdf",
+            mimetype="application/pdf",
+            etag=conteudo_hash,
         )
-        story.append(
-            Paragraph(f"<b>Departamento:</b> {chamado_data[23] or '-'}", normal_style)
+
+    except Exception as e:
+        app_logger.error(
+            f"Erro ao gerar PDF da ordem de serviço: {str(e)}", exc_info=True
         )
-        story.append(
-            Paragraph(f"<b>Data de Abertura:</b> {chamado_data[5]}", normal_style)
+        return jsonify({"erro": f"Erro ao gerar PDF: {str(e)}"}), 500
+
+
+def _renderizar_pdf_lote(dados):
+    # Executada nos processos do pool: recebe e devolve apenas tipos serializáveis
+    return renderizar_pdf_ordem_servico(*dados)
+
+
+def iniciar_pool_pdf():
+    """
+    Cria o pool de processos de renderização dos lotes, um por worker e
+    reaproveitado por todos os pedidos. No Gunicorn é chamado em
+    post_worker_init, antes de o worker criar threads: um fork feito de dentro
+    de uma requisição copiaria locks presos por outras threads (logging,
+    imports, reportlab). Sem o pool (fora do Gunicorn, 1 CPU ou sem fork), os
+    lotes são renderizados no próprio processo.
+    """
+    global _pool_pdf
+    if (
+        _pool_pdf is not None
+        or PDF_LOTE_PROCESSOS < 2
+        or "fork" not in multiprocessing.get_all_start_methods()
+    ):
+        return
+    pool = ProcessPoolExecutor(
+        max_workers=PDF_LOTE_PROCESSOS, mp_context=multiprocessing.get_context("fork")
+    )
+    # Com fork, os processos só são criados no primeiro envio: cria-os agora
+    pool.submit(int).result()
+    _pool_pdf = pool
+
+
+def encerrar_pool_pdf():
+    """Encerra os processos de renderização (worker_exit do Gunicorn)"""
+    global _pool_pdf
+    pool, _pool_pdf = _pool_pdf, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def renderizar_pdfs_ordens_servico(lista_dados):
+    """
+    Renderiza vários PDFs de ordem de serviço, na mesma ordem da lista.
+    Com muitos PDFs, distribui a renderização entre os processos do pool do
+    worker, já que o reportlab ocupa a CPU e não se beneficia de threads.
+    """
+    global _pool_pdf
+    pool = _pool_pdf
+    if pool is not None and len(lista_dados) >= PDF_LOTE_MINIMO_PARALELO:
+        try:
+            return list(
+                pool.map(
+                    _renderizar_pdf_lote,
+                    lista_dados,
+                    chunksize=max(1, len(lista_dados) // (PDF_LOTE_PROCESSOS * 4)),
+                )
+            )
+        except BrokenProcessPool as e:
+            # Um processo do pool morreu: não é recriado a partir de uma
+            # requisição (fork com threads); o worker segue renderizando sozinho
+            app_logger.error(f"Pool de renderização de PDFs indisponível: {e}")
+            _pool_pdf = None
+    return [renderizar_pdf_ordem_servico(*dados) for dados in lista_dados]
+
+
+def selecionar_chamados_ordens_servico(cursor, dados):
+    """
+    Retorna os IDs de chamados do lote, na ordem de impressão:
+    - "ids": lista de chamados, na ordem informada;
+    - "data_inicio"/"data_fim" (AAAA-MM-DD): chamados com visita agendada no
+      período, ordenados pelo horário da primeira visita (opcionalmente de um
+      "departamento_id").
+    Lança ValueError se a seleção for inválida.
+    """
+    if dados.get("ids"):
+        if not isinstance(dados["ids"], list):
+            raise ValueError("'ids' deve ser uma lista")
+        return list(dict.fromkeys(int(id_chamado) for id_chamado in dados["ids"]))
+
+    if not dados.get("data_inicio"):
+        raise ValueError("Informe 'ids' ou 'data_inicio'")
+    inicio = datetime.strptime(dados["data_inicio"], "%Y-%m-%d")
+    fim = datetime.strptime(dados.get("data_fim") or dados["data_inicio"], "%Y-%m-%d")
+    if fim < inicio:
+        raise ValueError("'data_fim' não pode ser anterior a 'data_inicio'")
+
+    condicoes = ["a.data_agendamento >= ?", "a.data_agendamento < ?"]
+    parametros = [
+        inicio.strftime("%Y-%m-%d"),
+        (fim + timedelta(days=1)).strftime("%Y-%m-%d"),
+    ]
+    if dados.get("departamento_id") is not None:
+        condicoes.append("c.departamento_id = ?")
+        parametros.append(int(dados["departamento_id"]))
+
+    cursor.execute(
+        f"""
+        SELECT a.chamado_id, MIN(a.data_agendamento) AS primeira_visita
+        FROM agendamentos a
+        JOIN chamados c ON c.id = a.chamado_id
+        WHERE {" AND ".join(condicoes)}
+        GROUP BY a.chamado_id
+        ORDER BY primeira_visita, a.chamado_id
+        LIMIT ?
+    """,
+        parametros + [PDF_LOTE_MAXIMO + 1],
+    )
+    return [linha[0] for linha in cursor.fetchall()]
+
+
+def gerar_arquivo_lote(formato, ids, dados_por_chamado):
+    """
+    Gera o arquivo do lote (um PDF único ou um ZIP com um PDF por chamado) em
+    um arquivo temporário. Retorna (arquivo, quantidade de PDFs renderizados).
+    """
+    arquivo = tempfile.TemporaryFile()
+    if formato == "pdf":
+        recursos = aquecer_servico_pdf()
+        story = []
+        for id_chamado in ids:
+            if story:
+                story.append(recursos["PageBreak"]())
+            story.extend(
+                montar_story_ordem_servico(recursos, *dados_por_chamado[id_chamado])
+            )
+        recursos["SimpleDocTemplate"](arquivo, pagesize=recursos["A4"]).build(story)
+        renderizados = len(ids)
+    else:
+        # Reaproveita os PDFs em cache e renderiza apenas os que mudaram. Os
+        # do cache são lidos já aqui: podem ser removidos por outra thread
+        hashes = {i: hash_ordem_servico(dados_por_chamado[i]) for i in ids}
+        em_cache = {}
+        for i in ids:
+            arquivo_cache = abrir_pdf_cache(i, hashes[i])
+            if arquivo_cache is not None:
+                with arquivo_cache:
+                    em_cache[i] = arquivo_cache.read()
+        pendentes = [i for i in ids if i not in em_cache]
+        novos = dict(
+            zip(
+                pendentes,
+                renderizar_pdfs_ordens_servico(
+                    [dados_por_chamado[i] for i in pendentes]
+                ),
+            )
         )
+        renderizados = len(novos)
+        with zipfile.ZipFile(arquivo, "w", zipfile.ZIP_DEFLATED) as pacote:
+            for id_chamado in ids:
+                nome = f"ordem-servico-{id_chamado}.pdf"
+                if id_chamado in novos:
+                    pacote.writestr(nome, novos[id_chamado])
+                    try:
+                        gravar_pdf_cache(
+                            id_chamado, hashes[id_chamado], novos[id_chamado]
+                        )
+                    except OSError as e:
+                        app_logger.warning(f"Cache de PDF indisponível: {e}")
+                else:
+                    pacote.writestr(nome, em_cache[id_chamado])
+        if novos:
+            limpar_cache_pdf()
+    return arquivo, renderizados
 
-        # Gerar PDF
-        doc.build(story)
-        buffer.seek(0)
+
+# Rota para exportar várias ordens de serviço de uma vez
+# Corpo: {"ids": [...]} ou {"data_inicio", "data_fim", "departamento_id"} e
+# "formato": "pdf" (um único PDF, uma ordem por página) ou "zip" (um PDF por
+# chamado, reaproveitando o cache de PDFs)
+@app.route("/chamados/ordem-servico/lote", methods=["POST"])
+@login_required
+def exportar_ordens_servico_lote():
+    dados = sanitize_input(request.json or {})
+    formato = dados.get("formato", "pdf")
+    if formato not in ("pdf", "zip"):
+        return jsonify({"erro": "Formato inválido. Use: pdf, zip"}), 400
+
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                ids = selecionar_chamados_ordens_servico(cursor, dados)
+            except (ValueError, TypeError) as e:
+                return jsonify({"erro": f"Seleção de chamados inválida: {e}"}), 400
+            if len(ids) > PDF_LOTE_MAXIMO:
+                return (
+                    jsonify(
+                        {
+                            "erro": f"O lote excede {PDF_LOTE_MAXIMO} ordens de serviço. Reduza o período."
+                        }
+                    ),
+                    400,
+                )
+            dados_por_chamado = consultar_dados_ordens_servico(cursor, ids)
+
+        if not dados_por_chamado:
+            return jsonify({"erro": "Nenhum chamado encontrado para o lote"}), 404
+        nao_encontrados = [i for i in ids if i not in dados_por_chamado]
+        ids = [i for i in ids if i in dados_por_chamado]
+
+        # Limita os lotes simultâneos do worker: cada um ocupa uma thread e a CPU
+        if not _lotes_pdf_semaforo.acquire(timeout=PDF_LOTE_ESPERA):
+            return (
+                jsonify(
+                    {
+                        "erro": "Muitas exportações em lote em andamento. Tente novamente em instantes."
+                    }
+                ),
+                503,
+                {"Retry-After": "10"},
+            )
+        try:
+            inicio = perf_counter()
+            arquivo, renderizados = gerar_arquivo_lote(formato, ids, dados_por_chamado)
+        finally:
+            _lotes_pdf_semaforo.release()
 
         app_logger.info(
-            f"PDF da ordem de serviço gerado com sucesso para chamado {chamado_id}"
+            f"Lote de {len(ids)} ordem(ns) de serviço ({formato}) exportado por "
+            f"{session.get('username')}: {renderizados} renderizada(s) em "
+            f"{(perf_counter() - inicio) * 1000:.0f} ms"
         )
 
-        return send_file(
-            buffer,
+        arquivo.seek(0)
+        sufixo = dados.get("data_inicio") or datetime.now().strftime("%Y-%m-%d")
+        resposta = send_file(
+            arquivo,
             as_attachment=True,
-            download_name=f"ordem-servico-{chamado_id}.pdf",
-            mimetype="application/pdf",
+            download_name=f"ordens-servico-{sufixo}.{formato}",
+            mimetype="application/pdf" if formato == "pdf" else "application/zip",
         )
+        resposta.headers["X-Ordens-Servico"] = str(len(ids))
+        if nao_encontrados:
+            resposta.headers["X-Chamados-Nao-Encontrados"] = ",".join(
+                str(i) for i in nao_encontrados
+            )
+        return resposta
 
     except Exception as e:
         app_logger.error(
-            f"Erro ao gerar PDF da ordem de serviço: {str(e)}", exc_info=True
+            f"Erro ao exportar ordens de serviço em lote: {str(e)}", exc_info=True
         )
-        return jsonify({"erro": f"Erro ao gerar PDF: {str(e)}"}), 500
+        return jsonify({"erro": f"Erro ao exportar ordens de serviço: {str(e)}"}), 500
 
 
 # Rota para buscar chamados abertos com base em um termo de pesquisa
@@ -4109,68 +6850,63 @@ def atualizar_endereco(id):
         return jsonify({"erro": "Erro ao atualizar endereço"}), 500
 
 
+# Campos do cadastro de cliente retornados pela API, na ordem do SELECT
+CAMPOS_CLIENTE = [
+    "id",
+    "nome",
+    "nome_fantasia",
+    "email",
+    "telefone",
+    "ativo",
+    "tipo_cliente",
+    "cnpj_cpf",
+    "ie_rg",
+    "contribuinte_icms",
+    "rg_orgao_emissor",
+    "nacionalidade",
+    "naturalidade",
+    "estado_nascimento",
+    "data_nascimento",
+    "sexo",
+    "profissao",
+    "estado_civil",
+    "inscricao_municipal",
+    "cep",
+    "rua",
+    "numero",
+    "complemento",
+    "bairro",
+    "cidade",
+    "estado",
+    "pais",
+]
+
+
+def consultar_cliente(cursor, id):
+    """Retorna o cadastro completo do cliente como dicionário (ou None)"""
+    cursor.execute(
+        f"SELECT {', '.join(CAMPOS_CLIENTE)} FROM clientes WHERE id = ?",
+        (id,),
+    )
+    cliente = cursor.fetchone()
+    # Converte a tupla em um dicionário para facilitar o acesso no frontend
+    return dict(zip(CAMPOS_CLIENTE, cliente)) if cliente else None
+
+
 # Rota para obter detalhes de um cliente específico
 @app.route("/clientes/<int:id>", methods=["GET"])
 @login_required
 def obter_cliente(id):
     try:
         with get_db_connection() as conn:
-            cursor = conn.cursor()
-
-            # Query SQL para selecionar os dados do cliente
-            cursor.execute(
-                """
-                SELECT id, nome, nome_fantasia, email, telefone, ativo,
-                    tipo_cliente, cnpj_cpf, ie_rg, contribuinte_icms,
-                    rg_orgao_emissor, nacionalidade, naturalidade,
-                    estado_nascimento, data_nascimento, sexo, profissao,
-                    estado_civil, inscricao_municipal, cep, rua, numero,
-                    complemento, bairro, cidade, estado, pais
-                FROM clientes 
-                WHERE id = ?
-            """,
-                (id,),
-            )
-
-            cliente = cursor.fetchone()
+            cliente = consultar_cliente(conn.cursor(), id)
 
             # Verifica se o cliente foi encontrado
             if not cliente:
                 app_logger.warning(f"Cliente não encontrado: {id}")
                 return jsonify({"erro": "Cliente não encontrado"}), 404
 
-            # Converte a tupla em um dicionário para facilitar o acesso no frontend
-            return jsonify(
-                {
-                    "id": cliente[0],
-                    "nome": cliente[1],
-                    "nome_fantasia": cliente[2],
-                    "email": cliente[3],
-                    "telefone": cliente[4],
-                    "ativo": cliente[5],
-                    "tipo_cliente": cliente[6],
-                    "cnpj_cpf": cliente[7],
-                    "ie_rg": cliente[8],
-                    "contribuinte_icms": cliente[9],
-                    "rg_orgao_emissor": cliente[10],
-                    "nacionalidade": cliente[11],
-                    "naturalidade": cliente[12],
-                    "estado_nascimento": cliente[13],
-                    "data_nascimento": cliente[14],
-                    "sexo": cliente[15],
-                    "profissao": cliente[16],
-                    "estado_civil": cliente[17],
-                    "inscricao_municipal": cliente[18],
-                    "cep": cliente[19],
-                    "rua": cliente[20],
-                    "numero": cliente[21],
-                    "complemento": cliente[22],
-                    "bairro": cliente[23],
-                    "cidade": cliente[24],
-                    "estado": cliente[25],
-                    "pais": cliente[26],
-                }
-            )
+            return jsonify(cliente)
     except Exception as e:
         # Registra falha no log
         app_logger.error(f"Erro ao obter cliente: {e}")
@@ -4236,8 +6972,19 @@ def list_tables():
             cursor.execute(
                 "SELECT name FROM sqlite_master WHERE type='table' ORDER BY name"
             )
+            # Oculta tabelas internas do SQLite, do índice de busca (FTS5) e da
+            # agenda (sincronização e índice de intervalos)
             tables = [
-                row[0] for row in cursor.fetchall() if not row[0].startswith("sqlite_")
+                row[0]
+                for row in cursor.fetchall()
+                if not row[0].startswith(
+                    (
+                        "sqlite_",
+                        TABELA_BUSCA_CLIENTES,
+                        TABELA_AGENDAMENTOS_REMOVIDOS,
+                        TABELA_INTERVALOS_AGENDA,
+                    )
+                )
             ]
             return jsonify(tables)
     except Exception as e:
@@ -4408,6 +7155,7 @@ def import_table_data(table_name):
             sql = f"INSERT INTO {table_name} ({colunas_str}) VALUES ({placeholders})"
 
             # Processar lote de registros
+            linhas = []
             for registro in dados["data"]:
                 try:
                     # Extrair valores nas colunas válidas, convertendo tipos de dados
@@ -4427,16 +7175,33 @@ def import_table_data(table_name):
                         elif hasattr(val, "isoformat"):
                             val = val.isoformat()
                         values.append(val)
-
-                    # Inserir registro
-                    cursor.execute(sql, values)
-                    registros_importados += 1
+                    linhas.append(values)
                 except Exception as e:
                     app_logger.error(
                         f"Erro ao importar registro para tabela {table_name}: {e}"
                     )
                     registros_falhos += 1
 
+            # Inserir todos os registros de uma vez. Se o banco recusar algum
+            # (restrição, tipo inválido), desfaz o lote até o savepoint e insere
+            # um a um, para importar os demais e contar as falhas
+            cursor.execute("SAVEPOINT importacao")
+            try:
+                cursor.executemany(sql, linhas)
+                registros_importados = len(linhas)
+            except sqlite3.Error:
+                cursor.execute("ROLLBACK TO importacao")
+                for values in linhas:
+                    try:
+                        cursor.execute(sql, values)
+                        registros_importados += 1
+                    except sqlite3.Error as e:
+                        app_logger.error(
+                            f"Erro ao importar registro para tabela {table_name}: {e}"
+                        )
+                        registros_falhos += 1
+            cursor.execute("RELEASE importacao")
+
             # Commit das alterações
             conn.commit()
 
@@ -4511,6 +7276,9 @@ def export_table(format, table_name):
             columns = [description[0] for description in cursor.description]
 
             if format.lower() == "xlsx":
+                # Importado sob demanda: o openpyxl só é usado nesta exportação
+                from openpyxl import Workbook
+
                 # Criar arquivo Excel
                 wb = Workbook()
                 ws = wb.active
@@ -4585,6 +7353,208 @@ def export_table(format, table_name):
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/admin/database/slow-queries", methods=["GET", "DELETE"])
+@login_required
+def consultas_lentas():
+    """
+    Lista (GET) ou limpa (DELETE) as consultas lentas registradas neste worker
+    """
+    if session.get("role") != "admin":
+        return jsonify({"error": "Acesso negado"}), 403
+
+    if request.method == "DELETE":
+        with _consultas_lentas_lock:
+            _consultas_lentas.clear()
+        app_logger.info(
+            f"Administrador {session.get('username')} limpou o registro de consultas lentas"
+        )
+        return jsonify({"success": True})
+
+    with _consultas_lentas_lock:
+        consultas = list(_consultas_lentas)
+
+    # Mais recentes primeiro
+    consultas.reverse()
+    return jsonify(
+        {
+            "limite_ms": SLOW_QUERY_THRESHOLD_MS,
+            "capacidade": SLOW_QUERY_BUFFER_SIZE,
+            "pid": os.getpid(),
+            "total": len(consultas),
+            "consultas": consultas,
+        }
+    )
+
+
+@app.route("/admin/profiler", methods=["GET"])
+@login_required
+def status_profiler():
+    """
+    Retorna o estado do profiler do worker que atendeu a requisição
+    """
+    if session.get("role") != "admin":
+        return jsonify({"error": "Acesso negado"}), 403
+
+    profiler_expirado()
+    return jsonify(
+        {
+            "pid": os.getpid(),
+            "ativo": _profiler["ativo"],
+            "modo": _profiler["modo"],
+            "fracao": _profiler["fracao"],
+            "iniciado_em": _profiler["iniciado_em"],
+            "segundos_restantes": (
+                max(0, round(_profiler["expira_em"] - perf_counter()))
+                if _profiler["ativo"]
+                else 0
+            ),
+            "requisicoes_perfiladas": _profiler["requisicoes"],
+            "requisicoes_ignoradas": _profiler["ignoradas"],
+            "amostras": _profiler["amostras"],
+        }
+    )
+
+
+@app.route("/admin/profiler/iniciar", methods=["POST"])
+@login_required
+def iniciar_profiler():
+    """
+    Inicia uma sessão de perfilamento limitada no tempo neste worker.
+    Modos: 'cprofile' (fração das requisições) ou 'amostragem' (thread de pilhas).
+    """
+    if session.get("role") != "admin":
+        return jsonify({"error": "Acesso negado"}), 403
+
+    dados = request.json or {}
+    modo = dados.get("modo", "cprofile")
+    if modo not in ("cprofile", "amostragem"):
+        return jsonify({"error": "Modo inválido"}), 400
+
+    try:
+        duracao = float(dados.get("duracao", 60))
+        fracao = float(dados.get("fracao", 1.0))
+        intervalo_ms = float(dados.get("intervalo_ms", 10))
+    except (TypeError, ValueError):
+        return jsonify({"error": "Parâmetros inválidos"}), 400
+    # O parser JSON aceita NaN e Infinity: um NaN passa por min/max e faria a
+    # sessão nunca expirar
+    if not all(map(math.isfinite, (duracao, fracao, intervalo_ms))) or duracao <= 0:
+        return jsonify({"error": "Parâmetros inválidos"}), 400
+    duracao = min(duracao, PROFILER_MAX_SEGUNDOS)
+    fracao = min(max(fracao, 0.0), 1.0)
+    intervalo_ms = max(intervalo_ms, 1.0)
+
+    with _profiler_lock:
+        if _profiler["ativo"] and not profiler_expirado():
+            return jsonify({"error": "Já existe uma sessão de perfilamento ativa"}), 409
+
+        # Descarta os resultados da sessão anterior
+        _profiler.update(
+            {
+                "ativo": True,
+                "sessao": _profiler["sessao"] + 1,
+                "modo": modo,
+                "fracao": fracao,
+                "intervalo": intervalo_ms / 1000,
+                "iniciado_em": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "expira_em": perf_counter() + duracao,
+                "requisicoes": 0,
+                "ignoradas": 0,
+                "amostras": 0,
+                "stats": None,
+                "pilhas": Counter(),
+            }
+        )
+
+    if modo == "amostragem":
+        threading.Thread(
+            target=amostrar_pilhas,
+            args=(_profiler["sessao"],),
+            name="helphub-profiler",
+            daemon=True,
+        ).start()
+
+    app_logger.info(
+        f"Administrador {session.get('username')} iniciou perfilamento '{modo}' por {duracao:.0f}s (PID {os.getpid()})"
+    )
+    return jsonify({"success": True, "pid": os.getpid(), "duracao": duracao})
+
+
+@app.route("/admin/profiler/parar", methods=["POST"])
+@login_required
+def parar_profiler():
+    if session.get("role") != "admin":
+        return jsonify({"error": "Acesso negado"}), 403
+
+    with _profiler_lock:
+        _profiler["ativo"] = False
+    app_logger.info(
+        f"Administrador {session.get('username')} encerrou o perfilamento (PID {os.getpid()})"
+    )
+    return jsonify({"success": True, "pid": os.getpid()})
+
+
+@app.route("/admin/profiler/resultado", methods=["GET"])
+@login_required
+def resultado_profiler():
+    """
+    Baixa o resultado do perfilamento deste worker:
+    - formato=texto: relatório pstats ordenado por tempo acumulado
+    - formato=pstats: arquivo binário para snakeviz/pstats
+    - formato=collapsed: pilhas colapsadas para flamegraph (modo amostragem)
+    """
+    if session.get("role") != "admin":
+        return jsonify({"error": "Acesso negado"}), 403
+
+    formato = request.args.get("formato", "texto")
+    limite = request.args.get("limite", default=50, type=int)
+
+    with _profiler_lock:
+        if formato == "collapsed":
+            if not _profiler["pilhas"]:
+                return jsonify({"error": "Nenhuma amostra coletada"}), 404
+            conteudo = "\n".join(
+                f"{pilha} {quantidade}"
+                for pilha, quantidade in _profiler["pilhas"].most_common()
+            )
+            return send_file(
+                BytesIO(conteudo.encode("utf-8")),
+                mimetype="text/plain",
+                as_attachment=True,
+                download_name=f"profiler-{os.getpid()}.collapsed",
+            )
+
+        if _profiler["stats"] is None:
+            return jsonify({"error": "Nenhuma requisição perfilada"}), 404
+
+        if formato == "pstats":
+            with tempfile.TemporaryDirectory() as diretorio:
+                caminho = os.path.join(diretorio, "profiler.pstats")
+                _profiler["stats"].dump_stats(caminho)
+                with open(caminho, "rb") as f:
+                    conteudo = f.read()
+            return send_file(
+                BytesIO(conteudo),
+                mimetype="application/octet-stream",
+                as_attachment=True,
+                download_name=f"profiler-{os.getpid()}.pstats",
+            )
+
+        if formato == "texto":
+            saida = StringIO()
+            relatorio = pstats.Stats(stream=saida)
+            relatorio.add(_profiler["stats"])
+            relatorio.sort_stats("cumulative").print_stats(limite)
+            return send_file(
+                BytesIO(saida.getvalue().encode("utf-8")),
+                mimetype="text/plain",
+                as_attachment=True,
+                download_name=f"profiler-{os.getpid()}.txt",
+            )
+
+    return jsonify({"error": "Formato não suportado"}), 400
+
+
 # ========================================================
 # ROTA PARA SERVIR ARQUIVOS DE LOG (APENAS ADMIN)
 # ========================================================
@@ -4614,21 +7584,77 @@ def serve_log_file(logfile):
 # =============================
 @app.route("/CSS/<path:filename>")
 def custom_css(filename):
-    css_dir = os.path.abspath(os.path.join(app.root_path, "..", "CSS"))
-    return send_from_directory(css_dir, filename)
+    return servir_estatico("CSS", filename)
 
 
 @app.route("/JS/<path:filename>")
 def custom_js(filename):
-    js_dir = os.path.abspath(os.path.join(app.root_path, "..", "JS"))
-    return send_from_directory(js_dir, filename)
+    return servir_estatico("JS", filename)
 
 
 # ========================================================
 # INICIALIZAÇÃO DO APLICATIVO
 # ========================================================
 
+# A inicialização tem duas fases:
+# - única (inicializar_aplicacao): verifica o diretório de logs, testa os
+#   loggers, cria a chave secreta e o esquema do banco. No Gunicorn, roda uma
+#   vez no master (gunicorn_config.py); também pode ser executada com
+#   "python app.py --inicializar" (ex.: após atualizar o sistema);
+# - por processo (inicializar_processo): apenas lê a chave secreta e detecta
+#   os recursos do banco, sem escrever em logs nem executar DDL.
+# A variável HELPHUB_INICIALIZADO, definida pelo gunicorn_config.py apenas no
+# ambiente dos workers (nunca no master, que a passaria adiante num USR2),
+# indica qual fase executar ao importar este módulo. O valor identifica o banco
+# e a versão do app.py: com outro banco ou com o código alterado desde a
+# inicialização (reload), o worker refaz a inicialização completa.
+VARIAVEL_INICIALIZADO = "HELPHUB_INICIALIZADO"
+
+_aplicacao_inicializada = False
+
+
+def marcador_inicializacao():
+    """Valor de HELPHUB_INICIALIZADO para o banco e o código atuais"""
+    with open(__file__, "rb") as f:
+        versao = hashlib.sha1(f.read()).hexdigest()[:12]
+    return f"{os.path.abspath(DATABASE)}@{versao}"
+
+
+def inicializar_aplicacao():
+    """Inicialização única, antes de os workers atenderem requisições"""
+    global _aplicacao_inicializada
+    if _aplicacao_inicializada:
+        return
+    verificar_diretorio_logs()
+    if not test_loggers():
+        critical_logger.critical("Falha na verificação dos loggers")
+        raise SystemExit(1)
+    app.secret_key = get_or_generate_secret_key()
+    criar_tabelas()
+    _aplicacao_inicializada = True
+
+
+def inicializar_processo():
+    """Inicialização leve de um worker, após a inicialização única"""
+    app.secret_key = get_or_generate_secret_key()
+    detectar_recursos_banco()
+
+
+if os.environ.get(VARIAVEL_INICIALIZADO) == marcador_inicializacao():
+    inicializar_processo()
+else:
+    # Importado diretamente (Flask, scripts, outro servidor WSGI): executa a
+    # inicialização completa, como antes
+    inicializar_aplicacao()
+
+
 if __name__ == "__main__":
+    if "--inicializar" in sys.argv[1:]:
+        # Usado pelo gunicorn_config.py quando o app não é carregado no master
+        inicializar_aplicacao()
+        print(marcador_inicializacao())
+        sys.exit(0)
+
     # Esta parte é usada apenas quando você executa o arquivo diretamente
     # para desenvolvimento, não quando usando Gunicorn
     app.run(host="0.0.0.0", port=5000, debug=False)
@@ -0,0 +1,380 @@
+"""
+Build dos arquivos estáticos do HelpHub (CSS, JS, imagens e páginas HTML).
+
+Gera em ESTATICOS/ (ou HELPHUB_ESTATICOS):
+- uma cópia de cada arquivo de CSS/, JS/ e IMAGENS/ com o hash do conteúdo
+  no nome (ex.: css/11-navbar.3f9a1c2b7d.css), servida pelo app.py com cache
+  imutável de um ano;
+- pacotes por página: os <link>/<script> locais consecutivos de cada página
+  viram um único arquivo (o autenticador e a navbar, comuns a todas as telas,
+  formam o pacote "comum", reaproveitado do cache entre uma tela e outra), com
+  o HTML da navbar embutido para dispensar o fetch de /html/11-navbar.html;
+- CSS e JS minificados (minificador.py);
+- imagens redimensionadas, com variantes .avif/.webp, e o favicon como .ico
+  de 16/32/48 px (otimizador_imagens.py);
+- as páginas de HTML/ com as referências reescritas para esses nomes;
+- variantes pré-comprimidas (.gz e, com o pacote brotli instalado, .br) dos
+  arquivos de texto;
+- manifesto.json com o mapeamento nome original -> nome com hash (os pacotes
+  aparecem como "js/comum.js", "css/05-agenda_11-navbar.css" etc.).
+
+Referências dentro de CSS e JS (ex.: url('/imagens/...') e o fetch da navbar)
+também são reescritas; como o hash é calculado depois da reescrita, alterar
+uma imagem muda também o nome do CSS que a usa.
+
+Rode novamente sempre que alterar CSS/, JS/, IMAGENS/ ou HTML/. Sem o build,
+o servidor continua servindo os arquivos originais.
+
+Uso:
+    python SERVER/compilar_estaticos.py
+    python SERVER/compilar_estaticos.py --saida /srv/helphub/estaticos
+"""
+
+import os
+import re
+import gzip
+import json
+import shutil
+import hashlib
+import argparse
+import tempfile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from minificador import minificar_css, minificar_js
+from otimizador_imagens import otimizar_imagem
+
+HELPHUB_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SAIDA_PADRAO = os.environ.get(
+    "HELPHUB_ESTATICOS", os.path.join(HELPHUB_DIR, "ESTATICOS")
+)
+
+# Prefixo da URL -> pasta de origem
+PASTAS = {"css": "CSS", "js": "JS", "imagens": "IMAGENS", "html": "HTML"}
+
+EXTENSOES_TEXTO = {".css", ".js", ".html"}
+EXTENSOES_COMPRIMIVEIS = EXTENSOES_TEXTO | {".ico", ".svg"}
+
+# Referências locais a estáticos, entre aspas ou em url(...):
+# "/css/x.css", "../css/x.css", "../CSS/x.css", '/html/11-navbar.html', "/favicon.ico".
+# Exigir aspas ou parêntese antes evita reescrever URLs de CDN (".../css/all.min.css").
+REFERENCIA = re.compile(
+    r"""(?<=["'(])(?:\.\./|/)(?:(?P<pasta>(?i:css|js|imagens|html))/(?P<arquivo>[\w.\-]+)|(?P<favicon>favicon\.ico))(?=["')?#])"""
+)
+
+# Só comprime quando a variante economiza pelo menos 10%
+ECONOMIA_MINIMA = 0.9
+
+TAMANHO_HASH = 10
+
+MINIFICADORES = {".css": minificar_css, ".js": minificar_js}
+
+# Scripts carregados em todas as telas: formam o pacote "comum", o mesmo
+# arquivo para todas as páginas
+SCRIPTS_COMUNS = {"13-autenticador.js", "11-navbar.js"}
+
+# HTML embutido no pacote antes do script que o buscaria por fetch:
+# script -> (variável global lida pelo script, arquivo de HTML/)
+HTML_EMBUTIDO = {"11-navbar.js": ("HELPHUB_NAVBAR_HTML", "11-navbar.html")}
+
+# Tags que interrompem ou formam um pacote. Só entram no pacote as tags locais
+# exatamente no formato abaixo (sem defer, async, type etc.); qualquer outro
+# <script> ou folha de estilo entre elas (CDN, inline) quebra a sequência,
+# preservando a ordem de execução e da cascata.
+TAG_SCRIPT = re.compile(r"<script\b[^>]*>.*?</script>", re.S | re.I)
+TAG_ESTILO = re.compile(r"<link\b[^>]*>|<style\b[^>]*>.*?</style>", re.S | re.I)
+SCRIPT_LOCAL = re.compile(
+    r"""<script\s+src=["'](?:\.\./|/)(?i:js)/([\w.\-]+\.js)["']\s*>\s*</script>$"""
+)
+ESTILO_LOCAL = re.compile(
+    r"""<link\s+rel=["']stylesheet["']\s+href=["'](?:\.\./|/)(?i:css)/([\w.\-]+\.css)["']\s*/?>$"""
+)
+
+
+class CompiladorEstaticos:
+    def __init__(self, saida):
+        self.saida = saida
+        self.manifesto = {}  # "css/11-navbar.css" -> "css/11-navbar.<hash>.css"
+        self.gerados = set()  # caminhos já com hash (pacotes inseridos nas páginas)
+        self.em_andamento = set()
+        self.bytes_originais = 0
+        self.bytes_gzip = 0
+        self.bytes_brotli = 0
+        self.bytes_imagens = 0
+        self.bytes_imagens_otimizadas = 0  # menor versão de cada imagem
+
+    def gravar(self, destino, conteudo):
+        """Grava o arquivo e suas variantes pré-comprimidas"""
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        with open(destino, "wb") as f:
+            f.write(conteudo)
+        if os.path.splitext(destino)[1].lower() not in EXTENSOES_COMPRIMIVEIS:
+            return
+
+        self.bytes_originais += len(conteudo)
+        variantes = [(".gz", gzip.compress(conteudo, compresslevel=9, mtime=0))]
+        if brotli:
+            variantes.append((".br", brotli.compress(conteudo, quality=11)))
+        for sufixo, comprimido in variantes:
+            if len(comprimido) > len(conteudo) * ECONOMIA_MINIMA:
+                continue
+            with open(destino + sufixo, "wb") as f:
+                f.write(comprimido)
+            if sufixo == ".gz":
+                self.bytes_gzip += len(comprimido)
+            else:
+                self.bytes_brotli += len(comprimido)
+
+    def reescrever(self, conteudo, origem):
+        """Troca as referências a estáticos pelos nomes com hash"""
+
+        def substituir(correspondencia):
+            if correspondencia.group("favicon"):
+                pasta, arquivo = "imagens", "favicon.ico"
+            else:
+                pasta = correspondencia.group("pasta").lower()
+                arquivo = correspondencia.group("arquivo")
+            if f"{pasta}/{arquivo}" in self.gerados:
+                return correspondencia.group(0)
+            if not os.path.isfile(os.path.join(HELPHUB_DIR, PASTAS[pasta], arquivo)):
+                print(
+                    f"  aviso: {origem} referencia {correspondencia.group(0)}, "
+                    "que não existe"
+                )
+                return correspondencia.group(0)
+            if f"{pasta}/{arquivo}" in self.em_andamento:
+                # Referência circular (ex.: a navbar.html cita o próprio 11-navbar.js
+                # que a carrega): mantém a URL original, servida sem hash
+                print(
+                    f"  aviso: referência circular {origem} -> {pasta}/{arquivo}, "
+                    "mantida sem hash"
+                )
+                return correspondencia.group(0)
+            return "/" + self.compilar(pasta, arquivo)
+
+        texto = conteudo.decode("utf-8")
+        return REFERENCIA.sub(substituir, texto).encode("utf-8")
+
+    def compilar(self, pasta, arquivo):
+        """Gera a cópia com hash de um arquivo (e, antes, das suas dependências)"""
+        chave = f"{pasta}/{arquivo}"
+        if chave in self.manifesto:
+            return self.manifesto[chave]
+        self.em_andamento.add(chave)
+
+        with open(os.path.join(HELPHUB_DIR, PASTAS[pasta], arquivo), "rb") as f:
+            conteudo = f.read()
+        base, extensao = os.path.splitext(arquivo)
+        variantes = {}
+        if pasta == "imagens":
+            self.bytes_imagens += len(conteudo)
+            conteudo, variantes = otimizar_imagem(arquivo, conteudo)
+            self.bytes_imagens_otimizadas += min(
+                len(dados) for dados in [conteudo, *variantes.values()]
+            )
+        if extensao.lower() in EXTENSOES_TEXTO:
+            conteudo = self.reescrever(conteudo, chave)
+        minificar = MINIFICADORES.get(extensao.lower())
+        if minificar:
+            conteudo = minificar(conteudo.decode("utf-8")).encode("utf-8")
+
+        compilado = self.gravar_com_hash(pasta, base, extensao, conteudo)
+        # Formatos alternativos ao lado do arquivo (logo.<hash>.png.avif),
+        # escolhidos pelo app.py conforme o cabeçalho Accept
+        for sufixo, dados in variantes.items():
+            self.gravar(os.path.join(self.saida, compilado + sufixo), dados)
+        self.em_andamento.discard(chave)
+        self.manifesto[chave] = compilado
+        return compilado
+
+    def gravar_com_hash(self, pasta, base, extensao, conteudo):
+        digest = hashlib.sha256(conteudo).hexdigest()[:TAMANHO_HASH]
+        compilado = f"{pasta}/{base}.{digest}{extensao}"
+        if compilado not in self.gerados:
+            self.gravar(os.path.join(self.saida, compilado), conteudo)
+            self.gerados.add(compilado)
+        return compilado
+
+    def ler_compilado(self, pasta, arquivo):
+        with open(os.path.join(self.saida, self.compilar(pasta, arquivo)), "rb") as f:
+            return f.read()
+
+    def empacotar(self, pasta, nome, membros):
+        """
+        Junta os arquivos já compilados (reescritos e minificados) de um pacote.
+        Um pacote de um só arquivo é o próprio arquivo compilado.
+        """
+        if len(membros) == 1 and membros[0] not in HTML_EMBUTIDO:
+            return self.compilar(pasta, membros[0])
+
+        partes = []
+        for membro in membros:
+            if membro in HTML_EMBUTIDO:
+                variavel, html = HTML_EMBUTIDO[membro]
+                texto = self.ler_compilado("html", html).decode("utf-8")
+                partes.append(
+                    f"window.{variavel} = {json.dumps(texto, ensure_ascii=False)};\n"
+                )
+            partes.append(self.ler_compilado(pasta, membro).decode("utf-8"))
+        # ";" entre os scripts: um arquivo terminado sem ponto e vírgula seguido
+        # de outro começando com "(" viraria uma chamada de função
+        separador = ";\n" if pasta == "js" else "\n"
+        conteudo = separador.join(partes).encode("utf-8")
+
+        compilado = self.gravar_com_hash(pasta, nome, f".{pasta}", conteudo)
+        self.manifesto[f"{pasta}/{nome}.{pasta}"] = compilado
+        return compilado
+
+    def agrupar(self, texto, tag, local):
+        """
+        Sequências de tags locais consecutivas: [(correspondência, arquivo), ...].
+        Outras tags do mesmo tipo encerram a sequência; <link> que não é folha
+        de estilo (ex.: o favicon) não interfere.
+        """
+        grupos, atual = [], []
+        for correspondencia in tag.finditer(texto):
+            arquivo = local.match(correspondencia.group(0))
+            if arquivo:
+                atual.append((correspondencia, arquivo.group(1)))
+                continue
+            html = correspondencia.group(0).lower()
+            if html.startswith("<link") and "stylesheet" not in html:
+                continue
+            if atual:
+                grupos.append(atual)
+            atual = []
+        if atual:
+            grupos.append(atual)
+        return grupos
+
+    def empacotar_pagina(self, texto):
+        """Troca as tags locais de CSS e JS de cada sequência pelos pacotes"""
+        substituicoes = []  # (inicio, fim, novo html)
+
+        for grupo in self.agrupar(texto, TAG_ESTILO, ESTILO_LOCAL):
+            membros = [arquivo for _, arquivo in grupo]
+            nome = "_".join(os.path.splitext(membro)[0] for membro in membros)
+            pacote = self.empacotar("css", nome, membros)
+            # No lugar do primeiro: os estilos seguintes continuam depois na cascata
+            novo = f'<link rel="stylesheet" href="/{pacote}">'
+            for indice, (correspondencia, _) in enumerate(grupo):
+                substituicoes.append(
+                    (*correspondencia.span(), novo if indice == 0 else "")
+                )
+
+        for grupo in self.agrupar(texto, TAG_SCRIPT, SCRIPT_LOCAL):
+            # Divide a sequência em blocos consecutivos de comuns e da página,
+            # mantendo a ordem de execução
+            blocos = []
+            for _, arquivo in grupo:
+                comum = arquivo in SCRIPTS_COMUNS
+                if blocos and blocos[-1][0] == comum:
+                    blocos[-1][1].append(arquivo)
+                else:
+                    blocos.append((comum, [arquivo]))
+            novas = []
+            for comum, membros in blocos:
+                nome = (
+                    "comum"
+                    if comum
+                    else "_".join(os.path.splitext(membro)[0] for membro in membros)
+                )
+                pacote = self.empacotar("js", nome, membros)
+                novas.append(f'<script src="/{pacote}"></script>')
+            # No lugar do último: o DOM anterior a todos já está disponível
+            for indice, (correspondencia, _) in enumerate(grupo):
+                ultimo = indice == len(grupo) - 1
+                substituicoes.append(
+                    (*correspondencia.span(), "\n    ".join(novas) if ultimo else "")
+                )
+
+        for inicio, fim, novo in sorted(substituicoes, reverse=True):
+            texto = texto[:inicio] + novo + texto[fim:]
+        return texto
+
+    def compilar_pagina(self, arquivo):
+        """Páginas mantêm o nome (são acessadas por /p/...), só as referências mudam"""
+        with open(os.path.join(HELPHUB_DIR, "HTML", arquivo), "rb") as f:
+            texto = self.empacotar_pagina(f.read().decode("utf-8"))
+        conteudo = self.reescrever(texto.encode("utf-8"), f"html/{arquivo}")
+        self.gravar(os.path.join(self.saida, "html", arquivo), conteudo)
+
+    def executar(self):
+        for pasta in ["imagens", "css", "js"]:
+            for arquivo in sorted(os.listdir(os.path.join(HELPHUB_DIR, PASTAS[pasta]))):
+                if os.path.isfile(os.path.join(HELPHUB_DIR, PASTAS[pasta], arquivo)):
+                    self.compilar(pasta, arquivo)
+        # /favicon.ico também é pedido direto pelo navegador, sem passar pelo HTML
+        favicon = self.manifesto.get("imagens/favicon.ico")
+        if favicon:
+            shutil.copyfile(
+                os.path.join(self.saida, favicon),
+                os.path.join(self.saida, "imagens", "favicon.ico"),
+            )
+        for arquivo in sorted(os.listdir(os.path.join(HELPHUB_DIR, "HTML"))):
+            if arquivo.endswith(".html"):
+                self.compilar_pagina(arquivo)
+
+        with open(
+            os.path.join(self.saida, "manifesto.json"), "w", encoding="utf-8"
+        ) as f:
+            json.dump(self.manifesto, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def compilar_estaticos(saida=SAIDA_PADRAO):
+    """
+    Gera o build em um diretório temporário e só então substitui o anterior,
+    para que o servidor nunca veja um build pela metade.
+    """
+    saida = os.path.abspath(saida)
+    pai = os.path.dirname(saida)
+    os.makedirs(pai, exist_ok=True)
+    temporario = tempfile.mkdtemp(prefix=".estaticos-", dir=pai)
+    try:
+        compilador = CompiladorEstaticos(temporario)
+        compilador.executar()
+        antigo = None
+        if os.path.exists(saida):
+            antigo = saida + ".antigo"
+            shutil.rmtree(antigo, ignore_errors=True)
+            os.replace(saida, antigo)
+        os.replace(temporario, saida)
+        if antigo:
+            shutil.rmtree(antigo, ignore_errors=True)
+    except Exception:
+        shutil.rmtree(temporario, ignore_errors=True)
+        raise
+    return compilador
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--saida", default=SAIDA_PADRAO, help="Diretório do build (padrão: ESTATICOS/)"
+    )
+    args = parser.parse_args()
+
+    compilador = compilar_estaticos(args.saida)
+    print(f"{len(compilador.manifesto)} arquivo(s) com hash gerados em {args.saida}")
+    if compilador.bytes_originais:
+        print(
+            f"Texto: {compilador.bytes_originais / 1024:.0f} KB, "
+            f"gzip: {compilador.bytes_gzip / 1024:.0f} KB"
+            + (
+                f", brotli: {compilador.bytes_brotli / 1024:.0f} KB"
+                if brotli
+                else " (instale o pacote brotli para gerar também .br)"
+            )
+        )
+    if compilador.bytes_imagens:
+        print(
+            f"Imagens: {compilador.bytes_imagens / 1024:.0f} KB, "
+            f"otimizadas: {compilador.bytes_imagens_otimizadas / 1024:.0f} KB"
+        )
+
+
+if __name__ == "__main__":
+    main()
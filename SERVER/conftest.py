@@ -0,0 +1,34 @@
+"""
+Fixtures dos testes do app.py (pytest, a partir da raiz do projeto).
+
+O app.py lê o caminho do banco ao ser importado, então todos os testes da
+sessão compartilham um único banco sintético e descartável, gerado pelo
+BENCHMARK/gerar_dados.py (o mesmo da verificação de orçamento de consultas).
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "BENCHMARK")
+)
+
+from comum import carregar_app, cliente_admin
+from gerar_dados import gerar_banco
+
+# Escala do banco sintético (0.001 = 100 clientes, 1.000 chamados)
+ESCALA_TESTES = 0.001
+
+
+@pytest.fixture(scope="session")
+def helphub(tmp_path_factory):
+    banco = str(tmp_path_factory.mktemp("helphub") / "testes.db")
+    gerar_banco(banco, ESCALA_TESTES, semente=42, senha_admin="benchmark")
+    return carregar_app(banco)
+
+
+@pytest.fixture
+def cliente(helphub):
+    return cliente_admin(helphub)
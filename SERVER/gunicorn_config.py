@@ -1,27 +1,146 @@
 import os
+import sys
+import subprocess
 from logging.handlers import RotatingFileHandler
 import logging
 
 # Configuração do Gunicorn para o HelpHub
+#
+# Os valores são calculados a partir da máquina (CPUs e memória disponíveis) e
+# podem ser sobrescritos por variáveis de ambiente HELPHUB_*, sem editar este
+# arquivo (ex.: HELPHUB_WORKERS=3 ./start_server.sh).
 
-# Número de workers (normalmente 2-4 x número de cores da CPU)
-workers = 4
 
-# Tipo de worker - sync é suficiente para aplicações web comuns
-worker_class = 'sync'
+def _env_int(nome, padrao):
+    valor = os.environ.get(nome, '').strip()
+    return int(valor) if valor else padrao
 
-# Tempo limite para workers
-timeout = 60
+
+def _env_bool(nome, padrao):
+    valor = os.environ.get(nome, '').strip().lower()
+    if not valor:
+        return padrao
+    return valor in ('1', 'true', 'sim', 'yes', 'on')
+
+
+def _cpus_disponiveis():
+    """CPUs que o processo pode usar (respeita taskset/cpuset de contêineres)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        return os.cpu_count() or 1
+
+
+def _memoria_disponivel_mb():
+    """Memória disponível em MB (MemAvailable, limitada pelo cgroup), ou None"""
+    disponivel = None
+    try:
+        with open('/proc/meminfo') as f:
+            for linha in f:
+                if linha.startswith('MemAvailable:'):
+                    disponivel = int(linha.split()[1]) // 1024
+                    break
+    except OSError:
+        pass
+    # Limite de memória do contêiner (cgroup v2 e v1)
+    for arquivo in ('/sys/fs/cgroup/memory.max',
+                    '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        try:
+            with open(arquivo) as f:
+                limite = f.read().strip()
+        except OSError:
+            continue
+        if limite.isdigit() and int(limite) < 1 << 60:
+            limite_mb = int(limite) // (1024 * 1024)
+            disponivel = min(disponivel, limite_mb) if disponivel else limite_mb
+        break
+    return disponivel
+
+
+# Ambiente: 'producao' (padrão) ou 'desenvolvimento'
+ambiente = os.environ.get('HELPHUB_AMBIENTE', 'producao').strip().lower()
+desenvolvimento = ambiente in ('desenvolvimento', 'dev', 'development')
+
+# Tipo de worker - gthread (padrão): cada worker atende várias requisições em
+# threads, então um PDF em lote, uma exportação ou uma conexão do canal de
+# eventos (GET /eventos) não bloqueiam o worker inteiro. As conexões com o banco
+# vêm de um pool por worker (uma por thread em uso). HELPHUB_WORKER_CLASS=sync
+# volta ao modelo de um processo por requisição (sem o canal de eventos).
+# Workers gevent não são suportados: o SQLite e o reportlab rodam em C e
+# bloqueariam o loop de eventos do worker inteiro.
+worker_class = os.environ.get('HELPHUB_WORKER_CLASS', 'gthread')
+
+# Memória estimada por worker (MB): ~65 MB após o aquecimento, com folga para
+# os PDFs em lote e as exportações
+memoria_por_worker_mb = _env_int('HELPHUB_MEMORIA_WORKER_MB', 128)
+
+# Processos de renderização dos PDFs em lote: cada worker cria os seus
+# (iniciar_pool_pdf do app.py, mesmo padrão de HELPHUB_PDF_PROCESSOS; com menos
+# de 2 não há pool). Cada um usa ~20 MB próprios após renderizar um lote, além
+# das páginas compartilhadas com o worker, e entra na memória por worker.
+pdf_processos = _env_int('HELPHUB_PDF_PROCESSOS', min(4, os.cpu_count() or 1))
+if pdf_processos < 2:
+    pdf_processos = 0
+memoria_por_processo_pdf_mb = _env_int('HELPHUB_MEMORIA_PDF_PROCESSO_MB', 24)
+memoria_worker_total_mb = (
+    memoria_por_worker_mb + pdf_processos * memoria_por_processo_pdf_mb
+)
+
+# Número de workers. Com gthread as threads cobrem a espera por E/S, e cada
+# worker usa no máximo um núcleo por vez (GIL): CPUs + 1. Com sync, a fórmula
+# clássica 2 x CPUs + 1. Em ambos os casos, limitado a 75% da memória disponível
+# (cada worker com o seu pool de PDFs).
+cpus = _cpus_disponiveis()
+workers = cpus + 1 if worker_class == 'gthread' else 2 * cpus + 1
+memoria_mb = _memoria_disponivel_mb()
+if memoria_mb:
+    workers = min(workers, memoria_mb * 3 // 4 // memoria_worker_total_mb)
+workers = _env_int('HELPHUB_WORKERS', max(workers, 1))
+
+# Capacidade do canal de eventos: cada navegador logado mantém uma conexão
+# aberta em GET /eventos, que ocupa uma thread enquanto durar. As threads de
+# cada worker são a sua parte das conexões esperadas (HELPHUB_CONEXOES_EVENTOS,
+# no total) mais requisicoes_simultaneas threads reservadas às demais
+# requisições: acima da sua parte, o worker recusa novas conexões (503) em vez
+# de deixar as requisições na fila. Com sync (1 thread), o canal fica desligado.
+conexoes_eventos = _env_int('HELPHUB_CONEXOES_EVENTOS', 50)
+requisicoes_simultaneas = _env_int('HELPHUB_REQUISICOES_SIMULTANEAS', 8)
+if worker_class == 'gthread':
+    threads = _env_int(
+        'HELPHUB_THREADS', -(-conexoes_eventos // workers) + requisicoes_simultaneas
+    )
+else:
+    # O Gunicorn troca sync por gthread quando threads > 1
+    threads = 1
+
+# Reciclagem de workers: cada worker é substituído após atender max_requests
+# requisições (mais um valor aleatório de até max_requests_jitter, para que os
+# workers não reiniciem todos ao mesmo tempo), limitando o crescimento de
+# memória por fragmentação ou caches. O worker termina as requisições em
+# andamento antes de sair (graceful_timeout); as conexões do canal de eventos
+# abertas nele são encerradas e o navegador reconecta sem perder eventos.
+max_requests = _env_int('HELPHUB_MAX_REQUESTS', 2000)
+max_requests_jitter = _env_int('HELPHUB_MAX_REQUESTS_JITTER', max_requests // 10)
+
+# Tempo limite para workers. No gthread, é o tempo máximo sem sinal de vida do
+# worker (não o limite de cada requisição); no sync, é o limite da requisição
+timeout = _env_int('HELPHUB_TIMEOUT', 60)
+
+# Tempo para um worker concluir as requisições em andamento ao ser reciclado
+graceful_timeout = _env_int('HELPHUB_GRACEFUL_TIMEOUT', 30)
+
+# Conexões HTTP keep-alive (atrás de proxy reverso)
+keepalive = _env_int('HELPHUB_KEEPALIVE', 5)
 
 # Bind para interface de rede e porta
-bind = '0.0.0.0:5000'
+bind = os.environ.get('HELPHUB_BIND', '0.0.0.0:5000')
 
 # Arquivos de log
 accesslog = 'LOGS/gunicorn_access.log'
 errorlog = 'LOGS/gunicorn_error.log'
 
 # Nível de log
-loglevel = 'info'
+loglevel = os.environ.get('HELPHUB_LOGLEVEL', 'info')
 
 # Capturar saída do aplicativo
 capture_output = True
@@ -32,17 +151,19 @@ daemon = False
 # Arquivo PID (Process ID)
 pidfile = 'gunicorn.pid'
 
-# Reiniciar automaticamente os workers quando o código da aplicação é alterado
-reload = True
+# Reiniciar os workers quando o código é alterado: apenas em desenvolvimento,
+# pois o monitoramento de arquivos consome CPU em cada worker
+reload = _env_bool('HELPHUB_RELOAD', desenvolvimento)
+
+# Carrega o app.py uma única vez no processo master, antes de criar os workers:
+# a importação e a inicialização (tabelas, chave secreta) não se repetem em cada
+# worker, e as páginas de memória do código são compartilhadas entre eles.
+# Incompatível com o reload (o código carregado no master não seria recarregado).
+preload_app = _env_bool('HELPHUB_PRELOAD', not reload)
 
 # Certifique-se de que o diretório de logs existe
 os.makedirs('LOGS', exist_ok=True)
 
-# Configuração de log com rotação
-accesslog = 'LOGS/gunicorn_access.log'
-errorlog = 'LOGS/gunicorn_error.log'
-loglevel = 'info'
-
 # Configuração dos handlers de log
 logconfig_dict = {
     'version': 1,
@@ -93,4 +214,89 @@ logconfig_dict = {
             'propagate': False
         }
     }
-}
\ No newline at end of file
+}
+
+
+# Valor de HELPHUB_INICIALIZADO obtido na inicialização única (sem preload)
+_marcador_inicializacao = None
+
+
+def _inicializar_app():
+    # Inicialização única do app.py (esquema do banco, chave secreta, teste dos
+    # loggers). Com preload_app, ela já aconteceu ao importar o app no master.
+    # Sem preload, roda em um processo separado, para que o master não carregue
+    # o app (o reload dos workers continuaria vendo o código antigo).
+    global _marcador_inicializacao
+    if preload_app:
+        return
+    diretorio = os.path.dirname(os.path.abspath(__file__))
+    resultado = subprocess.run(
+        [sys.executable, os.path.join(diretorio, 'app.py'), '--inicializar'],
+        cwd=diretorio, stdout=subprocess.PIPE, text=True, check=True
+    )
+    _marcador_inicializacao = resultado.stdout.strip().splitlines()[-1]
+
+
+def on_starting(server):
+    _inicializar_app()
+
+
+def on_reload(server):
+    # HUP: os novos workers carregam o código atual, que pode trazer alterações
+    # de esquema
+    _inicializar_app()
+
+
+def post_fork(server, worker):
+    # Só no ambiente do worker: no master, a variável seria herdada pelo novo
+    # master de um USR2 (atualização sem parada), que pularia a inicialização
+    if _marcador_inicializacao:
+        os.environ['HELPHUB_INICIALIZADO'] = _marcador_inicializacao
+
+
+def _conexoes_eventos_por_worker(threads_worker):
+    return max(threads_worker - requisicoes_simultaneas, 0)
+
+
+def when_ready(server):
+    server.log.info(
+        f'HelpHub: {workers} workers {worker_class} x {server.cfg.threads} threads, '
+        f'até {_conexoes_eventos_por_worker(server.cfg.threads)} conexões de eventos por worker '
+        f'(CPUs: {cpus}, memória disponível: {memoria_mb or "?"} MB, '
+        f'{memoria_worker_total_mb} MB por worker com {pdf_processos} processos de PDF, '
+        f'max_requests: {max_requests} + até {max_requests_jitter}, '
+        f'preload: {preload_app}, reload: {reload})'
+    )
+    if preload_app:
+        # O app.py já foi importado pelo master: fecha as conexões abertas na
+        # inicialização, para que não sejam herdadas pelos workers
+        from app import aquecer_servico_pdf, fechar_conexoes_ociosas
+        fechar_conexoes_ociosas()
+
+        # Carrega o reportlab e os estilos do PDF uma vez no master: os workers
+        # herdam os módulos (memória compartilhada) e a primeira ordem de
+        # serviço não paga o custo do import. Sem preload, o reportlab só é
+        # carregado no worker que gerar o primeiro PDF.
+        try:
+            aquecer_servico_pdf()
+        except Exception as e:
+            server.log.warning(f'Não foi possível pré-carregar o serviço de PDF: {e}')
+
+
+def post_worker_init(worker):
+    from app import limitar_conexoes_eventos
+    limitar_conexoes_eventos(_conexoes_eventos_por_worker(worker.cfg.threads))
+
+    # Cria o pool de processos dos PDFs em lote antes de o worker iniciar as
+    # threads: um fork feito depois, de dentro de uma requisição, herdaria
+    # locks presos por outras threads
+    try:
+        from app import iniciar_pool_pdf
+        iniciar_pool_pdf()
+    except Exception as e:
+        worker.log.warning(f'Pool de renderização de PDFs indisponível: {e}')
+
+
+def worker_exit(server, worker):
+    from app import encerrar_pool_pdf
+    encerrar_pool_pdf()
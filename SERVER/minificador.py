@@ -0,0 +1,232 @@
+"""
+Minificação conservadora de JavaScript e CSS, usada pelo build dos estáticos
+(compilar_estaticos.py), sem dependências externas.
+
+Remove apenas comentários e espaços redundantes. Strings, templates e
+expressões regulares são copiados sem alteração. No JavaScript as quebras de
+linha são mantidas (sem linhas vazias), para que a inserção automática de
+ponto e vírgula continue funcionando exatamente como no arquivo original.
+"""
+
+# Caracteres após os quais uma "/" inicia uma expressão regular, não uma divisão
+ANTES_DE_REGEX = set("(,=:[!&|?{};+-*%<>~^")
+PALAVRAS_ANTES_DE_REGEX = {
+    "return",
+    "typeof",
+    "instanceof",
+    "in",
+    "of",
+    "new",
+    "delete",
+    "void",
+    "throw",
+    "case",
+    "do",
+    "else",
+    "yield",
+    "await",
+}
+# Palavras cujo "(...)" é um cabeçalho de comando: após o ")" vem uma instrução,
+# então uma "/" inicia uma regex (ex.: if (a) /x/.test(s)), não uma divisão
+PALAVRAS_CONTROLE = {"if", "while", "for", "with"}
+
+
+def _fim_string(codigo, inicio):
+    """Índice logo após a string iniciada em 'inicio' (aspas simples ou duplas)"""
+    aspas = codigo[inicio]
+    i = inicio + 1
+    while i < len(codigo):
+        if codigo[i] == "\\":
+            i += 2
+            continue
+        if codigo[i] == aspas or codigo[i] == "\n":
+            return i + 1
+        i += 1
+    return i
+
+
+def _fim_template(codigo, inicio):
+    """Índice logo após o template literal iniciado em 'inicio', incluindo ${...}"""
+    i = inicio + 1
+    while i < len(codigo):
+        c = codigo[i]
+        if c == "\\":
+            i += 2
+        elif c == "`":
+            return i + 1
+        elif c == "$" and codigo.startswith("${", i):
+            i = _fim_expressao_template(codigo, i + 2)
+        else:
+            i += 1
+    return i
+
+
+def _fim_expressao_template(codigo, i):
+    """Índice logo após o '}' que fecha uma expressão ${...}"""
+    profundidade = 1
+    while i < len(codigo) and profundidade:
+        c = codigo[i]
+        if c in "'\"":
+            i = _fim_string(codigo, i)
+            continue
+        if c == "`":
+            i = _fim_template(codigo, i)
+            continue
+        if c == "{":
+            profundidade += 1
+        elif c == "}":
+            profundidade -= 1
+        i += 1
+    return i
+
+
+def _fim_regex(codigo, inicio):
+    """
+    Índice logo após a regex iniciada em 'inicio' (incluindo as flags), ou None
+    se não houver "/" de fechamento na mesma linha (então era uma divisão).
+    """
+    i = inicio + 1
+    em_classe = False
+    while i < len(codigo):
+        c = codigo[i]
+        if c == "\n":
+            return None
+        if c == "\\":
+            i += 2
+            continue
+        if c == "[":
+            em_classe = True
+        elif c == "]":
+            em_classe = False
+        elif c == "/" and not em_classe:
+            i += 1
+            while i < len(codigo) and (codigo[i].isalnum() or codigo[i] == "_"):
+                i += 1
+            return i
+        i += 1
+    return None
+
+
+def minificar_js(codigo):
+    """Remove comentários, indentação, espaços repetidos e linhas vazias"""
+    saida = []
+    linha = []
+    # A linha atual começa dentro de um template de várias linhas: o início
+    # dela é conteúdo do template e não pode perder os espaços
+    em_template = False
+    ultimo = ""  # último caractere significativo do código
+    palavra = ""  # última palavra (identificador ou palavra-chave)
+    # Para cada "(" aberto, se ele abre o cabeçalho de um if/while/for/with
+    parenteses = []
+    fecha_controle = False  # o último ")" fechou um desses cabeçalhos
+    i, n = 0, len(codigo)
+
+    def fechar_linha():
+        nonlocal em_template
+        texto = "".join(linha).rstrip()
+        if not em_template:
+            texto = texto.lstrip()
+        if texto:
+            saida.append(texto)
+        linha.clear()
+        em_template = False
+
+    while i < n:
+        c = codigo[i]
+        if c == "\n":
+            fechar_linha()
+            i += 1
+        elif c in " \t\r\f\v":
+            if linha and linha[-1] != " ":
+                linha.append(" ")
+            i += 1
+        elif codigo.startswith("//", i):
+            while i < n and codigo[i] != "\n":
+                i += 1
+        elif codigo.startswith("/*", i):
+            fim = codigo.find("*/", i + 2)
+            comentario = codigo[i : fim + 2 if fim != -1 else n]
+            i = fim + 2 if fim != -1 else n
+            # Um comentário com quebra de linha equivale a uma quebra (ASI)
+            if "\n" in comentario:
+                fechar_linha()
+            elif linha and linha[-1] != " ":
+                linha.append(" ")
+        elif c in "'\"`":
+            fim = _fim_string(codigo, i) if c != "`" else _fim_template(codigo, i)
+            # Templates podem ter várias linhas: são copiados como estão
+            partes = codigo[i:fim].split("\n")
+            linha.append(partes[0])
+            for parte in partes[1:]:
+                texto = "".join(linha)
+                saida.append(texto if em_template else texto.lstrip())
+                linha[:] = [parte]
+                em_template = True
+            ultimo, palavra = c, ""
+            i = fim
+        elif c == "/" and (
+            ultimo in ANTES_DE_REGEX
+            or ultimo == ""
+            or palavra in PALAVRAS_ANTES_DE_REGEX
+            or ultimo == "}"
+            or (ultimo == ")" and fecha_controle)
+        ):
+            fim = _fim_regex(codigo, i)
+            if fim is None:
+                linha.append(c)
+                ultimo, palavra = c, ""
+                i += 1
+            else:
+                linha.append(codigo[i:fim])
+                ultimo, palavra = "/", ""
+                i = fim
+        else:
+            linha.append(c)
+            if c == "(":
+                parenteses.append(palavra in PALAVRAS_CONTROLE)
+            elif c == ")":
+                fecha_controle = parenteses.pop() if parenteses else False
+            if c.isalnum() or c in "_$":
+                palavra = palavra + c if ultimo.isalnum() or ultimo in "_$" else c
+            else:
+                palavra = ""
+            ultimo = c
+            i += 1
+
+    fechar_linha()
+    return "\n".join(saida) + "\n"
+
+
+def minificar_css(codigo):
+    """Remove comentários e espaços desnecessários (em volta de { } ; , e antes de })"""
+    saida = []
+    i, n = 0, len(codigo)
+    while i < n:
+        c = codigo[i]
+        if codigo.startswith("/*", i):
+            fim = codigo.find("*/", i + 2)
+            i = fim + 2 if fim != -1 else n
+        elif c in "'\"":
+            fim = _fim_string(codigo, i)
+            saida.append(codigo[i:fim])
+            i = fim
+        elif c.isspace():
+            while i < n and codigo[i].isspace():
+                i += 1
+            if (
+                saida
+                and saida[-1][-1:] not in "{};,"
+                and not (i < n and codigo[i] in "{};,")
+            ):
+                saida.append(" ")
+        elif c in "{};,":
+            if saida and saida[-1] == " ":
+                saida.pop()
+            if c == "}" and saida and saida[-1] == ";":
+                saida.pop()
+            saida.append(c)
+            i += 1
+        else:
+            saida.append(c)
+            i += 1
+    return "".join(saida).strip() + "\n"
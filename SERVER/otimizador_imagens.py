@@ -0,0 +1,107 @@
+"""
+Otimização das imagens de IMAGENS/, usada pelo build dos estáticos
+(compilar_estaticos.py).
+
+- Redimensiona as imagens para o maior tamanho em que são exibidas
+  (considerando telas de alta densidade), conforme LARGURAS_MAXIMAS;
+- gera variantes .avif e .webp, enviadas pelo app.py apenas aos navegadores
+  que as aceitam (cabeçalho Accept); o formato original continua como
+  alternativa para os demais (PNGs regravados com paleta de 256 cores);
+- converte o favicon em um .ico de verdade, com os tamanhos usados pelos
+  navegadores (o arquivo original é um PNG grande com extensão .ico).
+
+Requer o Pillow (AVIF a partir do Pillow 11.2). Sem ele, as imagens são
+copiadas sem alteração; sem suporte a AVIF, apenas a variante .webp é gerada.
+"""
+
+import io
+import os
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# Largura máxima (px) de cada imagem: o dobro da maior largura exibida
+LARGURAS_MAXIMAS = {
+    "logo.png": 680,  # login: caixa de 400px menos 2 x 30px de padding
+    "logo2.png": 680,  # ordem de serviço, inclusive impressa
+    "login-bg.webp": 1920,  # fundo da tela de login (background-size: cover)
+}
+
+FAVICON_TAMANHOS = [(16, 16), (32, 32), (48, 48)]
+
+# Formato de origem -> como regravá-lo
+FORMATOS_ORIGINAIS = {
+    ".png": ("PNG", {"optimize": True}),
+    ".jpg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+    ".jpeg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+    ".webp": ("WEBP", {"quality": 80, "method": 6}),
+}
+
+# Variantes em ordem de preferência (a mesma usada na negociação do app.py)
+FORMATOS_ALTERNATIVOS = [
+    (".avif", "AVIF", {"quality": 50}),
+    (".webp", "WEBP", {"quality": 80, "method": 6}),
+]
+
+# Só mantém uma variante que economize pelo menos 10%
+ECONOMIA_MINIMA = 0.9
+
+
+def _codificar(imagem, formato, opcoes):
+    saida = io.BytesIO()
+    imagem.save(saida, formato, **opcoes)
+    return saida.getvalue()
+
+
+def _favicon(imagem):
+    """Centraliza a imagem em um quadrado transparente e gera o .ico multi-tamanho"""
+    imagem = imagem.convert("RGBA")
+    lado = max(imagem.size)
+    quadrado = Image.new("RGBA", (lado, lado), (0, 0, 0, 0))
+    quadrado.paste(imagem, ((lado - imagem.width) // 2, (lado - imagem.height) // 2))
+    return _codificar(quadrado, "ICO", {"sizes": FAVICON_TAMANHOS})
+
+
+def otimizar_imagem(arquivo, conteudo):
+    """
+    Retorna (conteúdo no formato original, {sufixo: conteúdo da variante}).
+    Sem redimensionamento, a imagem regravada só substitui a original se for
+    menor; variantes maiores que a imagem principal são descartadas.
+    """
+    extensao = os.path.splitext(arquivo)[1].lower()
+    if Image is None or (extensao != ".ico" and extensao not in FORMATOS_ORIGINAIS):
+        return conteudo, {}
+
+    imagem = Image.open(io.BytesIO(conteudo))
+    imagem.load()
+
+    if extensao == ".ico":
+        favicon = _favicon(imagem)
+        return (favicon if len(favicon) < len(conteudo) else conteudo), {}
+
+    largura = LARGURAS_MAXIMAS.get(arquivo)
+    redimensionada = bool(largura) and imagem.width > largura
+    if redimensionada:
+        altura = round(imagem.height * largura / imagem.width)
+        imagem = imagem.resize((largura, altura), Image.LANCZOS)
+
+    formato, opcoes = FORMATOS_ORIGINAIS[extensao]
+    original = imagem
+    if formato == "PNG" and imagem.mode in ("RGB", "RGBA"):
+        # Paleta de 256 cores (com transparência): os logos têm poucas cores
+        original = imagem.quantize(256, method=Image.Quantize.FASTOCTREE)
+    principal = _codificar(original, formato, opcoes)
+    if not redimensionada and len(principal) >= len(conteudo):
+        principal = conteudo
+
+    variantes = {}
+    suportados = Image.registered_extensions()
+    for sufixo, formato, opcoes in FORMATOS_ALTERNATIVOS:
+        if sufixo == extensao or sufixo not in suportados:
+            continue
+        dados = _codificar(imagem, formato, opcoes)
+        if len(dados) <= len(principal) * ECONOMIA_MINIMA:
+            variantes[sufixo] = dados
+    return principal, variantes
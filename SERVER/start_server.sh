@@ -26,6 +26,13 @@ if ! command -v gunicorn &> /dev/null; then
     fi
 fi
 
+# Gera os estáticos com hash no nome e pré-comprimidos (ESTATICOS/)
+echo "Compilando arquivos estáticos..."
+python3 compilar_estaticos.py
+if [ $? -ne 0 ]; then
+    echo "Aviso: falha ao compilar os estáticos; os arquivos originais serão servidos."
+fi
+
 echo "==========================================="
 echo "Iniciando servidor HelpHub com Gunicorn..."
 echo "==========================================="
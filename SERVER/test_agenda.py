@@ -0,0 +1,95 @@
+"""
+Capacidade da agenda: chamados sem departamento não disputam técnicos.
+
+Executar com:
+    python -m pytest SERVER/test_agenda.py
+"""
+
+import itertools
+
+_sequencia = itertools.count(1)
+
+
+def criar_chamado(helphub, departamento_id=None):
+    with helphub.get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            INSERT INTO chamados (cliente_id, departamento_id, descricao,
+                data_abertura, protocolo)
+            VALUES (1, ?, 'Teste de agenda', '2031-01-01 08:00:00', ?)
+        """,
+            (departamento_id, f"TESTE-AGENDA-{next(_sequencia)}"),
+        )
+        conn.commit()
+        return cursor.lastrowid
+
+
+def criar_departamento(helphub):
+    """Departamento sem técnicos vinculados: capacidade 1"""
+    with helphub.get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO departamentos (nome) VALUES (?)",
+            (f"Teste de agenda {next(_sequencia)}",),
+        )
+        conn.commit()
+        return cursor.lastrowid
+
+
+def agendar(cliente, chamado_id, inicio, fim):
+    return cliente.post(
+        "/agendamentos",
+        json={
+            "chamado_id": chamado_id,
+            "data_agendamento": inicio,
+            "data_final_agendamento": fim,
+        },
+    )
+
+
+def test_visitas_simultaneas_sem_departamento(helphub, cliente):
+    primeiro, segundo = criar_chamado(helphub), criar_chamado(helphub)
+    resposta = agendar(cliente, primeiro, "2031-02-03T09:00", "2031-02-03T11:00")
+    assert resposta.status_code == 201
+    resposta = agendar(cliente, segundo, "2031-02-03T10:00", "2031-02-03T12:00")
+    assert resposta.status_code == 201
+
+
+def test_conflito_no_departamento_continua_verificado(helphub, cliente):
+    departamento_id = criar_departamento(helphub)
+    primeiro = criar_chamado(helphub, departamento_id)
+    segundo = criar_chamado(helphub, departamento_id)
+    resposta = agendar(cliente, primeiro, "2031-02-04T09:00", "2031-02-04T11:00")
+    assert resposta.status_code == 201
+    resposta = agendar(cliente, segundo, "2031-02-04T10:00", "2031-02-04T12:00")
+    assert resposta.status_code == 409
+    assert resposta.get_json()["capacidade"] == 1
+
+
+def test_lote_sem_departamento(helphub, cliente):
+    itens = [
+        {
+            "chamado_id": criar_chamado(helphub),
+            "data_agendamento": "2031-02-05T09:00",
+            "data_final_agendamento": "2031-02-05T11:00",
+        }
+        for _ in range(2)
+    ]
+    resposta = cliente.post("/agendamentos/lote", json={"itens": itens})
+    assert resposta.status_code == 201
+    assert resposta.get_json()["criados"] == 2
+
+
+def test_horarios_livres_sem_departamento(helphub, cliente):
+    chamado_id = criar_chamado(helphub)
+    agendar(cliente, criar_chamado(helphub), "2031-02-06T09:00", "2031-02-06T11:00")
+    resposta = cliente.get(
+        f"/agendamentos/horarios-livres?chamado_id={chamado_id}&data=2031-02-06"
+    )
+    assert resposta.status_code == 200
+    dados = resposta.get_json()
+    assert dados["capacidade"] is None
+    assert dados["horarios"] == [
+        {"inicio": "2031-02-06T08:00", "fim": "2031-02-06T18:00"}
+    ]
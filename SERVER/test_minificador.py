@@ -0,0 +1,54 @@
+"""
+Casos de borda do minificador de JavaScript: regex x divisão.
+
+Uma "/" lida como divisão quando é uma regex faz o "//" de dentro da regex
+virar comentário e apaga o resto da linha no build. Executar com:
+    python -m pytest SERVER/test_minificador.py
+    python SERVER/test_minificador.py
+"""
+
+from minificador import minificar_js
+
+
+def test_regex_apos_cabecalho_de_if():
+    codigo = "if (a) /x\\/\\//.test(s) && f();\n"
+    assert minificar_js(codigo) == codigo
+
+
+def test_regex_apos_while_e_for():
+    assert minificar_js("while (x) /a/.exec(y);\n") == "while (x) /a/.exec(y);\n"
+    assert minificar_js("for (;;) /\\/\\//g.test(z);\n") == (
+        "for (;;) /\\/\\//g.test(z);\n"
+    )
+
+
+def test_regex_apos_if_com_chamada_na_condicao():
+    codigo = "if (f(a)) /\\/\\//.test(b);\n"
+    assert minificar_js(codigo) == codigo
+
+
+def test_divisao_apos_parenteses():
+    codigo = "var r = (a + b) / 2 / c;\nvar m = f(x) / y // metade\n"
+    assert minificar_js(codigo) == "var r = (a + b) / 2 / c;\nvar m = f(x) / y\n"
+
+
+def test_divisao_apos_chamada_dentro_de_if():
+    codigo = "if (g(a) / 2 > 1) x = h(b) / c;\n"
+    assert minificar_js(codigo) == codigo
+
+
+def test_regex_com_barra_em_classe_e_apos_return():
+    codigo = 'function f(s) {\n    return s.replace(/[/]/g, "") // fim\n}\n'
+    assert minificar_js(codigo) == 'function f(s) {\nreturn s.replace(/[/]/g, "")\n}\n'
+
+
+def test_barras_em_strings_e_templates():
+    codigo = "const u = 'http://a/b' + `//${c / 2}//`; // comentário\n"
+    assert minificar_js(codigo) == "const u = 'http://a/b' + `//${c / 2}//`;\n"
+
+
+if __name__ == "__main__":
+    for nome, teste in list(globals().items()):
+        if nome.startswith("test_"):
+            teste()
+    print("Minificador: todos os casos ok.")
@@ -0,0 +1,23 @@
+"""
+Orçamento de consultas SQL por endpoint (detector de N+1) no pytest.
+
+Usa os orçamentos e as verificações do BENCHMARK/orcamento_consultas.py, que
+continua executável sozinho (com --detalhes para listar as consultas). As
+rotas que alteram registros ficam no fim de ORCAMENTOS, então os fluxos de
+tela rodam antes delas. Executar com:
+    python -m pytest SERVER/test_orcamento_consultas.py
+"""
+
+import orcamento_consultas
+
+
+def test_todas_as_rotas_tem_orcamento(helphub):
+    assert orcamento_consultas.verificar_cobertura(helphub) == []
+
+
+def test_fluxos_de_tela(helphub, cliente):
+    assert orcamento_consultas.verificar_fluxos(helphub, cliente) == []
+
+
+def test_consultas_por_endpoint(helphub, cliente):
+    assert orcamento_consultas.verificar_endpoints(helphub, cliente, False) == []